@@ -0,0 +1,78 @@
+# goai/__main__.py
+"""
+统一启动入口：
+
+    python -m goai gui [--size 19] [--level 0]     # 图形界面（默认子命令）
+    python -m goai cli                             # 终端对弈
+    python -m goai selfplay ...                    # 同 python -m goai.selfplay ...
+    python -m goai bench ...                       # 同 python -m goai.bench ...
+    python -m goai gtp ...                         # 同 python -m goai.gtp ...（GTP 引擎）
+    python -m goai --startup-time <子命令> ...      # 额外在 stderr 报告启动耗时
+
+只导入所选子命令需要的模块：tkinter 只在 gui 时加载，pygame 到第一次出声才加载
+（见 goai.sound_dev），numpy 到第一次用成批 playout / 整盘分析才加载。
+启动耗时报告从本模块开始执行算起，到子命令就绪（GUI 为窗口建好、进入事件循环前），
+并列出已加载的重量级依赖，便于发现无意中的提前导入。
+"""
+import time
+
+_T0 = time.perf_counter()
+
+import argparse
+import sys
+
+COMMANDS = ("gui", "cli", "selfplay", "bench", "gtp")
+HEAVY_MODULES = ("tkinter", "pygame", "numpy")
+
+
+def startup_report(command, t_imported, t_ready=None):
+    """返回一行启动耗时报告（毫秒）。"""
+    if t_ready is None:
+        t_ready = time.perf_counter()
+    loaded = [m for m in HEAVY_MODULES if m in sys.modules]
+    return (f"startup: {command} ready in {(t_ready - _T0) * 1e3:.1f} ms "
+            f"(imports {(t_imported - _T0) * 1e3:.1f} ms); "
+            f"loaded: {', '.join(loaded) or 'none'}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m goai", description="solo-go 启动入口")
+    parser.add_argument("--startup-time", action="store_true", help="在 stderr 报告启动耗时")
+    parser.add_argument("command", nargs="?", default="gui", choices=COMMANDS)
+    parser.add_argument("args", nargs=argparse.REMAINDER, help="传给子命令的参数")
+    opts = parser.parse_args(argv)
+
+    def report(t_imported):
+        if opts.startup_time:
+            print(startup_report(opts.command, t_imported), file=sys.stderr, flush=True)
+
+    if opts.command == "gui":
+        gui_parser = argparse.ArgumentParser(prog="python -m goai gui")
+        gui_parser.add_argument("--size", type=int, default=19)
+        gui_parser.add_argument("--level", type=int, default=0, help="AI 等级：0 随机 / 2 MCTS")
+        gui_opts = gui_parser.parse_args(opts.args)
+        from . import gui
+        t_imported = time.perf_counter()
+        gui.main(gui_opts.size, gui_opts.level, on_ready=lambda: report(t_imported))
+        return 0
+    if opts.command == "cli":
+        from . import cli
+        report(time.perf_counter())
+        cli.main()
+        return 0
+    if opts.command == "selfplay":
+        from . import selfplay
+        report(time.perf_counter())
+        selfplay.main(opts.args)
+        return 0
+    if opts.command == "gtp":
+        from . import gtp
+        report(time.perf_counter())
+        return gtp.main(opts.args)
+    from . import bench
+    report(time.perf_counter())
+    return bench.main(opts.args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
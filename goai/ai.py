@@ -1,22 +1,66 @@
 # SimpleAI：只在存在合法着法时返回一个 (r, c)；若无合法着法返回 None
 import random
 from .board import Board, EMPTY, BLACK, WHITE
+from .mcts import MCTS
+from . import instrument
 
 class SimpleAI:
-    def __init__(self, level=0):
+    def __init__(self, level=0, playouts=None, time_ms=None, seed=None, workers=None, ttable=None,
+                 batch=None, patterns=None):
+        """
+        level: 0 = 随机合法着法；1 = 按 3x3 模式先验抽样的合法着法；2 = MCTS（UCT + 随机 playout）
+        playouts / time_ms: level 2 每手的搜索预算（次数或毫秒），都不给时默认 1000 毫秒
+        workers: level 2 时大于 1 则用多进程根并行搜索（goai.parallel）
+        ttable: 可选的置换表（goai.ttable.TranspositionTable），单进程搜索时使用，可与其它评估共享
+        batch: level 2 单进程搜索时每个叶节点成批下的 playout 数（需要 numpy，见 goai.batch_playout）
+        patterns: 3x3 模式权重（goai.patterns.PatternTable 或 JSON 路径）；level 1 不给时用内置手工先验，
+                  level 2 单进程搜索给出时 playout 按先验抽样
+        """
         self.level = level
+        self.rng = random.Random(seed)
+        self.engine = None
+        self.patterns = None
+        if level == 1:
+            from .patterns import get_table
+            self.patterns = get_table(patterns)
+        if level >= 2:
+            if workers is not None and workers > 1:
+                from .parallel import ParallelMCTS
+                self.engine = ParallelMCTS(workers=workers, playouts=playouts, time_ms=time_ms, seed=seed)
+            else:
+                self.engine = MCTS(playouts=playouts, time_ms=time_ms, seed=seed, ttable=ttable,
+                                   batch=batch, patterns=patterns)
+
+    def close(self):
+        """释放搜索用的进程池（若有）。"""
+        close = getattr(self.engine, "close", None)
+        if close is not None:
+            close()
+
+    @property
+    def playouts_per_second(self):
+        """最近一次搜索的 playout 速度（仅 level 2 有意义），用于估算 19x19 的预算。"""
+        return self.engine.playouts_per_second if self.engine is not None else 0.0
 
-    def select_move(self, board: Board, color):
+    @instrument.timed("ai.select_move")
+    def select_move(self, board: Board, color, legal_moves=None):
         """
         返回一个合法落子 (r, c)，若没有合法着法返回 None（表示无法下子）。
         AI 不会返回“pass”作为着法。
+        legal_moves: 调用方（GameManager）已算好的合法着法（已排除劫）；为 None 时自行扫描棋盘。
         """
-        legal_moves = []
-        for r in range(board.size):
-            for c in range(board.size):
-                if board.grid[r][c] == EMPTY and board.is_legal(r, c, color):
-                    legal_moves.append((r, c))
+        if self.engine is not None:
+            return self.engine.search(board, color, legal_moves)
+        if legal_moves is None:
+            legal_moves = []
+            for r in range(board.size):
+                for c in range(board.size):
+                    if board.grid[r][c] == EMPTY and board.is_legal(r, c, color):
+                        legal_moves.append((r, c))
         if not legal_moves:
             return None
-        # 简单随机策略；未来可按启发式排序
-        return random.choice(legal_moves)
\ No newline at end of file
+        if self.patterns is not None:
+            from .patterns import sample_move
+            return sample_move(board, color, legal_moves, self.patterns, self.rng)
+        # 简单随机策略
+        return self.rng.choice(legal_moves)
\ No newline at end of file
@@ -0,0 +1,328 @@
+# goai/batch_playout.py
+"""
+成批随机对局（playout）内核，需要 numpy（可选依赖，见 goai.analysis）。
+
+K 盘对局放在同一组数组里，每一手 K 盘同时落子，每步只是对 K 个（或更少）元素的向量运算：
+- 棋子 stones (K, N*N + 1)，最后一列是盘外哨兵；块用并查集 parent 表示，根上记伪气数
+  （每颗子相邻空点数之和，重复计数）。伪气数足以精确判定提子与自杀：
+  某块在 p 点之外还有气 <=> 伪气数 > 该块与 p 相邻的次数。
+- 每盘维护空点列表；选点与 playout.random_playout 一致：在未试过的空点里随机抽，
+  不填己方真眼，不合法就换到“已试”区再抽。抽了几次还没下成的盘，改为一次性检查全部未试空点
+  （后盘大多是眼位，逐个抽太慢）。
+- 每块的棋子另串成环（nxt），合并时拼环、提子时沿环取子，都只碰到相关的棋子。
+- 终局按 playout.area_score 的口径数子。
+"""
+from .analysis import np, _require_numpy, board_array, chain_labels
+from .board import EMPTY, BLACK, WHITE
+
+# 盘外哨兵（与任何颜色都不同）
+_OFF = 9
+# 逐个随机抽点的轮数，之后对剩下的盘整体检查
+QUICK_TRIES = 3
+
+_TABLES = {}
+
+def _tables(size):
+    """按尺寸缓存：四邻 / 对角下标表（盘外指向哨兵列 n）与真眼判定的对角敌子上限。"""
+    t = _TABLES.get(size)
+    if t is None:
+        n = size * size
+        nbr = np.full((n + 1, 4), n, dtype=np.intp)
+        diag = np.full((n + 1, 4), n, dtype=np.intp)
+        limit = np.zeros(n + 1, dtype=np.int8)
+        for i in range(n):
+            r, c = divmod(i, size)
+            for k, (dr, dc) in enumerate(((-1, 0), (1, 0), (0, -1), (0, 1))):
+                if 0 <= r + dr < size and 0 <= c + dc < size:
+                    nbr[i, k] = (r + dr) * size + c + dc
+            for k, (dr, dc) in enumerate(((-1, -1), (-1, 1), (1, -1), (1, 1))):
+                if 0 <= r + dr < size and 0 <= c + dc < size:
+                    diag[i, k] = (r + dr) * size + c + dc
+            edge = r == 0 or c == 0 or r == size - 1 or c == size - 1
+            limit[i] = 1 if edge else 2
+        t = _TABLES[size] = (nbr, diag, limit)
+    return t
+
+# 对 (..., 4) 的布尔数组按最后一维归约：把 4 个字节当成一个 uint32 看，
+# 比 numpy 沿长度为 4 的轴做 any / all / sum 快一个数量级
+def _words(mask):
+    return np.ascontiguousarray(mask).view(np.uint32)[..., 0]
+
+def _any4(mask):
+    return _words(mask) != 0
+
+def _all4(mask):
+    return _words(mask) == 0x01010101
+
+def _count4(mask):
+    return (_words(mask) * np.uint32(0x01010101)) >> 24
+
+def _segments(counts):
+    """按 counts 分段：返回每个元素所在段号与段内序号。"""
+    total = int(counts.sum())
+    seg = np.repeat(np.arange(len(counts)), counts)
+    starts = np.cumsum(counts) - counts
+    return seg, np.arange(total) - starts[seg]
+
+
+class _Batch:
+    """
+    K 盘的状态。所有数组按 (K, W) 存、按一维下标 row * W + col 访问（W = N*N + 1，含哨兵列），
+    一维花式索引比二维 (rows, cols) 索引快得多；parent 里存的也是一维下标。
+    """
+    def __init__(self, board, k):
+        size = board.size
+        n = size * size
+        w = n + 1
+        self.n = n
+        self.w = w
+        self.k = k
+        self.nbr, self.diag, self.limit = _tables(size)
+        a = board_array(board).reshape(-1)
+        lab = chain_labels(a.reshape(size, size)).reshape(-1)
+        stones = np.empty(w, dtype=np.int8)
+        stones[:n] = a
+        stones[n] = _OFF
+        idx = np.arange(w, dtype=np.int32)
+        parent = idx.copy()
+        parent[:n] = np.where(lab >= 0, lab, idx[:n])
+        # 伪气数：每颗子的相邻空点数，累加到块根上
+        empty_nb = (stones[self.nbr[:n]] == EMPTY).sum(1)
+        plibs = np.zeros(w, dtype=np.int32)
+        np.add.at(plibs, parent[:n][a != EMPTY], empty_nb[a != EMPTY])
+        # 每块的棋子串成环（nxt），提子时沿环取出整块
+        nxt = idx.copy()
+        stones_at = np.flatnonzero(a != EMPTY)
+        order = stones_at[np.argsort(parent[stones_at], kind="stable")]
+        if len(order):
+            group = parent[order]
+            nxt[order[:-1]] = order[1:]
+            last = np.flatnonzero(np.r_[group[1:] != group[:-1], True])
+            first = np.r_[0, last[:-1] + 1]
+            nxt[order[last]] = order[first]
+        empties = np.flatnonzero(a == EMPTY).astype(np.int32)
+        pos = np.zeros(w, dtype=np.int32)
+        pos[empties] = np.arange(len(empties), dtype=np.int32)
+        offsets = (np.arange(k, dtype=np.int32) * w)[:, None]
+        self.stones = np.tile(stones, (k, 1))
+        self.parent = np.tile(parent, (k, 1)) + offsets
+        self.plibs = np.tile(plibs, (k, 1))
+        self.nxt = np.tile(nxt, (k, 1)) + offsets
+        self.pos = np.tile(pos, (k, 1))
+        self.empties = np.zeros((k, n), dtype=np.int32)
+        self.empties[:, :len(empties)] = empties
+        self.count = np.full(k, len(empties), dtype=np.int32)
+        # 一维视图
+        self._stones = self.stones.reshape(-1)
+        self._parent = self.parent.reshape(-1)
+        self._plibs = self.plibs.reshape(-1)
+        self._nxt = self.nxt.reshape(-1)
+        self._pos = self.pos.reshape(-1)
+        self._empties = self.empties.reshape(-1)
+
+    def _find(self, x):
+        """返回各点所在块的根（空点与哨兵是自己），并把查询点直接挂到根上。"""
+        parent = self._parent
+        root = x
+        while True:
+            up = parent[root]
+            if (up == root).all():
+                break
+            root = up
+        parent[x] = root
+        return root
+
+    def _around(self, g, col):
+        """四邻的一维下标，形如 (m, 4)。"""
+        return (g - col)[:, None] + self.nbr[col]
+
+    def check(self, g, col, color):
+        """每个点 g（列号 col）是否可下：合法（含提子、非自杀）且不是 color 的真眼。"""
+        stones = self._stones
+        nb = self._around(g, col)
+        nv = stones[nb]
+        eye = _all4((nv == color) | (nv == _OFF))
+        diag = stones[(g - col)[:, None] + self.diag[col]]
+        eye &= _count4(diag == -color) < self.limit[col]
+        ok = ~eye & _any4(nv == EMPTY)
+        # 四邻没有空点的非眼点才需要看相邻块的气
+        hard = np.flatnonzero(~eye & ~ok)
+        if len(hard):
+            nb, nv = nb[hard], nv[hard]
+            roots = self._find(nb)
+            stone = (nv == BLACK) | (nv == WHITE)
+            # 每个相邻块与 p 相邻的次数
+            adj = _count4((roots[:, :, None] == roots[:, None, :]) & stone[:, None, :])
+            pl = self._plibs[roots]
+            ok[hard] = _any4((nv == color) & (pl > adj)) | _any4((nv == -color) & (pl == adj))
+        return ok
+
+    def play(self, rows, col, color):
+        """在 rows 各盘的 col 点落 color 子（调用方已确认合法）。"""
+        plibs = self._plibs
+        parent = self._parent
+        g = rows * self.w + col
+        nb = self._around(g, col)
+        nv = self._stones[nb]
+        roots = self._find(nb)
+        stone = (nv == BLACK) | (nv == WHITE)
+        np.subtract.at(plibs, roots[stone], 1)
+        self._stones[g] = color
+        self._remove_empty(rows, col)
+        # 与相邻己方块合并：挂到第一个己方邻块的根上
+        friend = nv == color
+        dup = (roots[:, :, None] == roots[:, None, :]) & np.tri(4, 4, -1, dtype=bool)
+        first = friend & ~_any4(dup & friend[:, None, :])
+        anchor = np.where(_any4(friend), roots[np.arange(len(g)), friend.argmax(1)], g)
+        total = _count4(nv == EMPTY) + np.where(first, plibs[roots], 0).sum(1)
+        parent[g] = anchor
+        join = first & (roots != anchor[:, None])
+        parent[roots[join]] = np.broadcast_to(anchor[:, None], roots.shape)[join]
+        plibs[anchor] = total
+        # 把新子与各相邻己方块的环拼成一个环
+        nxt = self._nxt
+        nxt[g] = g
+        for j in range(4):
+            m = first[:, j]
+            if m.any():
+                x, y = g[m], roots[m, j]
+                nx, ny = nxt[x], nxt[y]
+                nxt[x] = ny
+                nxt[y] = nx
+        dead = (nv == -color) & (plibs[roots] == 0)
+        if dead.any():
+            dead &= ~_any4(dup & dead[:, None, :])
+            self._capture(roots[dead], np.broadcast_to(rows[:, None], dead.shape)[dead], color)
+
+    def _capture(self, starts, boards, color):
+        """提掉以 starts 为起点的各块（每块一个起点），boards 为所在盘号。"""
+        nxt = self._nxt
+        taken, where = [starts], [boards]
+        cur, start, brd = nxt[starts], starts, boards
+        while len(cur):
+            # 沿环走，回到起点的块已取完
+            keep = cur != start
+            cur, start, brd = cur[keep], start[keep], brd[keep]
+            taken.append(cur)
+            where.append(brd)
+            cur = nxt[cur]
+        g = np.concatenate(taken)
+        b = np.concatenate(where)
+        order = np.argsort(b, kind="stable")
+        g, b = g[order], b[order]
+        col = g - b * self.w
+        self._stones[g] = EMPTY
+        self._parent[g] = g
+        self._plibs[g] = 0
+        nxt[g] = g
+        # 被提子的己方邻块各多出伪气
+        nb = self._around(g, col)
+        own = self._stones[nb] == color
+        np.add.at(self._plibs, self._find(nb[own]), 1)
+        self._append_empty(b, col)
+
+    def _remove_empty(self, rows, col):
+        i = self._pos[rows * self.w + col]
+        last = self._empties[rows * self.n + self.count[rows] - 1]
+        self._empties[rows * self.n + i] = last
+        self._pos[rows * self.w + last] = i
+        self.count[rows] -= 1
+
+    def _append_empty(self, boards, col):
+        """boards 已按盘号排好序（nonzero 的顺序）。"""
+        counts = np.bincount(boards, minlength=self.k)
+        _, rank = _segments(counts[counts > 0])
+        slot = self.count[boards] + rank
+        self._empties[boards * self.n + slot] = col
+        self._pos[boards * self.w + col] = slot
+        self.count += counts.astype(np.int32)
+
+    def _swap(self, rows, i, j):
+        ei = rows * self.n + i
+        ej = rows * self.n + j
+        a = self._empties[ei]
+        b = self._empties[ej]
+        self._empties[ei] = b
+        self._empties[ej] = a
+        self._pos[rows * self.w + a] = j
+        self._pos[rows * self.w + b] = i
+
+    def step(self, rows, color, rng):
+        """rows 各盘走一手；返回这些盘是否落了子（否则为 pass）。"""
+        played = np.zeros(self.k, dtype=bool)
+        untried = self.count.copy()
+        pend = rows[untried[rows] > 0]
+        for _ in range(QUICK_TRIES):
+            if not len(pend):
+                return played[rows]
+            u = untried[pend]
+            k = (rng.random(len(pend)) * u).astype(np.int32)
+            col = self._empties[pend * self.n + k]
+            ok = self.check(pend * self.w + col, col, color)
+            if ok.any():
+                self.play(pend[ok], col[ok], color)
+                played[pend[ok]] = True
+            bad = pend[~ok]
+            untried[bad] -= 1
+            self._swap(bad, k[~ok], untried[bad])
+            pend = bad[untried[bad] > 0]
+        if len(pend):
+            # 剩下的盘一次检查全部未试空点，在可下的点里均匀随机选一个
+            u = untried[pend]
+            seg, off = _segments(u)
+            rep = pend[seg]
+            col = self._empties[rep * self.n + off]
+            ok = self.check(rep * self.w + col, col, color)
+            keys = np.where(ok, rng.random(len(rep)), -1.0)
+            best = np.maximum.reduceat(keys, np.cumsum(u) - u)
+            chosen = ok & (keys == best[seg])
+            _, first = np.unique(rep[chosen], return_index=True)
+            sel = np.flatnonzero(chosen)[first]
+            if len(sel):
+                self.play(rep[sel], col[sel], color)
+                played[rep[sel]] = True
+        return played[rows]
+
+
+def run_batch(board, color, k, rng=None, max_moves=None):
+    """
+    从 board 的局面（不修改，任意后端）出发、color 先走，同时下 k 盘随机对局。
+    返回终局局面 (k, N*N) int8 数组（r * N + c 排列）。rng: numpy Generator 或种子。
+    """
+    _require_numpy()
+    rng = rng if isinstance(rng, np.random.Generator) else np.random.default_rng(rng)
+    if max_moves is None:
+        max_moves = 3 * board.size * board.size
+    batch = _Batch(board, k)
+    passes = np.zeros(k, dtype=np.int8)
+    moves = np.zeros(k, dtype=np.int32)
+    alive = np.ones(k, dtype=bool)
+    while alive.any():
+        rows = np.flatnonzero(alive)
+        played = batch.step(rows, color, rng)
+        passes[rows] = np.where(played, 0, passes[rows] + 1)
+        moves[rows] += played
+        alive[rows] = (passes[rows] < 2) & (moves[rows] < max_moves)
+        color = -color
+    return batch.stones[:, :batch.n].copy()
+
+def ownership(final, size):
+    """终局每点归属（黑 +1 / 白 -1 / 公共 0），与 playout.area_score 同口径：空点看四邻。"""
+    nbr = _tables(size)[0][:size * size]
+    k = final.shape[0]
+    padded = np.empty((k, size * size + 1), dtype=np.int8)
+    padded[:, :-1] = final
+    padded[:, -1] = _OFF
+    around = padded[:, nbr]
+    black = _any4(around == BLACK)
+    white = _any4(around == WHITE)
+    owner = final.astype(np.int8)
+    empty = final == EMPTY
+    owner[empty & black & ~white] = BLACK
+    owner[empty & white & ~black] = WHITE
+    return owner
+
+def batch_playouts(board, color, k, rng=None, max_moves=None):
+    """k 盘随机对局的终局面积差（黑 - 白，未计贴目），形如 (k,) 的数组。"""
+    final = run_batch(board, color, k, rng, max_moves)
+    return ownership(final, board.size).sum(1, dtype=np.int32)
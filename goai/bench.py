@@ -0,0 +1,281 @@
+# goai/bench.py
+"""
+热点路径基准测试：Board / GameManager / 数子 / SimpleAI，9x9、13x13、19x19。
+
+    python -m goai.bench                          # 运行并打印
+    python -m goai.bench --save                   # 运行并保存为基线（默认 benchmarks/baseline.json）
+    python -m goai.bench --compare [path]         # 与基线比较，任一项变慢超过阈值则退出码为 1
+    python run_benchmarks.py ...                  # 同上，与 run_tests.py 并列的入口
+
+- 局面来自固定种子的随机对局（下到约半盘），每次运行完全相同。
+- 每项自动校准循环次数，使单轮不短于 min_time 秒，重复 repeat 轮取最快一轮（最不受干扰）。
+- 结果单位为“每次操作的微秒数”，键为 "名称@尺寸"。
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import time
+
+from .board import EMPTY, BLACK, WHITE, make_board
+from .ai import SimpleAI
+from .game_manager import GameManager
+from .playout import random_playout
+from .scoring import score_area
+
+SIZES = (9, 13, 19)
+DEFAULT_BASELINE = os.path.join("benchmarks", "baseline.json")
+DEFAULT_THRESHOLD = 0.25
+
+# ---------- 可复现的局面 ----------
+def midgame_board(size, seed=0, backend="list"):
+    """固定种子随机对局下到约半盘（size*size/2 手）的局面；返回 (board, to_move)。"""
+    board = make_board(size, backend)
+    moves = random_playout(board, BLACK, random.Random(seed), max_moves=size * size // 2)
+    return board, BLACK if moves % 2 == 0 else WHITE
+
+def snake_board(size, backend="list"):
+    """一条贯穿全盘的蛇形黑棋大块（隔行铺满，行尾交替相连），用于测整块遍历。"""
+    board = make_board(size, backend)
+    for r in range(0, size, 2):
+        for c in range(size):
+            board.place(r, c, BLACK)
+        if r + 1 < size:
+            board.place(r + 1, size - 1 if r % 4 == 0 else 0, BLACK)
+    return board
+
+def _midgame_manager(size, seed=0, backend="list"):
+    board, to_move = midgame_board(size, seed, backend)
+    game = GameManager(size=size, backend=backend)
+    game.board = board
+    game.to_move = to_move
+    game.seen_hashes = {board.hash}
+    game.sync_legal_moves()
+    return game
+
+# ---------- 基准项：setup(size, backend) -> (op, 每次调用 op 含的操作数) ----------
+def _bench_is_legal(size, backend):
+    board, _ = midgame_board(size, backend=backend)
+    points = [(r, c) for r in range(size) for c in range(size) if board.grid[r][c] == EMPTY]
+    is_legal = board.is_legal
+
+    def op():
+        for r, c in points:
+            is_legal(r, c, BLACK)
+            is_legal(r, c, WHITE)
+    return op, 2 * len(points)
+
+def _bench_place(size, backend):
+    # 复制局面后连下 20 手（黑白交替的合法着法）；复制开销摊在 20 手里
+    board, to_move = midgame_board(size, backend=backend)
+    probe = board._copy()
+    seq = []
+    color = to_move
+    rng = random.Random(1)
+    points = [(r, c) for r in range(size) for c in range(size)]
+    rng.shuffle(points)
+    for r, c in points:
+        if len(seq) == 20:
+            break
+        if probe.grid[r][c] == EMPTY and probe.is_legal(r, c, color):
+            probe.place(r, c, color)
+            seq.append((r, c, color))
+            color = -color
+
+    def op():
+        b = board._copy()
+        for r, c, color in seq:
+            b.place(r, c, color)
+    return op, len(seq)
+
+def _bench_group_and_liberties(size, backend):
+    board = snake_board(size, backend)
+
+    def op():
+        board._group_and_liberties(0, 0)
+    return op, 1
+
+def _bench_legal_moves_for(size, backend):
+    game = _midgame_manager(size, backend=backend)
+
+    def op():
+        game.legal_moves_for(game.to_move)
+    return op, 1
+
+def _bench_check_game_over(size, backend):
+    game = _midgame_manager(size, backend=backend)
+
+    def op():
+        game._check_game_over_after_move()
+    return op, 1
+
+def _bench_score_area(size, backend):
+    board, _ = midgame_board(size, backend=backend)
+
+    def op():
+        score_area(board)
+    return op, 1
+
+def _bench_select_move_random(size, backend):
+    game = _midgame_manager(size, backend=backend)
+    ai = SimpleAI(level=0, seed=0)
+
+    def op():
+        ai.select_move(game.board, game.to_move, legal_moves=game.legal_moves_for(game.to_move))
+    return op, 1
+
+def _bench_select_move_mcts(size, backend):
+    game = _midgame_manager(size, backend=backend)
+
+    def op():
+        # 每次新建 AI：不让搜索树在两次调用之间复用
+        ai = SimpleAI(level=2, playouts=16, seed=0)
+        ai.select_move(game.board, game.to_move, legal_moves=game.legal_moves_for(game.to_move))
+    return op, 1
+
+BENCHMARKS = {
+    "board.is_legal": _bench_is_legal,
+    "board.place": _bench_place,
+    "board.group_and_liberties": _bench_group_and_liberties,
+    "game.legal_moves_for": _bench_legal_moves_for,
+    "game.check_game_over": _bench_check_game_over,
+    "scoring.score_area": _bench_score_area,
+    "ai.select_move.random": _bench_select_move_random,
+    "ai.select_move.mcts16": _bench_select_move_mcts,
+}
+
+# ---------- 计时 ----------
+def measure(op, ops_per_call, min_time=0.2, repeat=3):
+    """返回每次操作的微秒数（repeat 轮中最快的一轮）。"""
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            op()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time or number >= 1 << 20:
+            break
+        number *= 2 if elapsed <= 0 else max(2, int(min_time / elapsed * 1.2))
+    best = elapsed
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            op()
+        best = min(best, time.perf_counter() - start)
+    return best / (number * ops_per_call) * 1e6
+
+def run(names=None, sizes=SIZES, backend="list", min_time=0.2, repeat=3, report=None):
+    """运行基准，返回 {"名称@尺寸": 每次操作微秒数}。names 为 None 时运行全部。"""
+    results = {}
+    for name, setup in BENCHMARKS.items():
+        if names and not any(pat in name for pat in names):
+            continue
+        for size in sizes:
+            op, n = setup(size, backend)
+            us = measure(op, n, min_time, repeat)
+            key = f"{name}@{size}"
+            results[key] = us
+            if report is not None:
+                report(key, us)
+    return results
+
+def make_baseline(results, backend="list"):
+    return {
+        "meta": {
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "backend": backend,
+            "unit": "us/op",
+        },
+        "results": results,
+    }
+
+def save_baseline(path, baseline):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(baseline, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+def load_baseline(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+def compare(baseline, current, threshold=DEFAULT_THRESHOLD):
+    """
+    逐项比较。返回 (rows, regressions)：
+    rows 为 (键, 基线, 当前, 当前/基线)；比值超过 1 + threshold 的项记为回退。
+    基线里有、本次没跑出的项当前值与比值为 None（缺失），同样记为回退；只在本次出现的新项不比较。
+    """
+    base = baseline["results"] if "results" in baseline else baseline
+    rows = []
+    regressions = []
+    for key in sorted(base):
+        if key not in current:
+            row = (key, base[key], None, None)
+            rows.append(row)
+            regressions.append(row)
+            continue
+        ratio = current[key] / base[key] if base[key] > 0 else float("inf")
+        row = (key, base[key], current[key], ratio)
+        rows.append(row)
+        if ratio > 1 + threshold:
+            regressions.append(row)
+    return rows, regressions
+
+def _selected(key, names, sizes):
+    """键 "名称@尺寸" 是否在本次 -k / --sizes 选中的范围内。"""
+    name, _, size = key.rpartition("@")
+    return (not names or any(pat in name for pat in names)) and size.isdigit() and int(size) in sizes
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m goai.bench", description="solo-go 热点基准")
+    parser.add_argument("-k", dest="names", action="append", help="只运行名称含此子串的项（可多次）")
+    parser.add_argument("--sizes", default=",".join(map(str, SIZES)), help="棋盘尺寸，如 9,19")
+    parser.add_argument("--backend", default="list", help="棋盘后端：list / flat / bit")
+    parser.add_argument("--min-time", type=float, default=0.2, help="每轮最短计时（秒）")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--save", nargs="?", const=DEFAULT_BASELINE, help="保存结果为基线 JSON")
+    parser.add_argument("--compare", nargs="?", const=DEFAULT_BASELINE, help="与基线 JSON 比较")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="允许的变慢比例，默认 0.25（慢 25%% 以上判为回退）")
+    args = parser.parse_args(argv)
+    sizes = tuple(int(s) for s in args.sizes.split(",") if s)
+
+    def report(key, us):
+        print(f"{key:36s} {us:12.3f} us/op", flush=True)
+
+    results = run(args.names, sizes, args.backend, args.min_time, args.repeat, report)
+    if args.save:
+        save_baseline(args.save, make_baseline(results, args.backend))
+        print(f"baseline saved to {args.save}")
+    if args.compare:
+        try:
+            baseline = load_baseline(args.compare)
+        except FileNotFoundError:
+            print(f"no baseline at {args.compare}, run with --save first", file=sys.stderr)
+            return 2
+        base = baseline["results"] if "results" in baseline else baseline
+        # -k / --sizes 没选中的基线项不算缺失
+        base = {k: v for k, v in base.items() if _selected(k, args.names, sizes)}
+        rows, regressions = compare(base, results, args.threshold)
+        print()
+        for key, base, cur, ratio in rows:
+            if cur is None:
+                print(f"{key:36s} {base:12.3f} ->      MISSING")
+                continue
+            flag = "  REGRESSION" if (key, base, cur, ratio) in regressions else ""
+            print(f"{key:36s} {base:12.3f} -> {cur:12.3f}  x{ratio:5.2f}{flag}")
+        if regressions:
+            missing = sum(1 for r in regressions if r[2] is None)
+            print(f"{len(regressions) - missing} benchmark(s) regressed by more than "
+                  f"{args.threshold:.0%}, {missing} missing")
+            return 1
+        print("no regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
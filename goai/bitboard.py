@@ -0,0 +1,390 @@
+# goai/bitboard.py
+"""
+位棋盘后端：每种颜色一个 Python 大整数位掩码。
+
+- 点 (r,c) 对应第 r * (size+1) + c 位；每行末尾多留一位作隔离列，
+  这样左右移位不会从一行串到下一行，配合盘面掩码 `on` 即可做“膨胀”。
+- 联通块扩张用移位 / 与 / 或的膨胀代替逐点栈式泛洪；求气、提子同理。
+- 整盘查询（所有被叫吃的块、与某色相邻的所有空点、区域计数）只需少量大整数运算。
+- 规则语义与 Board 完全一致（提子、禁止自杀），同样维护 Zobrist 哈希 `hash`。
+"""
+from .board import EMPTY, BLACK, WHITE, UndoRecord, zobrist_keys
+
+_TABLES = {}
+
+class _Tables:
+    """某一 size 的预计算掩码：盘面、每点的邻点、位与坐标互转、Zobrist 键。"""
+    __slots__ = ("size", "stride", "on", "bits", "neighbors", "coords", "zobrist")
+
+    def __init__(self, size):
+        stride = size + 1
+        self.size = size
+        self.stride = stride
+        self.bits = tuple(r * stride + c for r in range(size) for c in range(size))
+        on = 0
+        for b in self.bits:
+            on |= 1 << b
+        self.on = on
+        n = stride * size
+        nbrs = [0] * n
+        coords = [None] * n
+        for b in self.bits:
+            m = 1 << b
+            nbrs[b] = ((m << 1) | (m >> 1) | (m << stride) | (m >> stride)) & on
+            coords[b] = divmod(b, stride)
+        self.neighbors = tuple(nbrs)
+        self.coords = tuple(coords)
+        keys = zobrist_keys(size)
+        self.zobrist = {}
+        for color in (BLACK, WHITE):
+            by_bit = [0] * n
+            for b in self.bits:
+                r, c = coords[b]
+                by_bit[b] = keys[color][r * size + c]
+            self.zobrist[color] = by_bit
+
+def tables(size):
+    t = _TABLES.get(size)
+    if t is None:
+        t = _TABLES[size] = _Tables(size)
+    return t
+
+def iter_bits(x):
+    """依次产出 x 中每个置位的位号。"""
+    while x:
+        low = x & -x
+        yield low.bit_length() - 1
+        x ^= low
+
+
+class _RowView:
+    __slots__ = ("_board", "_r")
+
+    def __init__(self, board, r):
+        self._board = board
+        self._r = r
+
+    def __len__(self):
+        return self._board.size
+
+    def __getitem__(self, c):
+        b = self._board
+        if not 0 <= c < b.size:
+            raise IndexError(c)
+        return b.get(self._r, c)
+
+    def __setitem__(self, c, v):
+        b = self._board
+        if not 0 <= c < b.size:
+            raise IndexError(c)
+        b.set(self._r, c, v)
+
+    def __iter__(self):
+        return (self[c] for c in range(self._board.size))
+
+    def __eq__(self, other):
+        return list(self) == list(other)
+
+
+class _GridView:
+    """与 list-of-lists 兼容的 grid 视图：view[r][c] 读写底层位掩码。"""
+    __slots__ = ("_board",)
+
+    def __init__(self, board):
+        self._board = board
+
+    def __len__(self):
+        return self._board.size
+
+    def __getitem__(self, r):
+        if not 0 <= r < self._board.size:
+            raise IndexError(r)
+        return _RowView(self._board, r)
+
+    def __iter__(self):
+        return (self[r] for r in range(self._board.size))
+
+    def __eq__(self, other):
+        return [list(row) for row in self] == [list(row) for row in other]
+
+
+class BitBoard:
+    __slots__ = ("size", "black", "white", "hash")
+
+    def __init__(self, size=9):
+        self.size = size
+        self.black = 0
+        self.white = 0
+        self.hash = 0
+
+    @property
+    def grid(self):
+        return _GridView(self)
+
+    # ---------- 坐标与单点读写 ----------
+    def bit(self, r, c):
+        return r * (self.size + 1) + c
+
+    def in_bounds(self, r, c):
+        return 0 <= r < self.size and 0 <= c < self.size
+
+    def get(self, r, c):
+        m = 1 << self.bit(r, c)
+        if self.black & m:
+            return BLACK
+        if self.white & m:
+            return WHITE
+        return EMPTY
+
+    def set(self, r, c, v):
+        """直接改写一个点（不提子、不更新哈希），与直接写 Board.grid 等价。"""
+        m = 1 << self.bit(r, c)
+        self.black &= ~m
+        self.white &= ~m
+        if v == BLACK:
+            self.black |= m
+        elif v == WHITE:
+            self.white |= m
+
+    def neighbors(self, r, c):
+        t = tables(self.size)
+        coords = t.coords
+        return [coords[b] for b in iter_bits(t.neighbors[self.bit(r, c)])]
+
+    def stones(self, color):
+        return self.black if color == BLACK else self.white
+
+    def empty(self):
+        return tables(self.size).on & ~(self.black | self.white)
+
+    # ---------- 膨胀 ----------
+    def dilate(self, x):
+        """x 及其四邻（限制在盘面内）。"""
+        t = tables(self.size)
+        s = t.stride
+        return (x | (x << 1) | (x >> 1) | (x << s) | (x >> s)) & t.on
+
+    def grow(self, seed, within):
+        """从 seed 出发在 within 内反复膨胀直到稳定，得到 seed 所在的全部联通块。"""
+        t = tables(self.size)
+        s, on = t.stride, t.on
+        g = seed
+        while True:
+            ng = (g | (g << 1) | (g >> 1) | (g << s) | (g >> s)) & on & within
+            if ng == g:
+                return g
+            g = ng
+
+    def liberty_mask(self, chain):
+        return self.dilate(chain) & self.empty()
+
+    # ---------- 整盘查询 ----------
+    def atari_stones(self, color):
+        """color 方所有只剩一口气的块的棋子掩码。"""
+        own = self.stones(color)
+        empty = self.empty()
+        result = 0
+        rest = own
+        while rest:
+            chain = self.grow(rest & -rest, own)
+            rest &= ~chain
+            libs = self.dilate(chain) & empty
+            if libs and not libs & (libs - 1):
+                result |= chain
+        return result
+
+    def empty_adjacent_to(self, color):
+        """与 color 方棋子相邻的所有空点掩码。"""
+        return self.dilate(self.stones(color)) & self.empty()
+
+    def legal_mask(self, color):
+        """color 方全部合法点的掩码：有空邻点的空点整批判定，只对其余少数空点逐个检查。"""
+        t = tables(self.size)
+        s = t.stride
+        empty = self.empty()
+        touching_empty = ((empty << 1) | (empty >> 1) | (empty << s) | (empty >> s)) & t.on
+        legal = empty & touching_empty
+        coords = t.coords
+        for b in iter_bits(empty & ~touching_empty):
+            if self.is_legal(*coords[b], color):
+                legal |= 1 << b
+        return legal
+
+    def legal_moves(self, color):
+        coords = tables(self.size).coords
+        return [coords[b] for b in iter_bits(self.legal_mask(color))]
+
+    def area_counts(self):
+        """中国规则的区域计数 (黑子+黑地, 白子+白地)：只被一色包围的空区域算该色的地。"""
+        black, white = self.black, self.white
+        empty = self.empty()
+        b_area = bin(black).count("1")
+        w_area = bin(white).count("1")
+        rest = empty
+        while rest:
+            region = self.grow(rest & -rest, empty)
+            rest &= ~region
+            border = self.dilate(region) & ~region
+            n = bin(region).count("1")
+            if border & black and not border & white:
+                b_area += n
+            elif border & white and not border & black:
+                w_area += n
+        return b_area, w_area
+
+    # ---------- 与 Board 兼容的块查询 ----------
+    def _group_and_liberties(self, r, c):
+        assert self.get(r, c) != EMPTY
+        coords = tables(self.size).coords
+        chain = self.grow(1 << self.bit(r, c), self.stones(self.get(r, c)))
+        libs = self.liberty_mask(chain)
+        return {coords[b] for b in iter_bits(chain)}, {coords[b] for b in iter_bits(libs)}
+
+    def chain(self, r, c):
+        coords = tables(self.size).coords
+        chain = self.grow(1 << self.bit(r, c), self.stones(self.get(r, c)))
+        return [coords[b] for b in iter_bits(chain)]
+
+    def liberties(self, r, c):
+        return self._group_and_liberties(r, c)[1]
+
+    # ---------- 合法性判定 ----------
+    def is_legal(self, row, col, color):
+        if not self.in_bounds(row, col):
+            return False
+        b = self.bit(row, col)
+        m = 1 << b
+        own, enemy = (self.black, self.white) if color == BLACK else (self.white, self.black)
+        if (own | enemy) & m:
+            return False
+        nb = tables(self.size).neighbors[b]
+        empty = self.empty()
+        if nb & empty:
+            return True
+        # 相邻己块合并后除本点外仍有气
+        if nb & own:
+            chain = self.grow(nb & own, own)
+            if self.dilate(chain) & empty & ~m:
+                return True
+        # 相邻敌块只剩本点这一口气（可提子）
+        for e in iter_bits(nb & enemy):
+            chain = self.grow(1 << e, enemy)
+            if self.dilate(chain) & empty == m:
+                return True
+        return False
+
+    # ---------- 实际落子（含提子） ----------
+    def place(self, row, col, color):
+        if not self.is_legal(row, col, color):
+            return False
+        self._play(self.bit(row, col), color)
+        return True
+
+    def play_move(self, row, col, color):
+        if not self.is_legal(row, col, color):
+            return None
+        coords = tables(self.size).coords
+        captured = self._play(self.bit(row, col), color)
+        return UndoRecord((row, col), color, tuple(coords[b] for b in iter_bits(captured)))
+
+    def _play(self, b, color):
+        """无检查地落子并提子，返回被提棋子的掩码。"""
+        t = tables(self.size)
+        m = 1 << b
+        if color == BLACK:
+            self.black |= m
+            enemy = self.white
+        else:
+            self.white |= m
+            enemy = self.black
+        self.hash ^= t.zobrist[color][b]
+        empty = self.empty()
+        captured = 0
+        for e in iter_bits(t.neighbors[b] & enemy):
+            if captured >> e & 1:
+                continue
+            chain = self.grow(1 << e, enemy)
+            if not self.dilate(chain) & empty:
+                captured |= chain
+        if captured:
+            if color == BLACK:
+                self.white &= ~captured
+            else:
+                self.black &= ~captured
+            keys = t.zobrist[-color]
+            for s in iter_bits(captured):
+                self.hash ^= keys[s]
+        return captured
+
+    def undo(self, record):
+        (row, col), color, captured = record
+        t = tables(self.size)
+        b = self.bit(row, col)
+        h = self.hash ^ t.zobrist[color][b]
+        cap = 0
+        keys = t.zobrist[-color]
+        for (r, c) in captured:
+            cb = self.bit(r, c)
+            cap |= 1 << cb
+            h ^= keys[cb]
+        if color == BLACK:
+            self.black &= ~(1 << b)
+            self.white |= cap
+        else:
+            self.white &= ~(1 << b)
+            self.black |= cap
+        self.hash = h
+
+    def hash_after(self, row, col, color):
+        t = tables(self.size)
+        b = self.bit(row, col)
+        m = 1 << b
+        enemy = self.white if color == BLACK else self.black
+        empty = self.empty()
+        h = self.hash ^ t.zobrist[color][b]
+        captured = 0
+        for e in iter_bits(t.neighbors[b] & enemy):
+            if captured >> e & 1:
+                continue
+            chain = self.grow(1 << e, enemy)
+            if self.dilate(chain) & empty == m:
+                captured |= chain
+        keys = t.zobrist[-color]
+        for s in iter_bits(captured):
+            h ^= keys[s]
+        return h
+
+    def _rebuild(self):
+        """按当前棋子重算哈希（整盘导入或直接改写 grid 之后调用）。"""
+        t = tables(self.size)
+        h = 0
+        for b in iter_bits(self.black):
+            h ^= t.zobrist[BLACK][b]
+        for b in iter_bits(self.white):
+            h ^= t.zobrist[WHITE][b]
+        self.hash = h
+
+    # ---------- 显示 ----------
+    def display(self):
+        header = "   " + " ".join([chr(ord('A') + i) for i in range(self.size)])
+        print(header)
+        for r in range(self.size):
+            row_cells = [self._symbol(v) for v in self.grid[r]]
+            print(f"{self.size - r:2} " + " ".join(row_cells))
+        print()
+
+    def _symbol(self, v):
+        if v == BLACK:
+            return "●"
+        if v == WHITE:
+            return "○"
+        return "+"
+
+    # ---------- 内部：拷贝 ----------
+    def _copy(self):
+        b = BitBoard.__new__(BitBoard)
+        b.size = self.size
+        b.black = self.black
+        b.white = self.white
+        b.hash = self.hash
+        return b
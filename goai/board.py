@@ -1,10 +1,48 @@
 # goai/board.py
+import random
+from collections import namedtuple
+
+from . import instrument
+
 EMPTY, BLACK, WHITE = 0, 1, -1
 
+# 一手棋的撤销记录：落子点 (r,c)、颜色、被提棋子坐标元组
+UndoRecord = namedtuple("UndoRecord", "point color captured")
+
+# ---------- Zobrist 哈希 ----------
+# 每个 (颜色, 点) 一个 64 位随机键，局面哈希 = 所有棋子键的异或。
+# 键表按 size 缓存并使用固定种子，同一局面在不同进程中哈希一致，可直接作置换表的键。
+_ZOBRIST = {}
+
+def zobrist_keys(size):
+    """返回 {BLACK: [...], WHITE: [...]}，下标为 r * size + c。"""
+    keys = _ZOBRIST.get(size)
+    if keys is None:
+        rng = random.Random(0x5EED0000 + size)
+        n = size * size
+        keys = _ZOBRIST[size] = {
+            BLACK: [rng.getrandbits(64) for _ in range(n)],
+            WHITE: [rng.getrandbits(64) for _ in range(n)],
+        }
+    return keys
+
 class Board:
     def __init__(self, size=9):
         self.size = size
         self.grid = [[EMPTY for _ in range(size)] for _ in range(size)]
+        # 联通块（chain）的增量结构，随每次落子/提子原地更新：
+        #   _parent: 点 -> 并查集父节点（根即块 id）
+        #   _stones: 根 -> 该块的棋子列表
+        #   _libs:   根 -> 该块的气集合
+        self._parent = {}
+        self._stones = {}
+        self._libs = {}
+        # play_move 的合并记录栈，与未撤销的 UndoRecord 一一对应：(落子点, 合并信息或 None)。
+        # undo 据此直接还原被合并的块，不必泛洪重建（见 _play / undo）
+        self._trail = []
+        # 局面的 Zobrist 哈希（空盘为 0），随落子/提子/撤销增量异或
+        self.hash = 0
+        self._zobrist = zobrist_keys(size)
 
     # ---------- 基础工具 ----------
     def in_bounds(self, r, c):
@@ -32,56 +70,244 @@ class Board:
                 elif v == color and (nx, ny) not in stones:
                     stones.add((nx, ny))
                     stack.append((nx, ny))
+        if instrument.enabled:
+            instrument.count("board.flood_fills")
+            instrument.count("board.flood_nodes", len(stones))
         return stones, liberties
 
+    # ---------- 联通块（并查集） ----------
+    def _find(self, p):
+        parent = self._parent
+        while parent[p] != p:
+            # 路径减半
+            parent[p] = parent[parent[p]]
+            p = parent[p]
+        return p
+
+    def _remove_chain(self, root):
+        """提掉以 root 为根的整块，把腾出的点加回相邻块的气。返回被提的棋子列表。"""
+        grid = self.grid
+        stones = self._stones.pop(root)
+        del self._libs[root]
+        keys = self._zobrist[grid[root[0]][root[1]]]
+        size = self.size
+        h = self.hash
+        for (sx, sy) in stones:
+            grid[sx][sy] = EMPTY
+            del self._parent[(sx, sy)]
+            h ^= keys[sx * size + sy]
+        self.hash = h
+        for s in stones:
+            for nx, ny in self.neighbors(*s):
+                if grid[nx][ny] != EMPTY:
+                    self._libs[self._find((nx, ny))].add(s)
+        return stones
+
+    def chain(self, r, c):
+        """返回 (r,c) 所在块的棋子列表（内部结构，只读）。"""
+        return self._stones[self._find((r, c))]
+
+    def liberties(self, r, c):
+        """返回 (r,c) 所在块的气集合（内部结构，只读）。"""
+        return self._libs[self._find((r, c))]
+
     # ---------- 合法性判定 ----------
     def is_legal(self, row, col, color):
-        """判断把 `color` 落在 (row,col) 是否合法（包含提子与自杀判定）。"""
+        """判断把 `color` 落在 (row,col) 是否合法（包含提子与自杀判定）。
+
+        只看相邻块的气数，不拷贝棋盘、不做泛洪：
+        相邻有空点、相邻己块气数 > 1、或相邻敌块只剩这一口气（可提子）时合法。
+        """
+        if instrument.enabled:
+            instrument.count("board.is_legal")
         if not self.in_bounds(row, col):
             return False
-        if self.grid[row][col] != EMPTY:
+        grid = self.grid
+        if grid[row][col] != EMPTY:
             return False
-
-        # 在一个临时拷贝上模拟此手（先落子→提掉对方无气的块→看己方是否仍无气）
-        temp = self._copy()
-        temp.grid[row][col] = color
-
-        # 提掉相邻敌块（若无气）
-        captured = 0
-        for nx, ny in temp.neighbors(row, col):
-            if temp.grid[nx][ny] == -color:
-                stones, libs = temp._group_and_liberties(nx, ny)
-                if not libs:
-                    for (sx, sy) in stones:
-                        temp.grid[sx][sy] = EMPTY
-                    captured += len(stones)
-
-        # 检查己方这块是否有气；若没有且没有提子，则为自杀手→非法
-        stones, libs = temp._group_and_liberties(row, col)
-        if not libs and captured == 0:
-            return False
-        return True
+        for nx, ny in self.neighbors(row, col):
+            v = grid[nx][ny]
+            if v == EMPTY:
+                return True
+            n_libs = len(self._libs[self._find((nx, ny))])
+            if v == color:
+                if n_libs > 1:
+                    return True
+            elif n_libs == 1:
+                return True
+        return False
 
     # ---------- 实际落子（含提子） ----------
     def place(self, row, col, color):
         """
         执行一手棋：若非法返回 False；合法则真实落子并完成提子，返回 True。
-        （不实现劫规则；后续需要可以在此添加 ko 处理）
+        （棋盘只管单个局面；劫/全局同形由 GameManager 借助 self.hash 判定）
         """
         if not self.is_legal(row, col, color):
             return False
+        self._play(row, col, color)
+        return True
+
+    # ---------- 走子 / 撤销（搜索用） ----------
+    def play_move(self, row, col, color):
+        """与 place 相同，但返回撤销记录 UndoRecord；非法时返回 None。"""
+        if not self.is_legal(row, col, color):
+            return None
+        captured = self._play(row, col, color)
+        self._trail.append(((row, col), self._merge))
+        return UndoRecord((row, col), color, tuple(captured))
+
+    def hash_after(self, row, col, color):
+        """不落子，直接算出在 (row,col) 下 `color` 后的局面哈希（调用方需保证合法）。"""
+        size = self.size
+        keys = self._zobrist
+        h = self.hash ^ keys[color][row * size + col]
+        grid = self.grid
+        seen = set()
+        enemy_keys = keys[-color]
+        for nx, ny in self.neighbors(row, col):
+            if grid[nx][ny] == -color:
+                root = self._find((nx, ny))
+                if root not in seen and len(self._libs[root]) == 1:
+                    seen.add(root)
+                    for (sx, sy) in self._stones[root]:
+                        h ^= enemy_keys[sx * size + sy]
+        return h
+
+    def undo(self, record):
+        """撤销 play_move 返回的最近一手，精确恢复局面与联通块。
+
+        落子所在块按 _trail 中的合并记录直接还原（截短棋子列表、放回原来的气集合）；
+        记录对不上时（如中间拷贝过棋盘、撤销了别的着法）再泛洪重建拆开的块。
+        被提的块总是泛洪重建。代价为 O(变动的棋子数)，不拷贝整盘。
+        """
+        grid = self.grid
+        (row, col), color, captured = record
+        size = self.size
+        h = self.hash ^ self._zobrist[color][row * size + col]
+        enemy_keys = self._zobrist[-color]
+        for (sx, sy) in captured:
+            h ^= enemy_keys[sx * size + sy]
+        self.hash = h
+        # 拆掉落子所在块，拿走落子
+        p = (row, col)
+        merge = None
+        trail = self._trail
+        if trail and trail[-1][0] == p:
+            merge = trail.pop()[1]
+        root = self._find(p)
+        rest = ()
+        if merge is not None and merge[0] == root and self._stones[root] is merge[1]:
+            big, stones, n, libs, others = merge
+            del stones[n:]
+            self._libs[big] = libs
+            del self._parent[p]
+            for r, chain, chain_libs in others:
+                self._stones[r] = chain
+                self._libs[r] = chain_libs
+                for s in chain:
+                    self._parent[s] = r
+        else:
+            rest = self._stones.pop(root)
+            del self._libs[root]
+            for s in rest:
+                del self._parent[s]
+        grid[row][col] = EMPTY
+        # 放回被提的棋子，占掉的点不再是相邻己块的气
+        for (sx, sy) in captured:
+            grid[sx][sy] = -color
+        for s in captured:
+            for nx, ny in self.neighbors(*s):
+                if grid[nx][ny] == color and (nx, ny) in self._parent:
+                    self._libs[self._find((nx, ny))].discard(s)
+        # 落子点重新成为相邻敌块的气（被提块稍后整体重建）
+        for nx, ny in self.neighbors(row, col):
+            if grid[nx][ny] == -color and (nx, ny) in self._parent:
+                self._libs[self._find((nx, ny))].add((row, col))
+        # 重建拆掉的块与被提的块
+        for s in rest:
+            if s != (row, col) and s not in self._parent:
+                self._build_chain(s)
+        for s in captured:
+            if s not in self._parent:
+                self._build_chain(s)
 
-        # 真正落子
-        self.grid[row][col] = color
+    def _build_chain(self, p):
+        """从 grid 泛洪求出 p 所在块并登记到联通块结构中。"""
+        stones, libs = self._group_and_liberties(*p)
+        for s in stones:
+            self._parent[s] = p
+        self._stones[p] = list(stones)
+        self._libs[p] = libs
 
-        # 提掉相邻敌块（若无气）
-        for nx, ny in list(self.neighbors(row, col)):
-            if self.grid[nx][ny] == -color:
-                stones, libs = self._group_and_liberties(nx, ny)
+    def _play(self, row, col, color):
+        """无检查地落子并更新联通块，返回被提棋子列表。调用方需保证合法。"""
+        grid = self.grid
+        p = (row, col)
+        grid[row][col] = color
+        self.hash ^= self._zobrist[color][row * self.size + col]
+        self._parent[p] = p
+        self._stones[p] = [p]
+        self._libs[p] = {(nx, ny) for nx, ny in self.neighbors(row, col)
+                         if grid[nx][ny] == EMPTY}
+
+        # 先与相邻己块合并：并入最大的块，其余块的棋子列表与气集合原样留给撤销用
+        friends = []
+        for nx, ny in self.neighbors(row, col):
+            if grid[nx][ny] == color:
+                other = self._find((nx, ny))
+                if other not in friends:
+                    friends.append(other)
+        self._merge = None
+        if friends:
+            stones_of = self._stones
+            libs_of = self._libs
+            big = max(friends, key=lambda r: len(stones_of[r]))
+            stones = stones_of[big]
+            libs = libs_of.pop(p)
+            self._merge = (big, stones, len(stones), libs_of[big],
+                           [(r, stones_of[r], libs_of[r]) for r in friends if r != big])
+            del stones_of[p]
+            for r in friends:
+                libs |= libs_of[r]
+                if r != big:
+                    self._parent[r] = big
+                    stones.extend(stones_of.pop(r))
+                    del libs_of[r]
+            libs.discard(p)
+            self._parent[p] = big
+            stones.append(p)
+            libs_of[big] = libs
+
+        # 再处理相邻敌块：减气，无气则提掉
+        captured = []
+        for nx, ny in self.neighbors(row, col):
+            if grid[nx][ny] == -color:
+                other = self._find((nx, ny))
+                libs = self._libs[other]
+                libs.discard(p)
                 if not libs:
-                    for (sx, sy) in stones:
-                        self.grid[sx][sy] = EMPTY
-        return True
+                    captured.extend(self._remove_chain(other))
+        if captured and instrument.enabled:
+            instrument.count("board.captures", len(captured))
+        return captured
+
+    def _rebuild(self):
+        """按当前 grid 重建联通块与哈希（整盘导入或直接改写 grid 之后调用）。"""
+        self._parent = {}
+        self._stones = {}
+        self._libs = {}
+        self._trail = []
+        size = self.size
+        h = 0
+        for r in range(size):
+            for c in range(size):
+                v = self.grid[r][c]
+                if v != EMPTY:
+                    h ^= self._zobrist[v][r * size + c]
+                    if (r, c) not in self._parent:
+                        self._build_chain((r, c))
+        self.hash = h
 
     # ---------- 显示 ----------
     def display(self):
@@ -99,8 +325,84 @@ class Board:
             return "○"
         return "+"
 
-    # ---------- 内部：浅拷贝 ----------
+    # ---------- 内部：拷贝 ----------
     def _copy(self):
+        if instrument.enabled:
+            instrument.count("board.copy")
         b = Board(self.size)
         b.grid = [row[:] for row in self.grid]
+        b._parent = dict(self._parent)
+        b._stones = {k: list(v) for k, v in self._stones.items()}
+        b._libs = {k: set(v) for k, v in self._libs.items()}
+        b.hash = self.hash
         return b
+
+
+# ---------- 后端切换 ----------
+BACKENDS = ("list", "flat", "bit")
+
+def make_board(size=9, backend="list"):
+    """按名字创建棋盘：'list' 为默认的 Board，'flat' 为紧凑的 FlatBoard，'bit' 为位棋盘 BitBoard。"""
+    if backend == "list":
+        return Board(size)
+    if backend == "flat":
+        from .flat_board import FlatBoard
+        return FlatBoard(size)
+    if backend == "bit":
+        from .bitboard import BitBoard
+        return BitBoard(size)
+    raise ValueError(f"unknown board backend: {backend!r}")
+
+
+# ---------- 紧凑序列化 ----------
+# 格式：1 字节 size + 每点 2 位（0 空 / 1 黑 / 2 白），每字节 4 个点。
+# 19x19 共 92 字节，用于跨进程传局面、存档检查点等，不必 pickle 嵌套列表。
+_CODE = {EMPTY: 0, BLACK: 1, WHITE: 2}
+_VALUE = (EMPTY, BLACK, WHITE, EMPTY)
+
+def pack_board(board):
+    size = board.size
+    out = bytearray(1 + (size * size + 3) // 4)
+    out[0] = size
+    i = 0
+    for row in board.grid:
+        for v in row:
+            if v != EMPTY:
+                out[1 + (i >> 2)] |= _CODE[v] << ((i & 3) << 1)
+            i += 1
+    return bytes(out)
+
+def unpack_board(data, backend="list"):
+    """pack_board 的逆操作，返回指定后端的棋盘（联通块与哈希已重建）。"""
+    size = data[0]
+    board = make_board(size, backend)
+    grid = board.grid
+    for i in range(size * size):
+        v = _VALUE[(data[1 + (i >> 2)] >> ((i & 3) << 1)) & 3]
+        if v != EMPTY:
+            grid[i // size][i % size] = v
+    board._rebuild()
+    return board
+
+
+# 着法记录：每手 2 字节（小端 uint16），值为 (r * size + c) * 2 + (1 if 白)。
+# 配合 pack_board 存对局：局面 + 着法序列即可完整重建历史（悔棋、同形判定）。
+def pack_moves(moves, size):
+    """moves: 可迭代的 (r, c, color) 或 UndoRecord；返回 bytes。"""
+    out = bytearray()
+    for m in moves:
+        if isinstance(m, UndoRecord):
+            (r, c), color = m.point, m.color
+        else:
+            r, c, color = m
+        v = (r * size + c) * 2 + (color == WHITE)
+        out.append(v & 0xFF)
+        out.append(v >> 8)
+    return bytes(out)
+
+def unpack_moves(data, size):
+    """pack_moves 的逆操作，逐手产出 (r, c, color)。"""
+    for i in range(0, len(data) - 1, 2):
+        v = data[i] | (data[i + 1] << 8)
+        r, c = divmod(v >> 1, size)
+        yield r, c, WHITE if v & 1 else BLACK
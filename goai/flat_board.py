@@ -0,0 +1,335 @@
+# goai/flat_board.py
+"""
+紧凑棋盘后端：整盘存成一条带边框哨兵的一维 array('b')。
+
+- 每个点占 1 字节，19x19 只需 21*21 = 441 字节，适合同时持有成千上万个局面。
+- 邻点表按 size 预计算并缓存（9/13/19 共享），泛洪循环里不再做越界判断、不再生成元组。
+- `grid` 提供与 Board.grid 兼容的二维视图（可读可写），GUI / GameManager 无需改动。
+- 规则语义与 Board 完全一致（提子、禁止自杀），同样维护 Zobrist 哈希 `hash`。
+"""
+from array import array
+from .board import EMPTY, BLACK, WHITE, UndoRecord, zobrist_keys
+
+BORDER = 2
+
+# size -> _Tables
+_TABLES = {}
+
+class _Tables:
+    """某一 size 的预计算表：步长、盘内索引、邻点、索引与坐标互转。"""
+    __slots__ = ("size", "stride", "points", "neighbors", "coords", "template", "zobrist")
+
+    def __init__(self, size):
+        stride = size + 2
+        self.size = size
+        self.stride = stride
+        self.points = tuple((r + 1) * stride + (c + 1) for r in range(size) for c in range(size))
+        offsets = (-stride, stride, -1, 1)
+        nbrs = [()] * (stride * stride)
+        coords = [None] * (stride * stride)
+        template = array('b', [BORDER]) * (stride * stride)
+        for idx in self.points:
+            template[idx] = EMPTY
+        for idx in self.points:
+            nbrs[idx] = tuple(idx + d for d in offsets if template[idx + d] != BORDER)
+            coords[idx] = divmod(idx, stride)[0] - 1, idx % stride - 1
+        self.neighbors = tuple(nbrs)
+        self.coords = tuple(coords)
+        self.template = template
+        # Zobrist 键按一维索引重排，与 Board 的哈希值一致
+        keys = zobrist_keys(size)
+        self.zobrist = {}
+        for color in (BLACK, WHITE):
+            by_idx = [0] * (stride * stride)
+            for idx in self.points:
+                r, c = coords[idx]
+                by_idx[idx] = keys[color][r * size + c]
+            self.zobrist[color] = by_idx
+
+def tables(size):
+    t = _TABLES.get(size)
+    if t is None:
+        t = _TABLES[size] = _Tables(size)
+    return t
+
+
+class _RowView:
+    __slots__ = ("_cells", "_base", "_size")
+
+    def __init__(self, cells, base, size):
+        self._cells = cells
+        self._base = base
+        self._size = size
+
+    def __len__(self):
+        return self._size
+
+    def __getitem__(self, c):
+        if not 0 <= c < self._size:
+            raise IndexError(c)
+        return self._cells[self._base + c]
+
+    def __setitem__(self, c, v):
+        if not 0 <= c < self._size:
+            raise IndexError(c)
+        self._cells[self._base + c] = v
+
+    def __iter__(self):
+        cells, base = self._cells, self._base
+        return iter(cells[base:base + self._size].tolist())
+
+    def __eq__(self, other):
+        return list(self) == list(other)
+
+
+class _GridView:
+    """与 list-of-lists 兼容的 grid 视图：view[r][c] 读写底层一维数组。"""
+    __slots__ = ("_board",)
+
+    def __init__(self, board):
+        self._board = board
+
+    def __len__(self):
+        return self._board.size
+
+    def __getitem__(self, r):
+        b = self._board
+        if not 0 <= r < b.size:
+            raise IndexError(r)
+        return _RowView(b.cells, (r + 1) * (b.size + 2) + 1, b.size)
+
+    def __iter__(self):
+        return (self[r] for r in range(self._board.size))
+
+    def __eq__(self, other):
+        return [list(row) for row in self] == [list(row) for row in other]
+
+
+class FlatBoard:
+    __slots__ = ("size", "cells", "hash")
+
+    def __init__(self, size=9):
+        self.size = size
+        self.cells = array('b', tables(size).template)
+        self.hash = 0
+
+    @property
+    def grid(self):
+        return _GridView(self)
+
+    # ---------- 坐标 ----------
+    def index(self, r, c):
+        return (r + 1) * (self.size + 2) + (c + 1)
+
+    def in_bounds(self, r, c):
+        return 0 <= r < self.size and 0 <= c < self.size
+
+    def neighbors(self, r, c):
+        t = tables(self.size)
+        coords = t.coords
+        return [coords[n] for n in t.neighbors[self.index(r, c)]]
+
+    # ---------- 泛洪 ----------
+    def _chain_from(self, idx):
+        """从 idx 出发求整块，返回 (stones_list, liberties_set)，均为一维索引。"""
+        cells = self.cells
+        nbrs = tables(self.size).neighbors
+        color = cells[idx]
+        stones = [idx]
+        seen = {idx}
+        libs = set()
+        i = 0
+        while i < len(stones):
+            for n in nbrs[stones[i]]:
+                v = cells[n]
+                if v == EMPTY:
+                    libs.add(n)
+                elif v == color and n not in seen:
+                    seen.add(n)
+                    stones.append(n)
+            i += 1
+        return stones, libs
+
+    def _has_liberty_other_than(self, idx, point):
+        """idx 所在块除 point 外是否还有气（找到即提前返回）。"""
+        cells = self.cells
+        nbrs = tables(self.size).neighbors
+        color = cells[idx]
+        stack = [idx]
+        seen = {idx}
+        while stack:
+            for n in nbrs[stack.pop()]:
+                v = cells[n]
+                if v == EMPTY:
+                    if n != point:
+                        return True
+                elif v == color and n not in seen:
+                    seen.add(n)
+                    stack.append(n)
+        return False
+
+    def _group_and_liberties(self, r, c):
+        """与 Board._group_and_liberties 相同：返回 (stones_set, liberties_set)，坐标为 (r,c)。"""
+        assert self.grid[r][c] != EMPTY
+        coords = tables(self.size).coords
+        stones, libs = self._chain_from(self.index(r, c))
+        return {coords[i] for i in stones}, {coords[i] for i in libs}
+
+    def chain(self, r, c):
+        coords = tables(self.size).coords
+        return [coords[i] for i in self._chain_from(self.index(r, c))[0]]
+
+    def liberties(self, r, c):
+        coords = tables(self.size).coords
+        return {coords[i] for i in self._chain_from(self.index(r, c))[1]}
+
+    # ---------- 合法性判定 ----------
+    def is_legal(self, row, col, color):
+        if not self.in_bounds(row, col):
+            return False
+        idx = self.index(row, col)
+        cells = self.cells
+        if cells[idx] != EMPTY:
+            return False
+        for n in tables(self.size).neighbors[idx]:
+            v = cells[n]
+            if v == EMPTY:
+                return True
+            has_other = self._has_liberty_other_than(n, idx)
+            if v == color:
+                if has_other:
+                    return True
+            elif not has_other:
+                return True
+        return False
+
+    # ---------- 实际落子（含提子） ----------
+    def place(self, row, col, color):
+        if not self.is_legal(row, col, color):
+            return False
+        self._play(self.index(row, col), color)
+        return True
+
+    def play_move(self, row, col, color):
+        """与 Board.play_move 相同：返回 UndoRecord，非法时返回 None。"""
+        if not self.is_legal(row, col, color):
+            return None
+        coords = tables(self.size).coords
+        captured = self._play(self.index(row, col), color)
+        return UndoRecord((row, col), color, tuple(coords[i] for i in captured))
+
+    def undo(self, record):
+        (row, col), color, captured = record
+        cells = self.cells
+        keys = tables(self.size).zobrist
+        idx = self.index(row, col)
+        cells[idx] = EMPTY
+        h = self.hash ^ keys[color][idx]
+        for (r, c) in captured:
+            idx = self.index(r, c)
+            cells[idx] = -color
+            h ^= keys[-color][idx]
+        self.hash = h
+
+    def hash_after(self, row, col, color):
+        """不落子，直接算出在 (row,col) 下 `color` 后的局面哈希（调用方需保证合法）。"""
+        idx = self.index(row, col)
+        cells = self.cells
+        t = tables(self.size)
+        h = self.hash ^ t.zobrist[color][idx]
+        enemy_keys = t.zobrist[-color]
+        seen = set()
+        for n in t.neighbors[idx]:
+            if cells[n] == -color and n not in seen:
+                stones, libs = self._chain_from(n)
+                seen.update(stones)
+                if libs == {idx}:
+                    for s in stones:
+                        h ^= enemy_keys[s]
+        return h
+
+    def _play(self, idx, color):
+        """无检查地落子并提子，返回被提棋子的一维索引列表。"""
+        cells = self.cells
+        t = tables(self.size)
+        cells[idx] = color
+        h = self.hash ^ t.zobrist[color][idx]
+        enemy_keys = t.zobrist[-color]
+        captured = []
+        for n in t.neighbors[idx]:
+            if cells[n] == -color:
+                stones, libs = self._chain_from(n)
+                if not libs:
+                    for s in stones:
+                        cells[s] = EMPTY
+                        h ^= enemy_keys[s]
+                    captured.extend(stones)
+        self.hash = h
+        return captured
+
+    def _rebuild(self):
+        """按当前棋子重算哈希（整盘导入或直接改写 grid 之后调用）。"""
+        t = tables(self.size)
+        cells = self.cells
+        h = 0
+        for idx in t.points:
+            v = cells[idx]
+            if v != EMPTY:
+                h ^= t.zobrist[v][idx]
+        self.hash = h
+
+    # ---------- 显示 ----------
+    def display(self):
+        header = "   " + " ".join([chr(ord('A') + i) for i in range(self.size)])
+        print(header)
+        for r in range(self.size):
+            row_cells = [self._symbol(v) for v in self.grid[r]]
+            print(f"{self.size - r:2} " + " ".join(row_cells))
+        print()
+
+    def _symbol(self, v):
+        if v == BLACK:
+            return "●"
+        if v == WHITE:
+            return "○"
+        return "+"
+
+    # ---------- 内部：拷贝 ----------
+    def _copy(self):
+        b = FlatBoard.__new__(FlatBoard)
+        b.size = self.size
+        b.cells = array('b', self.cells)
+        b.hash = self.hash
+        return b
+
+
+# 手动对比各后端：`python -m goai.flat_board [size] [games]`
+if __name__ == "__main__":
+    import random
+    import sys
+    import time
+    import tracemalloc
+    from .board import make_board, BACKENDS
+
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 19
+    games = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    for backend in BACKENDS:
+        rng = random.Random(0)
+        moves = 0
+        start = time.perf_counter()
+        for _ in range(games):
+            b = make_board(size, backend)
+            color = BLACK
+            for _ in range(size * size * 2):
+                legal = [(r, c) for r in range(size) for c in range(size) if b.is_legal(r, c, color)]
+                if not legal:
+                    break
+                b.place(*rng.choice(legal), color)
+                color = -color
+                moves += 1
+        elapsed = time.perf_counter() - start
+        tracemalloc.start()
+        held = [make_board(size, backend) for _ in range(1000)]
+        mem = tracemalloc.get_traced_memory()[0] / len(held)
+        tracemalloc.stop()
+        print(f"{backend:5s} {moves / elapsed:10.0f} moves/s   {mem:8.0f} bytes/empty board")
@@ -1,5 +1,8 @@
 # GameManager: 管理回合、落子、胜负判定（当一方无法下法时视为认输/结束）
-from .board import Board, EMPTY, BLACK, WHITE
+from .board import Board, EMPTY, BLACK, WHITE, make_board
+from .ai import SimpleAI
+from .scoring import DEFAULT_KOMI, score_area, estimate_dead_stones
+from . import instrument
 
 class GameResult:
     ONGOING = "ongoing"
@@ -8,29 +11,95 @@ class GameResult:
     DRAW = "draw"
 
 class GameManager:
-    def __init__(self, size=19, ai=None, human_color=BLACK):
+    def __init__(self, size=19, ai=None, human_color=BLACK, backend="list", komi=DEFAULT_KOMI):
         """
         ai: SimpleAI 实例或 None（如果不需要 AI）
         human_color: BLACK 或 WHITE，表示玩家执子颜色
+        backend: 棋盘后端，'list'（Board）/ 'flat'（FlatBoard）/ 'bit'（BitBoard），见 board.make_board
+        komi: 贴目（中国规则数子时使用）
         """
-        self.board = Board(size=size)
+        self.board = make_board(size, backend)
         self.size = size
         self.to_move = BLACK  # 黑先
         self.ai = ai
         self.human_color = human_color
         self.ai_color = WHITE if human_color == BLACK else BLACK
+        self.komi = komi
         self.result = GameResult.ONGOING
+        # 终局数子结果（ScoreResult），未数子时为 None
+        self.score_result = None
+        # 开局前摆好的棋子 [(r, c, color)]（如 SGF 的让子 / 死活题 AB、AW），不进 history
+        self.setup = []
+        # 已下着法的撤销记录栈（悔棋用）
+        self.history = []
+        # 出现过的局面哈希（全局同形禁着：简单劫与多劫循环都在此 O(1) 拒绝）
+        self.seen_hashes = {self.board.hash}
+        # 每方的棋盘合法点集合（不含劫判定），只在着法波及的点附近增量更新
+        self.legal_points = {BLACK: set(), WHITE: set()}
+        self.sync_legal_moves()
+        # 自上次 take_changed_points() 以来颜色可能变化的点（落子点与被提点），供界面增量重绘
+        self.changed_points = set()
 
     def is_human_turn(self):
         return self.to_move == self.human_color
 
+    def is_legal_move(self, r, c, color):
+        """对局层面的合法性：棋盘合法且不重复以前出现过的局面（positional superko）。"""
+        if not self.board.is_legal(r, c, color):
+            return False
+        return self.board.hash_after(r, c, color) not in self.seen_hashes
+
     def legal_moves_for(self, color):
-        moves = []
-        for r in range(self.size):
-            for c in range(self.size):
-                if self.board.grid[r][c] == EMPTY and self.board.is_legal(r, c, color):
-                    moves.append((r, c))
-        return moves
+        """返回 color 的全部合法着法（按坐标排序）。读增量维护的集合，不扫全盘。"""
+        seen = self.seen_hashes
+        hash_after = self.board.hash_after
+        return sorted(p for p in self.legal_points[color]
+                      if hash_after(p[0], p[1], color) not in seen)
+
+    def has_legal_move(self, color):
+        """color 是否至少有一个合法着法；找到第一个即返回。"""
+        seen = self.seen_hashes
+        hash_after = self.board.hash_after
+        for p in self.legal_points[color]:
+            if hash_after(p[0], p[1], color) not in seen:
+                return True
+        return False
+
+    def sync_legal_moves(self):
+        """全盘重算合法点集合；直接改动 self.board 之后需调用一次。"""
+        board = self.board
+        for color in (BLACK, WHITE):
+            self.legal_points[color] = {
+                (r, c) for r in range(self.size) for c in range(self.size)
+                if board.grid[r][c] == EMPTY and board.is_legal(r, c, color)
+            }
+
+    def _update_legal_moves(self, record):
+        """
+        落子或撤销后，只重算合法性可能变化的点：
+        落子点、被提点、它们的邻点，以及这些点上各块（气数可能变化）的全部气。
+        """
+        board = self.board
+        grid = board.grid
+        (r, c), _, captured = record
+        touched = {(r, c)}
+        touched.update(captured)
+        around = set(touched)
+        for p in touched:
+            around.update(board.neighbors(*p))
+        dirty = set(around)
+        chains_done = set()
+        for (x, y) in around:
+            if grid[x][y] != EMPTY and (x, y) not in chains_done:
+                chains_done.update(board.chain(x, y))
+                dirty.update(board.liberties(x, y))
+        for color in (BLACK, WHITE):
+            points = self.legal_points[color]
+            for (x, y) in dirty:
+                if grid[x][y] == EMPTY and board.is_legal(x, y, color):
+                    points.add((x, y))
+                else:
+                    points.discard((x, y))
 
     def make_human_move(self, r, c):
         """
@@ -42,48 +111,115 @@ class GameManager:
             return False, "对局已结束"
         if not self.is_human_turn():
             return False, "现在不是你下子"
-        if not self.board.is_legal(r, c, self.human_color):
+        return self.play(r, c, self.human_color)
+
+    def play(self, r, c, color):
+        """
+        不看轮次，直接为 color 落子（GTP 等协议前端用；人机对局请用 make_human_move）。
+        返回 (ok, message)；成功后轮到对方。
+        """
+        if not self.board.is_legal(r, c, color):
             return False, "不合法着法"
-        ok = self.board.place(r, c, self.human_color)
-        if not ok:
+        if self.board.hash_after(r, c, color) in self.seen_hashes:
+            return False, "劫：不能重复之前出现过的局面"
+        record = self.board.play_move(r, c, color)
+        if record is None:
             return False, "落子失败"
+        self._record(record)
         # 切换执子方并检查对手是否有合法着法
-        self.to_move = BLACK if self.to_move == WHITE else WHITE
+        self.to_move = BLACK if color == WHITE else WHITE
         self._check_game_over_after_move()
         return True, ""
 
-    def make_ai_move(self):
+    def make_ai_move(self, move=None):
         """
         调用 AI 选着并落子；若 AI 无合法着法（AI.select_move 返回 None 或无合法落子），
         则视为 AI 无法下子 -> 认输 / 对局结束（由 self.result 标记）。
+        move: 已在别处（如后台搜索线程）算好的着法；为 None 时照常调用 AI 选着。
         返回 (moved: bool, message: str)
         """
         if self.result != GameResult.ONGOING:
             return False, "对局已结束"
         if self.is_human_turn():
             return False, "现在不是 AI 下子"
-        if self.ai is None:
-            return False, "无 AI"
-        move = self.ai.select_move(self.board, self.ai_color)
+        if move is None:
+            if self.ai is None:
+                return False, "无 AI"
+            move = self._select_ai_move()
         if move is None:
             # AI 无合法着法，视为 AI 投子/认输 => 人类获胜
             self.result = GameResult.BLACK_WINS if self.human_color == BLACK else GameResult.WHITE_WINS
             return False, "AI 无合法着法，认输。你获胜。"
         r, c = move
-        if not self.board.is_legal(r, c, self.ai_color):
-            # 保险：若 AI 返回非法着法，视为认输
+        if not self.is_legal_move(r, c, self.ai_color):
+            # 保险：若 AI 返回非法着法（含劫），视为认输
             self.result = GameResult.BLACK_WINS if self.human_color == BLACK else GameResult.WHITE_WINS
             return False, "AI 返回非法着法，认输。你获胜。"
-        ok = self.board.place(r, c, self.ai_color)
-        if not ok:
+        record = self.board.play_move(r, c, self.ai_color)
+        if record is None:
             # 不应发生，但若发生，AI 认输
             self.result = GameResult.BLACK_WINS if self.human_color == BLACK else GameResult.WHITE_WINS
             return False, "AI 无法落子，认输。你获胜。"
+        self._record(record)
         # 切换回合，检查是否人类还有合法着法；如果人无合法着法则人类认输
         self.to_move = BLACK if self.to_move == WHITE else WHITE
         self._check_game_over_after_move()
         return True, ""
 
+    def _select_ai_move(self):
+        # SimpleAI 直接拿对局层面的合法着法（已排除劫）；其它 AI 只拿到棋盘
+        if isinstance(self.ai, SimpleAI):
+            return self.ai.select_move(self.board, self.ai_color,
+                                       legal_moves=self.legal_moves_for(self.ai_color))
+        return self.ai.select_move(self.board, self.ai_color)
+
+    def _record(self, record):
+        self.history.append(record)
+        self.seen_hashes.add(self.board.hash)
+        self._update_legal_moves(record)
+        self._note_changes(record)
+
+    def _note_changes(self, record):
+        self.changed_points.add(record.point)
+        self.changed_points.update(record.captured)
+
+    def take_changed_points(self):
+        """
+        返回并清空自上次调用以来变化过的点集合（落子、提子、悔棋都会记入）；
+        各点当前内容直接读 board.grid。每手只含落子点与被提点，与盘面棋子数无关。
+        """
+        points = self.changed_points
+        self.changed_points = set()
+        return points
+
+    def undo_move(self):
+        """撤销最近一手（任意一方），返回其撤销记录；无棋可悔时返回 None。"""
+        if not self.history:
+            return None
+        record = self.history.pop()
+        self.seen_hashes.discard(self.board.hash)
+        self.board.undo(record)
+        self._update_legal_moves(record)
+        self._note_changes(record)
+        self.to_move = record.color
+        self.result = GameResult.ONGOING
+        self.score_result = None
+        return record
+
+    def take_back(self):
+        """
+        悔棋：连同 AI 的应手一起撤销，回到上一次轮到人类下子的局面。
+        返回撤销的手数（0 表示无棋可悔）。
+        """
+        undone = 0
+        while self.history:
+            record = self.undo_move()
+            undone += 1
+            if record.color == self.human_color:
+                break
+        return undone
+
+    @instrument.timed("game.check_game_over")
     def _check_game_over_after_move(self):
         """
         在每次成功落子并切换执子后检查对方是否有合法着法。
@@ -92,8 +228,7 @@ class GameManager:
         if self.result != GameResult.ONGOING:
             return
         next_color = self.to_move
-        has_move = len(self.legal_moves_for(next_color)) > 0
-        if not has_move:
+        if not self.has_legal_move(next_color):
             # 下一方无法下子 -> 轮到下一方但无子：下一方认输，当前执子方获胜
             winner = BLACK if next_color == WHITE else WHITE
             if winner == BLACK:
@@ -101,11 +236,44 @@ class GameManager:
             else:
                 self.result = GameResult.WHITE_WINS
 
+    # ---------- 数子 ----------
+    def live_score(self):
+        """不判死子的即时数子（每手都可调用，用于实时比分显示）。"""
+        return score_area(self.board, self.komi)
+
+    def estimate_dead_stones(self, playouts=200, threshold=0.5):
+        return estimate_dead_stones(self.board, self.to_move, playouts, threshold)
+
+    def score(self, dead_stones=None, playouts=200):
+        """
+        中国规则数子。dead_stones 为 None 时用 Monte Carlo 归属估计死子；
+        给出集合（可为空）则按它计算，即人工确认/覆盖死子。
+        """
+        if dead_stones is None:
+            dead_stones = self.estimate_dead_stones(playouts)
+        return score_area(self.board, self.komi, dead_stones)
+
+    def end_by_score(self, dead_stones=None, playouts=200):
+        """双方同意终局：数子并据此设置 self.result，返回 ScoreResult。"""
+        result = self.score(dead_stones, playouts)
+        self.score_result = result
+        if result.winner == BLACK:
+            self.result = GameResult.BLACK_WINS
+        elif result.winner == WHITE:
+            self.result = GameResult.WHITE_WINS
+        else:
+            self.result = GameResult.DRAW
+        return result
+
     def get_winner_text(self):
         if self.result == GameResult.BLACK_WINS:
-            return "Black wins"
-        if self.result == GameResult.WHITE_WINS:
-            return "White wins"
-        if self.result == GameResult.DRAW:
-            return "Draw"
-        return "Ongoing"
\ No newline at end of file
+            text = "Black wins"
+        elif self.result == GameResult.WHITE_WINS:
+            text = "White wins"
+        elif self.result == GameResult.DRAW:
+            text = "Draw"
+        else:
+            return "Ongoing"
+        if self.score_result is not None:
+            text += f" ({self.score_result})"
+        return text
@@ -0,0 +1,519 @@
+# goai/gtp.py
+"""
+GTP（Go Text Protocol v2）引擎前端，基于 asyncio，一个进程同时托管多盘对局。
+
+    python -m goai.gtp                               # stdin / stdout，一盘（接 Sabaki、GoGui 等）
+    python -m goai.gtp --port 6000 -j 4              # TCP：每个连接一盘独立对局
+    python -m goai gtp ...                           # 同上，经统一入口
+
+- 每个会话（GTPSession）一个 GameManager；同一连接内的命令按顺序处理，不同连接并发。
+- genmove 的搜索是 CPU 密集的，交给有界的进程池（workers 个）；超出的请求在信号量上排队，
+  排队深度、正在搜索数、搜索次数与平均耗时见 metrics()（GTP 命令 goai-metrics）。
+  一个会话的长搜索不会卡住其它会话的 play / showboard 等命令。
+- 时限：time_settings / time_left 设定会话的用时；没有设定时每手用 move_time 秒。
+  每手预算从收到 genmove 算起（含排队时间）；到期仍未搜完则改下一步随机合法着法。
+- final_score 的死子估计（Monte Carlo playout）同样放进池里跑，不占事件循环。
+- 项目规则不允许 pass：play pass 返回错误；genmove 无合法着法时返回 resign。
+"""
+import argparse
+import asyncio
+import random
+import sys
+import time
+from concurrent.futures import BrokenExecutor, ProcessPoolExecutor, ThreadPoolExecutor
+
+from .board import EMPTY, BLACK, WHITE, pack_board, unpack_board
+from .ai import SimpleAI
+from .game_manager import GameManager
+from .scoring import DEFAULT_KOMI, estimate_dead_stones, score_area
+
+PROTOCOL_VERSION = "2"
+NAME = "solo-go"
+VERSION = "0.1"
+# GTP 坐标列字母（跳过 I）
+COLUMNS = "ABCDEFGHJKLMNOPQRSTUVWXYZ"
+MAX_SIZE = len(COLUMNS)
+# 预算用完后仍等待搜索结果的宽限（秒），超过即改下随机着法
+GRACE = 0.5
+# 剩余预算少于此值（秒）时不再进池搜索，直接随机落子
+MIN_SEARCH = 0.05
+
+
+class GTPError(Exception):
+    """命令失败：以 "? 消息" 回复。"""
+
+
+def parse_vertex(text, size):
+    """'D4' -> (row, col)；row 0 为最上一行（GTP 的第 size 行）。pass 返回 None。"""
+    text = text.strip().upper()
+    if text == "PASS":
+        return None
+    if len(text) < 2 or text[0] not in COLUMNS[:size]:
+        raise GTPError("invalid vertex")
+    try:
+        number = int(text[1:])
+    except ValueError:
+        raise GTPError("invalid vertex")
+    if not 1 <= number <= size:
+        raise GTPError("invalid vertex")
+    return size - number, COLUMNS.index(text[0])
+
+def format_vertex(move, size):
+    if move is None:
+        return "pass"
+    r, c = move
+    return f"{COLUMNS[c]}{size - r}"
+
+def parse_color(text):
+    t = text.strip().lower()
+    if t in ("b", "black"):
+        return BLACK
+    if t in ("w", "white"):
+        return WHITE
+    raise GTPError("invalid color")
+
+
+def _genmove_job(data, color, legal_moves, level, playouts, time_ms, seed):
+    """在工作进程中搜索一手；棋盘以 pack_board 字节传入。"""
+    board = unpack_board(data)
+    ai = SimpleAI(level=level, playouts=playouts, time_ms=time_ms, seed=seed)
+    return ai.select_move(board, color, legal_moves=legal_moves)
+
+
+def _score_job(data, to_move, komi, playouts, seed):
+    """在工作进程中数子（含死子估计），返回 ScoreResult。"""
+    board = unpack_board(data)
+    dead = estimate_dead_stones(board, to_move, playouts, rng=random.Random(seed))
+    return score_area(board, komi, dead)
+
+
+class GTPSession:
+    """一盘 GTP 对局的状态：对局本身与双方的剩余用时。"""
+
+    def __init__(self, sid, size=19, komi=DEFAULT_KOMI):
+        self.sid = sid
+        self.komi = komi
+        self.game = GameManager(size=size, komi=komi)
+        # time_settings：(主时间, 读秒时间, 读秒手数)；None 表示未设定，按服务器 move_time
+        self.time_settings = None
+        # 每方剩余 (秒, 本读秒周期剩余手数)；手数 0 表示仍在主时间内
+        self.time_left = {}
+        self.quit = False
+
+    def new_game(self, size=None):
+        self.game = GameManager(size=size or self.game.size, komi=self.komi)
+        if self.time_settings is not None:
+            main, _, _ = self.time_settings
+            self.time_left = {BLACK: (main, 0), WHITE: (main, 0)}
+
+    def move_budget(self, color, default):
+        """本手可用的秒数。"""
+        if self.time_settings is None or color not in self.time_left:
+            return default
+        main, byo, stones = self.time_settings
+        if main <= 0 and byo <= 0:
+            return default          # 0 0 表示不限时
+        left, stones_left = self.time_left[color]
+        if stones_left > 0:
+            # 读秒中：本周期剩余时间平均给剩余手数
+            return left / stones_left * 0.9
+        if byo > 0 and stones > 0:
+            # 主时间内：摊给约 30 手，另加一手读秒的份额
+            return left / 30 + byo / stones * 0.9
+        return left / 30
+
+    def spend(self, color, seconds):
+        """genmove 结束后从 color 的剩余用时里扣除。"""
+        if self.time_settings is None or color not in self.time_left:
+            return
+        _, byo, stones = self.time_settings
+        left, stones_left = self.time_left[color]
+        left -= seconds
+        if stones_left > 0:
+            stones_left -= 1
+            if stones_left == 0:
+                left, stones_left = byo, stones
+        elif left <= 0 and stones > 0:
+            left, stones_left = byo + left, stones
+        self.time_left[color] = (left, stones_left)
+
+
+class GTPServer:
+    def __init__(self, level=2, playouts=None, move_time=1.0, workers=2, processes=True,
+                 size=19, komi=DEFAULT_KOMI, seed=None, score_playouts=200):
+        """
+        level / playouts：genmove 用的 SimpleAI 参数（level 2 时按每手预算 time_ms 搜索）
+        move_time：未设定时限时每手的秒数
+        score_playouts：final_score 估计死子用的 playout 数
+        workers：同时搜索的进程数（池大小）；processes=False 时用线程（测试、调试用）
+        """
+        self.level = level
+        self.playouts = playouts
+        self.score_playouts = score_playouts
+        self.move_time = move_time
+        self.workers = workers
+        self.processes = processes
+        self.size = size
+        self.komi = komi
+        self.rng = random.Random(seed)
+        self._executor = None
+        self._slots = None
+        self._next_sid = 0
+        self.sessions = {}
+        # 指标
+        self.queue_depth = 0
+        self.max_queue_depth = 0
+        self.searching = 0
+        self.searches = 0
+        self.timeouts = 0
+        self.errors = 0
+        self.search_time = 0.0
+        self.commands = {
+            "protocol_version": self.cmd_protocol_version,
+            "name": self.cmd_name,
+            "version": self.cmd_version,
+            "known_command": self.cmd_known_command,
+            "list_commands": self.cmd_list_commands,
+            "quit": self.cmd_quit,
+            "boardsize": self.cmd_boardsize,
+            "clear_board": self.cmd_clear_board,
+            "komi": self.cmd_komi,
+            "play": self.cmd_play,
+            "genmove": self.cmd_genmove,
+            "undo": self.cmd_undo,
+            "showboard": self.cmd_showboard,
+            "final_score": self.cmd_final_score,
+            "time_settings": self.cmd_time_settings,
+            "time_left": self.cmd_time_left,
+            "goai-metrics": self.cmd_metrics,
+        }
+
+    # ---------- 会话与工作池 ----------
+    def open_session(self):
+        self._next_sid += 1
+        session = GTPSession(self._next_sid, self.size, self.komi)
+        self.sessions[session.sid] = session
+        return session
+
+    def close_session(self, session):
+        self.sessions.pop(session.sid, None)
+
+    def _pool(self):
+        if self._executor is None:
+            if self.processes:
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers)
+            self._slots = asyncio.Semaphore(self.workers)
+        return self._executor, self._slots
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    def metrics(self):
+        return {
+            "sessions": len(self.sessions),
+            "workers": self.workers,
+            "queue_depth": self.queue_depth,
+            "max_queue_depth": self.max_queue_depth,
+            "searching": self.searching,
+            "searches": self.searches,
+            "timeouts": self.timeouts,
+            "errors": self.errors,
+            "avg_search_ms": self.search_time / self.searches * 1e3 if self.searches else 0.0,
+        }
+
+    async def _search(self, game, color, legal, deadline):
+        """
+        在池中搜索；排队也算在预算内，过期则返回 None（调用方改下随机着法）。
+        超时后工作进程里的搜索仍在跑，槽位要等它真正结束才释放，保证同时搜索的不超过 workers 个。
+        """
+        executor, slots = self._pool()
+        self.queue_depth += 1
+        self.max_queue_depth = max(self.max_queue_depth, self.queue_depth)
+        try:
+            await asyncio.wait_for(slots.acquire(), max(deadline - time.monotonic(), 0.001))
+        except asyncio.TimeoutError:
+            return None
+        finally:
+            self.queue_depth -= 1
+        remaining = deadline - time.monotonic()
+        if remaining < MIN_SEARCH:
+            slots.release()
+            return None
+        self.searching += 1
+        start = time.monotonic()
+
+        def finished(_):
+            self.searching -= 1
+            self.searches += 1
+            self.search_time += time.monotonic() - start
+            slots.release()
+        time_ms = None if self.playouts else int(remaining * 1000)
+        try:
+            job = asyncio.get_running_loop().run_in_executor(
+                executor, _genmove_job, pack_board(game.board), color, legal,
+                self.level, self.playouts, time_ms, self.rng.randrange(1 << 30))
+        except Exception as e:
+            finished(None)
+            self._job_failed(e)
+            return None
+        job.add_done_callback(finished)
+        try:
+            # shield：超时只放弃等待，不取消 job（取消会提前触发 finished）
+            return await asyncio.wait_for(asyncio.shield(job), remaining + GRACE)
+        except asyncio.TimeoutError:
+            return None
+        except Exception as e:
+            # 搜索出错或进程池损坏：由调用方改下随机着法
+            self._job_failed(e)
+            return None
+
+    def _job_failed(self, error):
+        """池中任务出错：计数；进程池已损坏（如工作进程被杀）时丢掉它，下次用时重建。"""
+        self.errors += 1
+        if isinstance(error, BrokenExecutor) and self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    async def _run_pooled(self, fn, *args):
+        """在池中跑一个不限时的任务（占一个槽位，任务结束才释放）；出错时抛 GTPError。"""
+        executor, slots = self._pool()
+        self.queue_depth += 1
+        self.max_queue_depth = max(self.max_queue_depth, self.queue_depth)
+        try:
+            await slots.acquire()
+        finally:
+            self.queue_depth -= 1
+        try:
+            job = asyncio.get_running_loop().run_in_executor(executor, fn, *args)
+        except Exception as e:
+            slots.release()
+            self._job_failed(e)
+            raise GTPError("internal error")
+        job.add_done_callback(lambda _: slots.release())
+        try:
+            return await asyncio.shield(job)
+        except Exception as e:
+            self._job_failed(e)
+            raise GTPError("internal error")
+
+    # ---------- 协议 ----------
+    async def handle_line(self, session, line):
+        """处理一行命令，返回完整回复（含结尾空行）；空行 / 注释返回 None。"""
+        line = "".join(ch for ch in line.split("#", 1)[0] if ch == "\t" or ch >= " ")
+        parts = line.replace("\t", " ").split()
+        if not parts:
+            return None
+        cid = ""
+        if parts[0].isdigit():
+            cid = parts.pop(0)
+            if not parts:
+                return None
+        name, args = parts[0], parts[1:]
+        handler = self.commands.get(name)
+        try:
+            if handler is None:
+                raise GTPError("unknown command")
+            result = handler(session, args)
+            if asyncio.iscoroutine(result):
+                result = await result
+        except GTPError as e:
+            return f"?{cid} {e}\n\n"
+        return f"={cid} {result}\n\n" if result else f"={cid}\n\n"
+
+    def cmd_protocol_version(self, session, args):
+        return PROTOCOL_VERSION
+
+    def cmd_name(self, session, args):
+        return NAME
+
+    def cmd_version(self, session, args):
+        return VERSION
+
+    def cmd_known_command(self, session, args):
+        return "true" if args and args[0] in self.commands else "false"
+
+    def cmd_list_commands(self, session, args):
+        return "\n".join(self.commands)
+
+    def cmd_quit(self, session, args):
+        session.quit = True
+        return ""
+
+    def cmd_boardsize(self, session, args):
+        try:
+            size = int(args[0])
+        except (IndexError, ValueError):
+            raise GTPError("syntax error")
+        if not 2 <= size <= MAX_SIZE:
+            raise GTPError("unacceptable size")
+        session.new_game(size)
+        return ""
+
+    def cmd_clear_board(self, session, args):
+        session.new_game()
+        return ""
+
+    def cmd_komi(self, session, args):
+        try:
+            session.komi = session.game.komi = float(args[0])
+        except (IndexError, ValueError):
+            raise GTPError("syntax error")
+        return ""
+
+    def cmd_play(self, session, args):
+        if len(args) < 2:
+            raise GTPError("syntax error")
+        color = parse_color(args[0])
+        game = session.game
+        move = parse_vertex(args[1], game.size)
+        if move is None:
+            raise GTPError("pass is not supported")
+        ok, _ = game.play(move[0], move[1], color)
+        if not ok:
+            raise GTPError("illegal move")
+        return ""
+
+    async def cmd_genmove(self, session, args):
+        if not args:
+            raise GTPError("syntax error")
+        color = parse_color(args[0])
+        game = session.game
+        start = time.monotonic()
+        legal = game.legal_moves_for(color)
+        if not legal:
+            return "resign"
+        budget = session.move_budget(color, self.move_time)
+        move = await self._search(game, color, legal, start + budget)
+        if move is None or move not in legal:
+            self.timeouts += 1
+            move = self.rng.choice(legal)
+        game.play(move[0], move[1], color)
+        session.spend(color, time.monotonic() - start)
+        return format_vertex(move, game.size)
+
+    def cmd_undo(self, session, args):
+        if session.game.undo_move() is None:
+            raise GTPError("cannot undo")
+        return ""
+
+    def cmd_showboard(self, session, args):
+        game = session.game
+        size = game.size
+        letters = "   " + " ".join(COLUMNS[:size])
+        rows = [letters]
+        for r in range(size):
+            cells = " ".join(".XO"[game.board.grid[r][c]] for c in range(size))  # WHITE = -1 -> "O"
+            rows.append(f"{size - r:2d} {cells}")
+        return "\n" + "\n".join(rows)
+
+    async def cmd_final_score(self, session, args):
+        game = session.game
+        result = await self._run_pooled(_score_job, pack_board(game.board), game.to_move, game.komi,
+                                        self.score_playouts, self.rng.randrange(1 << 30))
+        return "0" if result.winner == EMPTY else str(result)
+
+    def cmd_time_settings(self, session, args):
+        try:
+            main, byo, stones = float(args[0]), float(args[1]), int(args[2])
+        except (IndexError, ValueError):
+            raise GTPError("syntax error")
+        session.time_settings = (main, byo, stones)
+        session.time_left = {BLACK: (main, 0), WHITE: (main, 0)}
+        return ""
+
+    def cmd_time_left(self, session, args):
+        try:
+            color = parse_color(args[0])
+            left, stones = float(args[1]), int(args[2])
+        except (IndexError, ValueError):
+            raise GTPError("syntax error")
+        if session.time_settings is None:
+            session.time_settings = (0.0, 0.0, 0)
+        session.time_left[color] = (left, stones)
+        return ""
+
+    def cmd_metrics(self, session, args):
+        return " ".join(f"{k}={v:.1f}" if isinstance(v, float) else f"{k}={v}"
+                        for k, v in self.metrics().items())
+
+    # ---------- 传输 ----------
+    async def serve_stream(self, reader, write, drain=None):
+        """在一条流上跑一个会话：逐行读命令、按序回复，直到 quit 或 EOF。"""
+        session = self.open_session()
+        try:
+            while not session.quit:
+                line = await reader.readline()
+                if not line:
+                    break
+                reply = await self.handle_line(session, line.decode("utf-8", "replace"))
+                if reply is None:
+                    continue
+                write(reply.encode("utf-8"))
+                if drain is not None:
+                    await drain()
+        finally:
+            self.close_session(session)
+
+    async def _serve_connection(self, reader, writer):
+        try:
+            await self.serve_stream(reader, writer.write, writer.drain)
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def start_tcp(self, host="127.0.0.1", port=0):
+        """开始监听 TCP，返回 asyncio.Server（port=0 时取 server.sockets[0] 看实际端口）。"""
+        return await asyncio.start_server(self._serve_connection, host, port)
+
+    async def serve_stdio(self):
+        loop = asyncio.get_running_loop()
+        reader = asyncio.StreamReader()
+        await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), sys.stdin)
+        out = sys.stdout.buffer
+
+        def write(data):
+            out.write(data)
+            out.flush()
+        await self.serve_stream(reader, write)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m goai.gtp", description="solo-go GTP 引擎")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=None, help="给出则监听 TCP，否则走 stdin/stdout")
+    parser.add_argument("--level", type=int, default=2)
+    parser.add_argument("--playouts", type=int, default=None, help="每手固定 playout 数（不给则按时限）")
+    parser.add_argument("--move-time", type=float, default=1.0, help="未设定时限时每手秒数")
+    parser.add_argument("-j", "--workers", type=int, default=2, help="同时搜索的进程数")
+    parser.add_argument("--size", type=int, default=19)
+    parser.add_argument("--komi", type=float, default=DEFAULT_KOMI)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args(argv)
+    server = GTPServer(level=args.level, playouts=args.playouts, move_time=args.move_time,
+                       workers=args.workers, size=args.size, komi=args.komi, seed=args.seed)
+
+    async def run():
+        if args.port is None:
+            await server.serve_stdio()
+            return
+        tcp = await server.start_tcp(args.host, args.port)
+        print(f"GTP listening on {args.host}:{tcp.sockets[0].getsockname()[1]}", file=sys.stderr, flush=True)
+        async with tcp:
+            await tcp.serve_forever()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,19 +2,29 @@
 GUI: 使用 GameManager，不包含 Pass 功能。若一方无合法着法则结束对局（弹窗提示）。
 """
 import tkinter as tk
-from tkinter import messagebox
-import threading
+from tkinter import filedialog, messagebox
+import importlib.util
+import queue
 import time
 
 from .board import Board, EMPTY, BLACK, WHITE
 from .ai import SimpleAI
 from .game_manager import GameManager
-from .sound_dev import play_move_sound
+from .ponder import PonderWorker
+from .winrate import WinRateEstimator
+from . import instrument
+from . import sgf
+from .sound_dev import init_sound, play_move_sound
 
 CELL_SIZE = 30
 MARGIN = 25
 STONE_RADIUS = CELL_SIZE // 2 - 2
-AI_THINK_TIME = 0.5
+# Tk 主线程轮询后台结果的间隔（毫秒）
+POLL_MS = 20
+# 胜率面板刷新间隔（毫秒）：估计在后台持续细化，界面按此频率节流更新
+WINRATE_REFRESH_MS = 250
+# 叫吃提示需要 numpy；只查是否安装，真正导入推迟到第一次勾选 Atari
+HAVE_NUMPY = importlib.util.find_spec("numpy") is not None
 
 class GoGUI(tk.Frame):
     def __init__(self, master=None, board_size=19, ai_level=0):
@@ -32,20 +42,52 @@ class GoGUI(tk.Frame):
         self.canvas.bind("<Button-1>", self.on_click)
         self.status = tk.Label(self.master, text=self._status_text(), anchor="w")
         self.status.pack(fill="x")
+        # 胜率面板：后台估计，Tk 只按节流频率读取最新结果
+        self.winrate_panel = tk.Frame(self.master)
+        self.winrate_panel.pack(fill="x")
+        self.winrate_label = tk.Label(self.winrate_panel, text="Win rate: -", anchor="w")
+        self.winrate_label.pack(side="left")
+        self.show_ownership = tk.BooleanVar(value=False)
+        tk.Checkbutton(self.winrate_panel, text="Ownership", variable=self.show_ownership,
+                       command=self._refresh_winrate_panel).pack(side="right")
+        # 叫吃提示（需要 numpy，见 goai.analysis）
+        self.show_atari = tk.BooleanVar(value=False)
+        tk.Checkbutton(self.winrate_panel, text="Atari", variable=self.show_atari,
+                       command=self.draw_atari,
+                       state="normal" if HAVE_NUMPY else "disabled").pack(side="right")
+        self.estimator = WinRateEstimator()
+        self.estimator.start()
+        self._shown_estimate = None
         # 去掉 Pass 按钮（用户要求）
         self.reset_button = tk.Button(self.master, text="Reset", command=self.on_reset)
         self.reset_button.pack(side="right")
+        self.take_back_button = tk.Button(self.master, text="Take back", command=self.on_take_back)
+        self.take_back_button.pack(side="right")
+        self.score_button = tk.Button(self.master, text="Score", command=self.on_score)
+        self.score_button.pack(side="right")
+        self.save_button = tk.Button(self.master, text="Save SGF", command=self.on_save_sgf)
+        self.save_button.pack(side="right")
+        # 后台搜索线程：人类思考时 pondering，AI 着法经队列交回 Tk 主线程落子
+        self.worker = PonderWorker(self.ai)
+        self.worker.start()
+        # 启动时初始化混音器并解码音效，对局中落子音不再读盘
+        init_sound()
+        self._ai_moves = queue.Queue()
+        self.after(POLL_MS, self._poll_ai_moves)
+        self.after(WINRATE_REFRESH_MS, self._tick_winrate)
         self.draw_board()
-        self.draw_stones()
+        self.redraw_stones()
         # 若 AI 先行（人执白），则触发 AI
         if not self.game.is_human_turn():
-            self.after(100, self.ai_move)
+            self.ai_move()
 
     def _status_text(self):
         who = "Black" if self.game.to_move == BLACK else "White"
         you = "Black" if self.game.human_color == BLACK else "White"
-        return f"To move: {who}    (You are {you})"
+        # 即时数子（不判死子），每手刷新
+        return f"To move: {who}    (You are {you})    Area: {self.game.live_score()}"
 
+    @instrument.timed("gui.draw_board")
     def draw_board(self):
         self.canvas.delete("grid")
         size = self.board_size
@@ -75,22 +117,94 @@ class GoGUI(tk.Frame):
                 y = MARGIN + r * CELL_SIZE
                 self.canvas.create_oval(x-3, y-3, x+3, y+3, fill="black", tags="grid")
 
-    def draw_stones(self):
+    def _stone_item(self, r, c, val):
+        x = MARGIN + c * CELL_SIZE
+        y = MARGIN + r * CELL_SIZE
+        color = "black" if val == BLACK else "white"
+        return self.canvas.create_oval(x - STONE_RADIUS, y - STONE_RADIUS,
+                                       x + STONE_RADIUS, y + STONE_RADIUS,
+                                       fill=color, outline="black", tags="stones")
+
+    def _set_point(self, r, c):
+        """让 (r, c) 上的画布对象与棋盘一致：先删旧棋子，有子再画。"""
+        item = self.stone_items.pop((r, c), None)
+        if item is not None:
+            self.canvas.delete(item)
+        val = self.game.board.grid[r][c]
+        if val != EMPTY:
+            self.stone_items[(r, c)] = self._stone_item(r, c, val)
+
+    @instrument.timed("gui.redraw_stones")
+    def redraw_stones(self):
+        """全盘重画棋子（新开局时用）；之后每手由 draw_stones 增量更新。"""
         self.canvas.delete("stones")
+        self.stone_items = {}
+        self.game.take_changed_points()
         for r in range(self.board_size):
             for c in range(self.board_size):
-                val = self.game.board.grid[r][c]
-                if val == EMPTY:
+                if self.game.board.grid[r][c] != EMPTY:
+                    self._set_point(r, c)
+        self._after_stones_changed()
+
+    @instrument.timed("gui.draw_stones")
+    def draw_stones(self):
+        """只重画上次以来变化的点（落子点、被提点、悔棋恢复的点），代价与盘面棋子数无关。"""
+        for r, c in self.game.take_changed_points():
+            self._set_point(r, c)
+        self._after_stones_changed()
+
+    def _after_stones_changed(self):
+        self.draw_atari()
+        self.status.config(text=self._status_text())
+        # 局面变了：胜率估计立即切换到新局面
+        self.estimator.set_position(self.game.board, self.game.to_move)
+
+    def draw_atari(self):
+        """在处于叫吃的棋子上画红圈。"""
+        self.canvas.delete("atari")
+        if not self.show_atari.get() or not HAVE_NUMPY:
+            return
+        from . import analysis
+        mask = analysis.atari_mask(self.game.board)
+        for r, c in zip(*mask.nonzero()):
+            x = MARGIN + int(c) * CELL_SIZE
+            y = MARGIN + int(r) * CELL_SIZE
+            half = STONE_RADIUS // 2
+            self.canvas.create_oval(x - half, y - half, x + half, y + half,
+                                    outline="red", width=2, tags="atari")
+
+    def _tick_winrate(self):
+        self._refresh_winrate_panel()
+        self.after(WINRATE_REFRESH_MS, self._tick_winrate)
+
+    def _refresh_winrate_panel(self):
+        est = self.estimator.latest()
+        key = None if est is None else (est.board_hash, est.playouts, self.show_ownership.get())
+        if key == self._shown_estimate:
+            return
+        self._shown_estimate = key
+        self.canvas.delete("ownership")
+        if est is None:
+            self.winrate_label.config(text="Win rate: ...")
+            return
+        self.winrate_label.config(
+            text=f"Black {est.black_win_rate():.1%}  /  White {est.win_rate(WHITE):.1%}"
+                 f"    ({est.playouts} playouts)")
+        if self.show_ownership.get():
+            size = self.board_size
+            for i, v in enumerate(est.ownership()):
+                if abs(v) < 0.3:
                     continue
+                r, c = divmod(i, size)
                 x = MARGIN + c * CELL_SIZE
                 y = MARGIN + r * CELL_SIZE
-                color = "black" if val == BLACK else "white"
-                self.canvas.create_oval(x - STONE_RADIUS, y - STONE_RADIUS,
-                                        x + STONE_RADIUS, y + STONE_RADIUS,
-                                        fill=color, outline="black", tags="stones")
-        self.status.config(text=self._status_text())
+                half = 4
+                self.canvas.create_rectangle(x - half, y - half, x + half, y + half,
+                                             fill="black" if v > 0 else "white",
+                                             outline="", tags="ownership")
 
     def on_click(self, event):
+        clicked_at = time.perf_counter()
         # defensive: if game ended ignore clicks
         if self.game.result != GameManagerResultSafe.ONGOING:
             return
@@ -111,7 +225,7 @@ class GoGUI(tk.Frame):
             return
         # Play move sound for human move
         try:
-            play_move_sound(master=self.master)
+            play_move_sound(master=self.master, t0=clicked_at)
         except Exception:
             pass
         # 更新界面
@@ -122,32 +236,47 @@ class GoGUI(tk.Frame):
             return
         # 若现在轮到 AI，则触发 AI
         if not self.game.is_human_turn():
-            self.after(100, self.ai_move)
+            self.ai_move()
 
     def ai_move(self):
-        def run():
-            time.sleep(AI_THINK_TIME)
-            if self.game.result != GameManagerResultSafe.ONGOING:
-                return
-            moved, msg = self.game.make_ai_move()
-            # Update UI on main thread
-            self.after(1, self.draw_stones)
-            if moved:
-                # Play move sound for AI move
-                try:
-                    play_move_sound(master=self.master)
-                except Exception:
-                    pass
-            if not moved and msg:
-                # AI 无法下法 -> 对局结束（AI 投降）
-                self.after(50, lambda: messagebox.showinfo("Game over", msg))
-                return
-            # 若对局结束由 make_ai_move 设置了 result
-            if self.game.result != GameManagerResultSafe.ONGOING:
-                self.after(50, self._announce_result_and_disable)
-                return
-        t = threading.Thread(target=run, daemon=True)
-        t.start()
+        # 交给后台线程搜索（复用 pondering 的子树），不阻塞 Tk
+        self.worker.request_move(self.game.board, self.game.ai_color,
+                                 self.game.legal_moves_for(self.game.ai_color),
+                                 lambda move, h: self._ai_moves.put((move, h)))
+
+    def _poll_ai_moves(self):
+        try:
+            while True:
+                move, board_hash = self._ai_moves.get_nowait()
+                self._apply_ai_move(move, board_hash)
+        except queue.Empty:
+            pass
+        self.after(POLL_MS, self._poll_ai_moves)
+
+    def _apply_ai_move(self, move, board_hash):
+        # 只在 Tk 主线程里改棋盘；悔棋/重开之后到达的旧结果直接丢弃
+        if self.game.result != GameManagerResultSafe.ONGOING or self.game.is_human_turn():
+            return
+        if self.game.board.hash != board_hash:
+            return
+        moved, msg = self.game.make_ai_move(move)
+        self.draw_stones()
+        if moved:
+            # Play move sound for AI move
+            try:
+                play_move_sound(master=self.master)
+            except Exception:
+                pass
+        if not moved and msg:
+            # AI 无法下法 -> 对局结束（AI 投降）
+            messagebox.showinfo("Game over", msg)
+            return
+        # 若对局结束由 make_ai_move 设置了 result
+        if self.game.result != GameManagerResultSafe.ONGOING:
+            self._announce_result_and_disable()
+            return
+        # 轮到人类：后台在当前局面上 pondering
+        self.worker.ponder(self.game.board, self.game.human_color)
 
     def _announce_result_and_disable(self):
         # 显示结果并禁止继续下子
@@ -166,13 +295,52 @@ class GoGUI(tk.Frame):
 
     def on_reset(self):
         if messagebox.askyesno("Reset", "Start a new game?"):
+            self.worker.cancel()
             self.game = GameManager(size=self.board_size, ai=self.ai, human_color=self.game.human_color)
             self.draw_board()
-            self.draw_stones()
+            self.redraw_stones()
             # rebind clicks
             self.canvas.bind("<Button-1>", self.on_click)
             if not self.game.is_human_turn():
-                self.after(100, self.ai_move)
+                self.ai_move()
+
+    def on_take_back(self):
+        # AI 思考中不允许悔棋
+        if self.game.result == GameManagerResultSafe.ONGOING and not self.game.is_human_turn():
+            return
+        if self.game.take_back() == 0:
+            return
+        self.worker.cancel()
+        self.canvas.bind("<Button-1>", self.on_click)
+        self.draw_stones()
+        if not self.game.is_human_turn():
+            self.ai_move()
+        else:
+            self.worker.ponder(self.game.board, self.game.human_color)
+
+    def on_score(self):
+        # 终局数子：AI 思考中不处理；死子由 Monte Carlo 归属估计
+        if self.game.result != GameManagerResultSafe.ONGOING or not self.game.is_human_turn():
+            return
+        if not messagebox.askyesno("Score", "End the game and count (Chinese area scoring)?"):
+            return
+        self.worker.cancel()
+        self.game.end_by_score()
+        self.draw_stones()
+        self._announce_result_and_disable()
+
+    def on_save_sgf(self):
+        path = filedialog.asksaveasfilename(defaultextension=".sgf",
+                                            filetypes=[("SGF", "*.sgf"), ("All files", "*")])
+        if not path:
+            return
+        human = "Human"
+        machine = f"solo-go level {self.ai.level}"
+        black, white = (human, machine) if self.game.human_color == BLACK else (machine, human)
+        try:
+            sgf.save_sgf(self.game, path, black=black, white=white)
+        except OSError as e:
+            messagebox.showinfo("Save failed", str(e))
 
 # small compatibility helpers (so GUI references GameManagerResultSafe)
 class GameManagerResultSafe:
@@ -181,12 +349,20 @@ class GameManagerResultSafe:
     WHITE_WINS = "white_wins"
     DRAW = "draw"
 
-def main():
+def main(board_size=19, ai_level=0, on_ready=None):
+    """on_ready：窗口建好、进入事件循环前调用一次（python -m goai 用它报告启动耗时）。"""
+    if instrument.enabled:
+        instrument.start_dump(instrument.DUMP_FILE)
     root = tk.Tk()
-    gui = GoGUI(master=root, board_size=19, ai_level=0)
+    gui = GoGUI(master=root, board_size=board_size, ai_level=ai_level)
     gui.pack()
+    if on_ready is not None:
+        on_ready()
     root.protocol("WM_DELETE_WINDOW", root.quit)
     root.mainloop()
+    gui.worker.stop()
+    gui.estimator.stop()
+    instrument.stop_dump()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
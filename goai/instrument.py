@@ -0,0 +1,172 @@
+# goai/instrument.py
+"""
+热点路径计数与计时（默认关闭，可常驻代码中）。
+
+- 关闭时每个埋点只多一次模块属性读取与布尔判断；计时装饰器只多一层函数调用。
+- 打开：instrument.enable()，或启动前设环境变量 GOAI_INSTRUMENT=1
+  （GUI 此时每 5 秒把快照追加到 GOAI_INSTRUMENT_FILE，默认 goai-instrument.jsonl）。
+- 计数器：board.is_legal、board.copy、board.flood_nodes（泛洪访问的棋子数）、board.captures 等。
+- 计时：select_move、_check_game_over_after_move、GUI 重绘等，记入按 2 的幂分桶的直方图
+  （纳秒），取分位数只需扫 64 个桶。
+- snapshot() 返回可 JSON 序列化的快照；dump(path) 追加一行到 JSON Lines 文件，
+  start_dump(path, interval) 后台定期追加。
+
+多线程同时计数时个别增量可能丢失（不加锁，换取热路径开销），用作性能分析足够。
+"""
+import functools
+import os
+import threading
+import time
+
+enabled = os.environ.get("GOAI_INSTRUMENT", "") not in ("", "0")
+DUMP_FILE = os.environ.get("GOAI_INSTRUMENT_FILE", "goai-instrument.jsonl")
+
+counters = {}
+timers = {}
+_lock = threading.Lock()
+_dumper = None
+
+def enable():
+    global enabled
+    enabled = True
+
+def disable():
+    global enabled
+    enabled = False
+
+def reset():
+    with _lock:
+        counters.clear()
+        timers.clear()
+
+def count(name, n=1):
+    """计数器加 n；调用方应先判断 instrument.enabled（关闭时不进函数）。"""
+    counters[name] = counters.get(name, 0) + n
+
+
+class Histogram:
+    __slots__ = ("count", "total", "min", "max", "buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = 0
+        # buckets[b]：耗时 ns 的 bit_length 为 b，即落在 [2^(b-1), 2^b)
+        self.buckets = [0] * 64
+
+    def add(self, ns):
+        self.count += 1
+        self.total += ns
+        if self.min is None or ns < self.min:
+            self.min = ns
+        if ns > self.max:
+            self.max = ns
+        self.buckets[min(ns.bit_length(), 63)] += 1
+
+    def percentile(self, q):
+        """近似分位数（纳秒）：取所在桶的上界，但不超过实际最大值。"""
+        if not self.count:
+            return 0
+        target = q * self.count
+        seen = 0
+        for b, n in enumerate(self.buckets):
+            seen += n
+            if seen >= target:
+                return min(1 << b, self.max)
+        return self.max
+
+    def summary(self):
+        us = 1e-3
+        return {
+            "count": self.count,
+            "total_ms": self.total * 1e-6,
+            "mean_us": self.total / self.count * us if self.count else 0.0,
+            "min_us": (self.min or 0) * us,
+            "max_us": self.max * us,
+            "p50_us": self.percentile(0.5) * us,
+            "p90_us": self.percentile(0.9) * us,
+            "p99_us": self.percentile(0.99) * us,
+        }
+
+
+def record(name, ns):
+    """把一次耗时（纳秒）记入名为 name 的直方图。"""
+    h = timers.get(name)
+    if h is None:
+        h = timers[name] = Histogram()
+    h.add(ns)
+
+def timed(name):
+    """函数 / 方法计时装饰器；关闭时直接调用原函数。"""
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not enabled:
+                return fn(*args, **kwargs)
+            start = time.perf_counter_ns()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                record(name, time.perf_counter_ns() - start)
+        return wrapper
+    return decorate
+
+
+class timer:
+    """with instrument.timer("name"): ... —— 给一段代码计时。"""
+    __slots__ = ("name", "start")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns() if enabled else None
+        return self
+
+    def __exit__(self, *exc):
+        if self.start is not None:
+            record(self.name, time.perf_counter_ns() - self.start)
+        return False
+
+
+def snapshot():
+    """当前计数与计时的快照（dict，可直接 json.dumps）。"""
+    with _lock:
+        return {
+            "time": time.time(),
+            "enabled": enabled,
+            "counters": dict(counters),
+            "timers": {name: h.summary() for name, h in list(timers.items())},
+        }
+
+def dump(path):
+    """把一份快照追加为 path 中的一行 JSON。"""
+    import json  # 只在导出时才需要，不拖慢 goai.board 的导入
+    line = json.dumps(snapshot(), sort_keys=True)
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(line + "\n")
+
+def start_dump(path, interval=5.0):
+    """后台线程每 interval 秒 dump 一次；重复调用会先停掉旧线程。"""
+    global _dumper
+    stop_dump()
+    stop = threading.Event()
+
+    def run():
+        while not stop.wait(interval):
+            dump(path)
+        dump(path)
+
+    thread = threading.Thread(target=run, name="goai-instrument-dump", daemon=True)
+    _dumper = (thread, stop)
+    thread.start()
+
+def stop_dump():
+    """停止定期 dump（停止前再写一行最终快照）。"""
+    global _dumper
+    if _dumper is not None:
+        thread, stop = _dumper
+        stop.set()
+        thread.join()
+        _dumper = None
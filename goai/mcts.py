@@ -0,0 +1,250 @@
+# goai/mcts.py
+"""
+蒙特卡洛树搜索（MCTS / UCT）。
+
+- 选择：UCT（胜率 + c * sqrt(ln N / n)）。
+- 扩展：每个节点的候选着法为当时的合法点（不含己方真眼）。
+- 模拟：playout.random_playout 轻量随机对局，终局按中国规则数子 + 贴目判胜负。
+- 预算：按毫秒（time_ms）或按 playout 次数（playouts）。
+- 树复用：上一手搜索的树保留下来；下一手若当前局面是旧树中的孙节点/子节点，直接接着用。
+- 叶节点成批评估（可选，需 numpy）：batch=K 时每次扩展后用 goai.batch_playout 一次下 K 盘，
+  按 K 次访问回传。
+- 模式先验（可选，goai.patterns）：patterns 给出时 playout 改用 3x3 模式加权的 pattern_playout。
+- 置换表（可选，goai.ttable）：新节点用表中的访问数/胜率作先验，最佳着法提示优先展开；
+  回传时把节点统计写回表中，不同走法次序到达的同一局面共享经验。
+"""
+import math
+import random
+import time
+
+from .board import EMPTY, BLACK, WHITE
+from .playout import is_eye, random_playout, area_score
+from .scoring import DEFAULT_KOMI
+from .ttable import position_key
+
+# 从置换表继承的先验访问数上限，避免旧经验压过本次搜索
+TT_PRIOR_CAP = 8
+
+class Node:
+    __slots__ = ("move", "parent", "to_move", "hash", "children", "untried", "visits", "wins")
+
+    def __init__(self, move, parent, to_move, board_hash, untried):
+        self.move = move              # 走到本节点的着法 (r,c)；根节点为 None
+        self.parent = parent
+        self.to_move = to_move        # 本节点轮到谁下
+        self.hash = board_hash
+        self.children = {}            # move -> Node
+        self.untried = untried        # 尚未展开的着法列表
+        self.visits = 0
+        self.wins = 0.0               # 以“走到本节点的一方”（-to_move）计的胜局数
+
+    def uct_child(self, c):
+        log_n = math.log(self.visits)
+        best, best_score = None, -1.0
+        for child in self.children.values():
+            score = child.wins / child.visits + c * math.sqrt(log_n / child.visits)
+            if score > best_score:
+                best, best_score = child, score
+        return best
+
+
+def candidate_moves(board, color):
+    """树中节点的候选着法：合法且不是己方真眼。"""
+    grid = board.grid
+    size = board.size
+    return [(r, c) for r in range(size) for c in range(size)
+            if grid[r][c] == EMPTY and board.is_legal(r, c, color)
+            and not is_eye(board, r, c, color)]
+
+
+class MCTS:
+    def __init__(self, playouts=None, time_ms=None, komi=DEFAULT_KOMI, c=1.4, seed=None, ttable=None,
+                 batch=None, patterns=None):
+        """
+        playouts / time_ms: 每手的预算，二选一；都不给时默认 1000 毫秒。
+        ttable: 可选的 TranspositionTable，可在多个搜索器 / 评估器之间共享。
+        batch: 每个叶节点成批下的 playout 数（需要 numpy），None 为逐盘。
+        patterns: 3x3 模式权重（PatternTable 或 JSON 路径），给出时逐盘 playout 按先验抽样。
+        """
+        if playouts is None and time_ms is None:
+            time_ms = 1000
+        self.playouts = playouts
+        self.time_ms = time_ms
+        self.komi = komi
+        self.c = c
+        self.rng = random.Random(seed)
+        self.ttable = ttable
+        self.batch = batch
+        self.patterns = None
+        if patterns is not None:
+            from .patterns import get_table
+            self.patterns = get_table(patterns)
+        self.np_rng = None
+        if batch:
+            from .analysis import np, _require_numpy
+            _require_numpy()
+            self.np_rng = np.random.default_rng(seed)
+        self.root = None
+        # 最近一次搜索的统计
+        self.last_playouts = 0
+        self.last_seconds = 0.0
+
+    @property
+    def playouts_per_second(self):
+        if self.last_seconds <= 0:
+            return 0.0
+        return self.last_playouts / self.last_seconds
+
+    def _new_node(self, move, parent, to_move, board):
+        """建新节点：候选着法随机打乱后从尾部展开；有置换表时用其统计作先验。"""
+        untried = candidate_moves(board, to_move)
+        self.rng.shuffle(untried)
+        node = Node(move, parent, to_move, board.hash, untried)
+        if self.ttable is not None:
+            entry = self.ttable.get(position_key(board.hash, to_move))
+            if entry is not None and entry.visits:
+                n = min(entry.visits, TT_PRIOR_CAP)
+                node.visits = n
+                # 表中 value 为本节点执子方视角，node.wins 以走到本节点的一方计
+                node.wins = n * (1.0 - entry.value)
+                hint = entry.best_move
+                if hint in untried:
+                    untried.remove(hint)
+                    untried.append(hint)
+        return node
+
+    # ---------- 树复用 ----------
+    def _find_reusable(self, board_hash, color):
+        """在旧树的根、子、孙节点中找与当前局面一致的节点。"""
+        root = self.root
+        if root is None:
+            return None
+        frontier = [root]
+        for _ in range(3):
+            nxt = []
+            for node in frontier:
+                if node.hash == board_hash and node.to_move == color:
+                    return node
+                nxt.extend(node.children.values())
+            frontier = nxt
+        return None
+
+    def _prepare_root(self, board, color, legal_moves):
+        node = self._find_reusable(board.hash, color)
+        if node is None:
+            node = self._new_node(None, None, color, board)
+        node.parent = None
+        if legal_moves is not None:
+            # 对局层面（劫）禁止的着法不能出现在根上
+            allowed = set(legal_moves)
+            for move in [m for m in node.children if m not in allowed]:
+                del node.children[move]
+            node.untried = [m for m in node.untried if m in allowed]
+        self.root = node
+        return node
+
+    def advance(self, board, color):
+        """对局前进了（例如对手已落子）：把根移到与当前局面一致的子树上，找不到就丢弃旧树。"""
+        node = self._find_reusable(board.hash, color)
+        if node is not None:
+            node.parent = None
+        self.root = node
+
+    # ---------- 搜索 ----------
+    def search(self, board, color, legal_moves=None):
+        """
+        从 board（不会被修改）上 color 方的局面搜索，返回访问次数最多的着法；
+        没有合法着法时返回 None。legal_moves 为对局层面的合法着法（已排除劫）。
+        """
+        root = self._prepare_root(board, color, legal_moves)
+        if not root.children and not root.untried:
+            # 非眼着法都不行时，只能填眼（本项目不允许 pass）
+            if legal_moves is None:
+                grid = board.grid
+                legal_moves = [(r, c) for r in range(board.size) for c in range(board.size)
+                               if grid[r][c] == EMPTY and board.is_legal(r, c, color)]
+            return self.rng.choice(legal_moves) if legal_moves else None
+
+        start = time.perf_counter()
+        deadline = None if self.time_ms is None else start + self.time_ms / 1000.0
+        # 整次搜索只拷贝一次棋盘，各 playout 在拷贝上落子后再撤销
+        work = board._copy()
+        n = 0
+        while True:
+            if self.playouts is not None and n >= self.playouts:
+                break
+            if deadline is not None and time.perf_counter() >= deadline:
+                break
+            n += self.run_playout(work)
+        self.last_playouts = n
+        self.last_seconds = time.perf_counter() - start
+        move = self.best_move()
+        if self.ttable is not None and root.visits:
+            self.ttable.store(position_key(root.hash, color), root.visits,
+                              1.0 - root.wins / root.visits, move)
+        return move
+
+    def run_playout(self, board):
+        """
+        一次完整的 选择-扩展-模拟-回传，返回本次下的 playout 数。
+        直接在 board 上 play_move，结束前按 UndoRecord 倒序 undo 还原，不拷贝棋盘；
+        因此 board 不能同时被别的线程读写（search 传入的是自己的拷贝）。
+        """
+        rng = self.rng
+        b = board
+        records = []
+        node = self.root
+        # 选择
+        while not node.untried and node.children:
+            node = node.uct_child(self.c)
+            records.append(b.play_move(node.move[0], node.move[1], -node.to_move))
+        # 扩展（候选着法建节点时已打乱，直接从尾部取）
+        if node.untried:
+            move = node.untried.pop()
+            color = node.to_move
+            records.append(b.play_move(move[0], move[1], color))
+            child = self._new_node(move, node, -color, b)
+            node.children[move] = child
+            node = child
+        # 模拟
+        if self.batch:
+            from .batch_playout import batch_playouts
+            scores = batch_playouts(b, node.to_move, self.batch, self.np_rng)
+            n = self.batch
+            black_wins = int((scores - self.komi > 0).sum())
+        else:
+            if self.patterns is not None:
+                from .patterns import pattern_playout
+                pattern_playout(b, node.to_move, rng, table=self.patterns, records=records)
+            else:
+                random_playout(b, node.to_move, rng, records=records)
+            n = 1
+            black_wins = 1 if area_score(b) - self.komi > 0 else 0
+        for record in reversed(records):
+            b.undo(record)
+        # 回传
+        tt = self.ttable
+        while node is not None:
+            node.visits += n
+            # node.wins 以走到本节点的一方（-to_move）计
+            node.wins += black_wins if node.to_move == WHITE else n - black_wins
+            if tt is not None:
+                tt.store(position_key(node.hash, node.to_move), node.visits,
+                         1.0 - node.wins / node.visits)
+            node = node.parent
+        return n
+
+    def best_move(self):
+        root = self.root
+        if root is None or not root.children:
+            if root is not None and root.untried:
+                return self.rng.choice(root.untried)
+            return None
+        return max(root.children.values(), key=lambda n: n.visits).move
+
+    def win_rate(self):
+        """根节点执子方的估计胜率（未搜索时为 None）。"""
+        root = self.root
+        if root is None or root.visits == 0:
+            return None
+        return 1.0 - root.wins / root.visits
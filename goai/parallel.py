@@ -0,0 +1,155 @@
+# goai/parallel.py
+"""
+多进程根并行 MCTS。
+
+- 同一根局面分发给进程池里的每个 worker，各自独立搜索，主进程把根节点各着法的访问次数相加后取最多者。
+- worker 常驻：进程池在多手之间复用，每个 worker 进程里有自己的 MCTS（含树复用），
+  不必每手重新拉起进程、重新 import。
+- 每次搜索给每个 worker 恰好一个任务：任务开始前在屏障上等齐 workers 个，
+  一个进程等在屏障上就不会再领第二个任务，所以按时间预算搜索时各任务确实并行。
+- 某个 worker 太慢或挂掉会打破屏障：worker 不再等、照常搜索（本次可能失去并行），
+  主进程在收齐结果后 reset 屏障，并计入 barrier_failures（及 instrument 计数 parallel.barrier_broken）。
+- worker 编号 0..workers-1 在进程启动时从队列领取，随机种子为 seed 加编号，同一 seed 可复现。
+- 局面以 board.pack_board 的紧凑字节串传输（19x19 为 92 字节），不 pickle Board 对象。
+"""
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from .board import pack_board, unpack_board
+from .mcts import MCTS, DEFAULT_KOMI
+from .ttable import TranspositionTable
+from . import instrument
+
+# 等齐各 worker 的屏障超时（秒）；超时只会失去并行，不影响结果正确
+BARRIER_TIMEOUT = 30.0
+
+# worker 进程内的常驻搜索器与同步屏障
+_ENGINE = None
+_BARRIER = None
+
+def _init_worker(komi, seed, ttable_bytes, indices, barrier):
+    global _ENGINE, _BARRIER
+    index = indices.get()
+    worker_seed = None if seed is None else seed * 1000003 + index
+    ttable = TranspositionTable(ttable_bytes) if ttable_bytes else None
+    _ENGINE = MCTS(playouts=0, komi=komi, seed=worker_seed, ttable=ttable)
+    _BARRIER = barrier
+
+def _worker_search(data, color, legal_moves, playouts, time_ms):
+    """worker 内搜索一次，返回 (本次搜索给根节点各着法增加的 {move: visits}, playouts, 是否等齐)。"""
+    try:
+        _BARRIER.wait(BARRIER_TIMEOUT)
+        synced = True
+    except threading.BrokenBarrierError:
+        synced = False
+    engine = _ENGINE
+    engine.playouts = playouts
+    engine.time_ms = time_ms
+    board = unpack_board(data)
+    # 树复用时根上已有以前搜索的访问数，只报本次增加的部分
+    old = engine._find_reusable(board.hash, color)
+    before = {m: ch.visits for m, ch in old.children.items()} if old is not None else {}
+    engine.search(board, color, legal_moves)
+    stats = {}
+    for m, ch in engine.root.children.items():
+        v = ch.visits - before.get(m, 0)
+        if v:
+            stats[m] = v
+    return stats, engine.last_playouts, synced
+
+
+class ParallelMCTS:
+    def __init__(self, workers=None, playouts=None, time_ms=None, komi=DEFAULT_KOMI, seed=None,
+                 ttable_bytes=None):
+        """
+        workers: 进程数，默认 os.cpu_count()
+        playouts: 每手的总 playout 数（平均分给各 worker）；time_ms: 每手的墙钟预算。
+        两者都不给时默认 1000 毫秒。
+        ttable_bytes: 若给出，每个 worker 各持有一张该内存上限的置换表。
+        """
+        if playouts is None and time_ms is None:
+            time_ms = 1000
+        self.workers = workers or os.cpu_count() or 1
+        self.playouts = playouts
+        self.time_ms = time_ms
+        self.komi = komi
+        ctx = multiprocessing.get_context()
+        indices = ctx.Queue()
+        for i in range(self.workers):
+            indices.put(i)
+        self._barrier = ctx.Barrier(self.workers)
+        self._executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=ctx,
+                                             initializer=_init_worker,
+                                             initargs=(komi, seed, ttable_bytes, indices,
+                                                       self._barrier))
+        # 主进程内的零预算搜索器：只用来处理“没有可搜索着法”的兜底情形
+        self._local = MCTS(playouts=0, komi=komi, seed=seed)
+        self.last_playouts = 0
+        self.last_seconds = 0.0
+        self.last_visits = {}
+        # 屏障被打破（有 worker 没等齐）的搜索次数
+        self.barrier_failures = 0
+
+    @property
+    def playouts_per_second(self):
+        if self.last_seconds <= 0:
+            return 0.0
+        return self.last_playouts / self.last_seconds
+
+    def search(self, board, color, legal_moves=None):
+        data = pack_board(board)
+        per_worker = None
+        if self.playouts is not None:
+            per_worker = max(1, self.playouts // self.workers)
+        start = time.perf_counter()
+        futures = [self._executor.submit(_worker_search, data, color, legal_moves,
+                                         per_worker, self.time_ms)
+                   for _ in range(self.workers)]
+        visits = {}
+        total = 0
+        synced = True
+        for f in futures:
+            stats, n, ok = f.result()
+            synced = synced and ok
+            total += n
+            for move, v in stats.items():
+                visits[move] = visits.get(move, 0) + v
+        if not synced or self._barrier.broken:
+            # 所有任务都已返回，没有 worker 在等：此时 reset 不会误伤下一次搜索
+            self._barrier.reset()
+            self.barrier_failures += 1
+            if instrument.enabled:
+                instrument.count("parallel.barrier_broken")
+        self.last_playouts = total
+        self.last_seconds = time.perf_counter() - start
+        self.last_visits = visits
+        if not visits:
+            return self._local.search(board, color, legal_moves)
+        return max(visits, key=visits.get)
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+
+
+# 手动测量扩展性：`python -m goai.parallel [size] [time_ms]`
+if __name__ == "__main__":
+    import sys
+    from .board import Board, BLACK
+
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 9
+    time_ms = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+    board = Board(size)
+    base = None
+    workers = 1
+    while workers <= (os.cpu_count() or 1):
+        engine = ParallelMCTS(workers=workers, time_ms=time_ms, seed=0)
+        engine.search(board, BLACK)   # 预热
+        engine.search(board, BLACK)
+        pps = engine.playouts_per_second
+        base = base or pps
+        print(f"workers={workers:3d}  {pps:10.0f} playouts/s  x{pps / base:5.2f}")
+        engine.close()
+        workers *= 2
@@ -0,0 +1,389 @@
+# goai/patterns.py
+"""
+3x3 模式先验：给每个空点一个便宜的局部着法质量权重。
+
+    python -m goai.patterns learn weights.json --sgf pro.sgf --store games.rec   # 离线学习
+    SimpleAI(level=1, patterns="weights.json")                                   # 按先验抽样选着
+    SimpleAI(level=2, patterns=...)                                              # MCTS playout 也按先验
+
+- 编码：一点周围 8 个邻点（北、东北、东、东南、南、西南、西、西北，顺时针）各 2 位：
+  0 空 / 1 黑 / 2 白 / 3 盘外，拼成 16 位整数。
+- 对称：8 种旋转 / 镜像下取最小码作为规范码（CANON 表，65536 项）；白方下时先交换黑白（SWAP 表），
+  所以权重表只按“轮到下的一方是黑”存。两张表首次使用时用按字节拆分的小表一次算好。
+- 增量：PatternState 维护每个点的当前码；落子 / 提子只改被改动点的 8 个邻点的 2 位，
+  不用每手重算全盘 361 个点。
+- 抽样：PatternTable.for_color(color) 是直接按码索引的权重列表；在空点列表里均匀抽一点，
+  以 权重 / 最大权重 的概率接受（拒绝抽样），期望尝试次数 = 最大权重 / 平均权重，与盘面大小无关。
+- 学习：learn() 在棋谱上统计每个规范码“出现在空点上”的次数（每手只抽样 SAMPLES 个空点再按比例放大）
+  与“被下”的次数，权重为平滑后的被下率相对平均被下率的倍数；没见过的模式权重为 1。
+"""
+import argparse
+import json
+import os
+import random
+import sys
+
+from .board import EMPTY, BLACK, WHITE, make_board
+from .playout import is_eye
+
+# 方向：北、东北、东、东南、南、西南、西、西北；第 d 个邻点占第 2d、2d+1 位
+DIRECTIONS = ((-1, 0), (-1, 1), (0, 1), (1, 1), (1, 0), (1, -1), (0, -1), (-1, -1))
+OFF = 3
+_VALUE_BITS = {EMPTY: 0, BLACK: 1, WHITE: 2}
+# 学习时每手抽样的空点数
+SAMPLES = 16
+# 学习的平滑伪计数
+PRIOR_COUNT = 5.0
+# 权重上限（同时是拒绝抽样的接受率分母）
+MAX_WEIGHT = 50.0
+# 拒绝抽样连续失败这么多次后，按当前候选直接接受
+MAX_REJECTS = 32
+
+
+# ---------- 码表 ----------
+def _symmetries():
+    """8 个对称变换，每个为方向置换 perm：原来在 d 的邻点移到 perm[d]。"""
+    perms = []
+    for mirror in (False, True):
+        for rot in range(4):
+            perm = []
+            for d in range(8):
+                e = (8 - d) % 8 if mirror else d
+                perm.append((e + 2 * rot) % 8)
+            perms.append(perm)
+    return perms
+
+_CANON = None
+_SWAP = None
+
+def _tables():
+    """(CANON, SWAP)：规范码与黑白互换后的码，均为 65536 项列表。"""
+    global _CANON, _SWAP
+    if _CANON is None:
+        # 低字节含方向 0..3，高字节含 4..7；每个对称各做两张 256 项的部分表
+        parts = []
+        for perm in _symmetries():
+            lo = [0] * 256
+            hi = [0] * 256
+            for b in range(256):
+                for j in range(4):
+                    v = (b >> (2 * j)) & 3
+                    lo[b] |= v << (2 * perm[j])
+                    hi[b] |= v << (2 * perm[j + 4])
+            parts.append((lo, hi))
+        canon = [0] * 65536
+        for code in range(65536):
+            low = code & 255
+            high = code >> 8
+            canon[code] = min(lo[low] | hi[high] for lo, hi in parts)
+        swap_byte = [0] * 256
+        for b in range(256):
+            for j in range(4):
+                v = (b >> (2 * j)) & 3
+                swap_byte[b] |= (3 - v if v in (1, 2) else v) << (2 * j)
+        _SWAP = [swap_byte[c & 255] | (swap_byte[c >> 8] << 8) for c in range(65536)]
+        _CANON = canon
+    return _CANON, _SWAP
+
+def canonical(code, color=BLACK):
+    """color 要下时 code 的规范码（白方先互换黑白）。"""
+    canon, swap = _tables()
+    return canon[code if color == BLACK else swap[code]]
+
+def code_at(board, r, c):
+    """从棋盘直接算 (r, c) 的 3x3 码（不用增量状态时）。"""
+    size = board.size
+    grid = board.grid
+    code = 0
+    for d, (dr, dc) in enumerate(DIRECTIONS):
+        rr, cc = r + dr, c + dc
+        v = _VALUE_BITS[grid[rr][cc]] if 0 <= rr < size and 0 <= cc < size else OFF
+        code |= v << (2 * d)
+    return code
+
+
+# ---------- 增量维护 ----------
+# size -> 每个点 p 的 [(邻点 q, p 在 q 的码里的位移)]
+_NEIGHBORS = {}
+
+def _neighbor_table(size):
+    table = _NEIGHBORS.get(size)
+    if table is None:
+        table = []
+        for r in range(size):
+            for c in range(size):
+                out = []
+                for d, (dr, dc) in enumerate(DIRECTIONS):
+                    rr, cc = r + dr, c + dc
+                    if 0 <= rr < size and 0 <= cc < size:
+                        out.append((rr * size + cc, 2 * ((d + 4) % 8)))
+                table.append(tuple(out))
+        _NEIGHBORS[size] = table
+    return table
+
+
+class PatternState:
+    """棋盘上每个点的当前 3x3 码（r * size + c 排列），随落子 / 提子 / 撤销增量更新。"""
+    __slots__ = ("size", "codes", "_nbrs")
+
+    def __init__(self, board):
+        size = board.size
+        self.size = size
+        self._nbrs = _neighbor_table(size)
+        self.codes = [code_at(board, r, c) for r in range(size) for c in range(size)]
+
+    def code(self, r, c):
+        return self.codes[r * self.size + c]
+
+    def set_point(self, r, c, value):
+        """(r, c) 的内容变成 value：改写它 8 个邻点码里对应的 2 位。"""
+        codes = self.codes
+        bits = _VALUE_BITS[value]
+        for q, shift in self._nbrs[r * self.size + c]:
+            codes[q] = (codes[q] & ~(3 << shift)) | (bits << shift)
+
+    def apply(self, record):
+        """跟上一次 play_move（UndoRecord）。"""
+        (r, c), color, captured = record
+        self.set_point(r, c, color)
+        for sr, sc in captured:
+            self.set_point(sr, sc, EMPTY)
+
+    def undo(self, record):
+        (r, c), color, captured = record
+        self.set_point(r, c, EMPTY)
+        for sr, sc in captured:
+            self.set_point(sr, sc, -color)
+
+
+# ---------- 权重表 ----------
+class PatternTable:
+    def __init__(self, weights=None):
+        """weights：规范码 -> 权重；未列出的模式权重为 1。建表后不再修改（max_weight 等按此缓存）。"""
+        self.weights = dict(weights or {})
+        self.max_weight = max([1.0] + list(self.weights.values()))
+        self._by_color = {}
+
+    def weight(self, code, color=BLACK):
+        return self.weights.get(canonical(code, color), 1.0)
+
+    def for_color(self, color):
+        """按原始码直接索引的权重列表（65536 项，首次调用时生成并缓存）。"""
+        table = self._by_color.get(color)
+        if table is None:
+            canon, swap = _tables()
+            get = self.weights.get
+            if color == BLACK:
+                table = [get(canon[c], 1.0) for c in range(65536)]
+            else:
+                table = [get(canon[swap[c]], 1.0) for c in range(65536)]
+            self._by_color[color] = table
+        return table
+
+    def save(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"format": "goai-patterns-3x3", "weights": {str(k): v for k, v in sorted(self.weights.items())}},
+                      f, indent=1)
+            f.write("\n")
+
+    @classmethod
+    def load(cls, path):
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        return cls({int(k): float(v) for k, v in data["weights"].items()})
+
+
+def default_table():
+    """
+    没有学习过的权重时用的手工先验：贴着棋子下加权，空旷的一线降权，
+    四邻全是己子或盘外（填自己的眼形）几乎不下。
+    """
+    canon, _ = _tables()
+    weights = {}
+    for code in set(canon):
+        fields = [(code >> (2 * d)) & 3 for d in range(8)]
+        orth = fields[0::2]
+        if all(v in (1, OFF) for v in orth) and 1 in orth:
+            w = 0.02
+        elif 1 in fields or 2 in fields:
+            w = 2.0 if (1 in orth or 2 in orth) else 1.5
+        elif OFF in fields:
+            w = 0.3
+        else:
+            continue
+        weights[code] = w
+    return PatternTable(weights)
+
+_DEFAULT = None
+
+def get_table(patterns=None):
+    """patterns：None（内置手工先验）、PatternTable 或权重 JSON 路径。"""
+    global _DEFAULT
+    if isinstance(patterns, PatternTable):
+        return patterns
+    if patterns is None:
+        if _DEFAULT is None:
+            _DEFAULT = default_table()
+        return _DEFAULT
+    return PatternTable.load(patterns)
+
+
+# ---------- 抽样 ----------
+def sample_move(board, color, moves, table, rng=random):
+    """
+    从候选着法 moves 里按先验权重抽一手（拒绝抽样，期望 O(1) 次尝试）；
+    moves 为空时返回 None。不检查合法性，调用方给的应是合法着法。
+    """
+    if not moves:
+        return None
+    weights = table.for_color(color)
+    wmax = table.max_weight
+    n = len(moves)
+    for _ in range(MAX_REJECTS):
+        move = moves[rng.randrange(n)]
+        if rng.random() * wmax < weights[code_at(board, move[0], move[1])]:
+            return move
+    return move
+
+def pattern_playout(board, color, rng=random, max_moves=None, table=None, records=None):
+    """
+    与 playout.random_playout 相同的规则（不填己方真眼，连续两次 pass 终局），
+    但候选点按 3x3 先验做拒绝抽样；码由 PatternState 增量维护。返回实际下的手数。
+    records: 同 random_playout，给出列表时追加每手的 UndoRecord。
+    """
+    table = get_table(table)
+    size = board.size
+    grid = board.grid
+    if max_moves is None:
+        max_moves = 3 * size * size
+    state = PatternState(board)
+    codes = state.codes
+    weights = {BLACK: table.for_color(BLACK), WHITE: table.for_color(WHITE)}
+    wmax = table.max_weight
+    empties = [(r, c) for r in range(size) for c in range(size) if grid[r][c] == EMPTY]
+    passes = 0
+    moves = 0
+    while passes < 2 and moves < max_moves:
+        played = False
+        w = weights[color]
+        rejects = 0
+        # 与 random_playout 相同：empties[:i] 为本手仍可考虑的点，下不了的点换到 i 之后
+        i = len(empties)
+        while i > 0:
+            k = rng.randrange(i)
+            r, c = empties[k]
+            if rejects < MAX_REJECTS and rng.random() * wmax >= w[codes[r * size + c]]:
+                rejects += 1
+                continue
+            if not is_eye(board, r, c, color):
+                record = board.play_move(r, c, color)
+                if record is not None:
+                    if records is not None:
+                        records.append(record)
+                    state.apply(record)
+                    empties[k] = empties[-1]
+                    empties.pop()
+                    empties.extend(record.captured)
+                    played = True
+                    break
+            i -= 1
+            empties[k], empties[i] = empties[i], empties[k]
+        passes = 0 if played else passes + 1
+        moves += played
+        color = -color
+    return moves
+
+
+# ---------- 学习 ----------
+def learn(games, samples=SAMPLES, prior=PRIOR_COUNT, seed=0):
+    """
+    games：可迭代的 (size, setup, moves)，setup / moves 为 (r, c, color) 序列。
+    返回 PatternTable。
+    """
+    rng = random.Random(seed)
+    chosen = {}
+    seen = {}
+    canon, swap = _tables()
+    for size, setup, moves in games:
+        board = make_board(size, "flat")
+        for r, c, color in setup:
+            board.place(r, c, color)
+        state = PatternState(board)
+        codes = state.codes
+        grid = board.grid
+        empties = [(r, c) for r in range(size) for c in range(size) if grid[r][c] == EMPTY]
+        where = {p: i for i, p in enumerate(empties)}
+        for r, c, color in moves:
+            if (r, c) not in where:
+                break
+            # 先落子：非法着法（及之后的着法）不计数。state、empties 稍后才更新，下面统计的仍是落子前的码
+            record = board.play_move(r, c, color)
+            if record is None:
+                break
+            flip = color == WHITE
+            key = canon[swap[codes[r * size + c]] if flip else codes[r * size + c]]
+            chosen[key] = chosen.get(key, 0) + 1
+            # 出现次数：抽样 samples 个空点，按比例放大
+            n = len(empties)
+            scale = n / min(samples, n)
+            for p in (empties if n <= samples else rng.sample(empties, samples)):
+                code = codes[p[0] * size + p[1]]
+                key = canon[swap[code] if flip else code]
+                seen[key] = seen.get(key, 0.0) + scale
+            state.apply(record)
+            i = where.pop((r, c))
+            last = empties.pop()
+            if last != (r, c):
+                empties[i] = last
+                where[last] = i
+            for p in record.captured:
+                where[p] = len(empties)
+                empties.append(p)
+    total_chosen = sum(chosen.values())
+    total_seen = sum(seen.values())
+    if not total_chosen:
+        return PatternTable()
+    base = total_chosen / total_seen
+    weights = {}
+    for key, s in seen.items():
+        rate = (chosen.get(key, 0) + prior) / (s + prior / base)
+        weights[key] = min(MAX_WEIGHT, round(rate / base, 4))
+    return PatternTable(weights)
+
+def _sgf_games(paths):
+    from .sgf import iter_games
+    for path in paths:
+        for record in iter_games(path):
+            yield record.size, record.setup, record.moves
+
+def _store_games(paths):
+    from .record_store import RecordStore
+    for path in paths:
+        with RecordStore(path) as store:
+            for info in store:
+                yield info.size, (), store.moves(info.gid)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m goai.patterns", description="3x3 模式先验")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("learn", help="从棋谱学习权重")
+    p.add_argument("out", help="输出的权重 JSON")
+    p.add_argument("--sgf", nargs="*", default=[], help="SGF 文件（可为多局合集）")
+    p.add_argument("--store", nargs="*", default=[], help="goai.record_store 对局库")
+    p.add_argument("--samples", type=int, default=SAMPLES)
+    args = parser.parse_args(argv)
+
+    def games():
+        yield from _sgf_games(args.sgf)
+        yield from _store_games(args.store)
+    table = learn(games(), samples=args.samples)
+    table.save(args.out)
+    top = sorted(table.weights.items(), key=lambda kv: -kv[1])[:5]
+    print(f"{len(table.weights)} patterns -> {args.out}; top weights: "
+          + ", ".join(f"{k:#06x}={w:g}" for k, w in top))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
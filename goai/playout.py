@@ -0,0 +1,83 @@
+# goai/playout.py
+"""
+轻量随机对局（playout）：MCTS 与胜率估计共用。
+
+- 随机选合法点落子，但不填自己的真眼；无子可下时 pass，连续两次 pass 终局。
+- 只通过 play_move 落子，因此适用于任何棋盘后端（Board / FlatBoard / BitBoard）。
+- 终局后按中国规则数子：棋子 + 只与一方相邻的空点。
+"""
+import random
+
+from .board import EMPTY, BLACK, WHITE
+
+def is_eye(board, r, c, color):
+    """(r,c) 是否为 color 的真眼：四邻全是己子，且对角敌子不超过 1（边角为 0）。"""
+    grid = board.grid
+    size = board.size
+    for nr, nc in board.neighbors(r, c):
+        if grid[nr][nc] != color:
+            return False
+    bad = 0
+    edge = r == 0 or c == 0 or r == size - 1 or c == size - 1
+    for dr, dc in ((-1, -1), (-1, 1), (1, -1), (1, 1)):
+        rr, cc = r + dr, c + dc
+        if 0 <= rr < size and 0 <= cc < size and grid[rr][cc] == -color:
+            bad += 1
+    return bad < (1 if edge else 2)
+
+def random_playout(board, color, rng=random, max_moves=None, records=None):
+    """
+    在 board 上（原地修改）从 color 开始随机下到终局，返回实际下的手数。
+    records: 若给出列表，依次追加每手的 UndoRecord，调用方可倒序 undo 还原棋盘。
+    """
+    size = board.size
+    grid = board.grid
+    if max_moves is None:
+        max_moves = 3 * size * size
+    empties = [(r, c) for r in range(size) for c in range(size) if grid[r][c] == EMPTY]
+    passes = 0
+    moves = 0
+    while passes < 2 and moves < max_moves:
+        played = False
+        # 在 empties[:i] 里随机抽点；不能下的点换到 i 之后，本手不再考虑
+        i = len(empties)
+        while i > 0:
+            k = rng.randrange(i)
+            r, c = empties[k]
+            if not is_eye(board, r, c, color):
+                record = board.play_move(r, c, color)
+                if record is not None:
+                    if records is not None:
+                        records.append(record)
+                    empties[k] = empties[-1]
+                    empties.pop()
+                    empties.extend(record.captured)
+                    played = True
+                    break
+            i -= 1
+            empties[k], empties[i] = empties[i], empties[k]
+        passes = 0 if played else passes + 1
+        moves += played
+        color = -color
+    return moves
+
+def area_score(board):
+    """中国规则数子，返回 黑方面积 - 白方面积（未计贴目）。空点只与一方相邻才算地。"""
+    grid = board.grid
+    size = board.size
+    score = 0
+    for r in range(size):
+        row = grid[r]
+        for c in range(size):
+            v = row[c]
+            if v == EMPTY:
+                near = 0
+                for nr, nc in board.neighbors(r, c):
+                    near |= 1 if grid[nr][nc] == BLACK else 2 if grid[nr][nc] == WHITE else 0
+                if near == 1:
+                    score += 1
+                elif near == 2:
+                    score -= 1
+            else:
+                score += v
+    return score
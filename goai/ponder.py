@@ -0,0 +1,123 @@
+# goai/ponder.py
+"""
+后台思考（pondering）线程。
+
+- 人类思考时，常驻线程持续在当前局面上跑 MCTS playout，树里积累的是人类各种应手下的子树。
+- 人类落子后请求 AI 着法：直接复用该应手下的子树，已攒够预算就立即返回，否则只补足差额。
+- 线程只读自己持有的棋盘拷贝，从不修改 GameManager；结果经 reply 回调交给调用方，
+  由调用方（GUI）放进队列、在 Tk 主线程里落子。
+- 非 MCTS 的 AI（level 0/1、多进程搜索）不做 pondering，只在后台线程里算出着法。
+"""
+import threading
+import time
+
+from .mcts import MCTS
+
+# 每次持锁检查一次新请求之间跑的 playout 数
+PONDER_SLICE = 8
+
+class PonderWorker:
+    def __init__(self, ai):
+        self.ai = ai
+        self.engine = ai.engine if isinstance(ai.engine, MCTS) else None
+        self._cond = threading.Condition()
+        self._ponder = None        # (board, color)
+        self._request = None       # (board, color, legal_moves, reply)
+        self._running = False
+        self._thread = None
+        # pondering 期间测得的 playout 速度，用来把毫秒预算折算成访问数
+        self._pps = 0.0
+        self.pondered = 0
+
+    def start(self):
+        with self._cond:
+            if self._running:
+                return
+            self._running = True
+        self._thread = threading.Thread(target=self._run, name="goai-ponder", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def ponder(self, board, color):
+        """在 board（拷贝）上为 color 方后台搜索，直到有新的请求。"""
+        if self.engine is None:
+            return
+        snapshot = board._copy()
+        with self._cond:
+            self._ponder = (snapshot, color)
+            self._cond.notify_all()
+
+    def request_move(self, board, color, legal_moves, reply):
+        """请求 color 方着法；完成后在后台线程调用 reply(move, board_hash)。"""
+        snapshot = board._copy()
+        with self._cond:
+            self._ponder = None
+            self._request = (snapshot, color, legal_moves, reply)
+            self._cond.notify_all()
+
+    def cancel(self):
+        """丢弃未开始的请求并停止 pondering（悔棋 / 重开时调用）。"""
+        with self._cond:
+            self._ponder = None
+            self._request = None
+
+    # ---------- 线程主体 ----------
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._running and self._request is None and self._ponder is None:
+                    self._cond.wait()
+                if not self._running:
+                    return
+                request, self._request = self._request, None
+                ponder = self._ponder
+            if request is not None:
+                board, color, legal_moves, reply = request
+                reply(self._think(board, color, legal_moves), board.hash)
+            else:
+                self._ponder_slice(*ponder)
+
+    def _ponder_slice(self, board, color):
+        engine = self.engine
+        engine._prepare_root(board, color, None)
+        if not engine.root.untried and not engine.root.children:
+            # 无可搜索着法：停止 pondering，等新请求
+            with self._cond:
+                if self._ponder is not None and self._ponder[0] is board:
+                    self._ponder = None
+            return
+        start = time.perf_counter()
+        n = 0
+        for _ in range(PONDER_SLICE):
+            n += engine.run_playout(board)
+        elapsed = time.perf_counter() - start
+        if elapsed > 0:
+            pps = n / elapsed
+            self._pps = pps if not self._pps else 0.9 * self._pps + 0.1 * pps
+        self.pondered += n
+
+    def _think(self, board, color, legal_moves):
+        engine = self.engine
+        if engine is None:
+            return self.ai.select_move(board, color, legal_moves=legal_moves)
+        root = engine._prepare_root(board, color, legal_moves)
+        # 预算按“根节点访问数”计：pondering 已攒下的访问数直接抵扣
+        if engine.playouts is not None:
+            target = engine.playouts
+        elif self._pps:
+            target = int(self._pps * engine.time_ms / 1000.0)
+        else:
+            return engine.search(board, color, legal_moves)
+        saved = engine.playouts
+        engine.playouts = max(0, target - root.visits)
+        try:
+            return engine.search(board, color, legal_moves)
+        finally:
+            engine.playouts = saved
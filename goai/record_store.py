@@ -0,0 +1,245 @@
+# goai/record_store.py
+"""
+二进制对局库：只追加的文件 + mmap 读取，随机访问任意一盘的任意局面。
+
+    python -m goai.record_store games.rec                     # 概况
+    python -m goai.record_store games.rec 12 150              # 第 12 盘第 150 手后的局面
+    python -m goai.selfplay ... --store games.rec             # 自对弈直接写入
+
+文件格式（小端）：
+- 数据文件：8 字节魔数 b"GOAIREC1"，之后逐盘紧接着写记录：
+    头 16 字节：uint32 记录总长、uint8 路数、uint8 结果（0 未定 / 1 黑胜 / 2 白胜 / 3 和）、
+               uint16 检查点间隔 K、uint32 手数 n、float32 贴目
+    着法：n * 2 字节（board.pack_moves 格式）
+    检查点：第 K、2K、... 手之后的局面，每个为 pack_board（19x19 共 92 字节）
+- 索引文件（同名加 .idx）：每盘一个 uint64 记录起始偏移；丢失时按记录长度扫描重建。
+
+取第 m 手后的局面：解出最近的检查点（第 m // K * K 手），再重放不到 K 手，
+与从第 1 手重放相比，代价与对局长度无关。文件经 mmap 按需读页，几百万盘也不必载入内存。
+"""
+import mmap
+import os
+import struct
+import sys
+
+from .board import EMPTY, BLACK, WHITE, make_board, pack_board, unpack_board, pack_moves, unpack_moves
+from .scoring import DEFAULT_KOMI
+
+MAGIC = b"GOAIREC1"
+HEADER = struct.Struct("<IBBHIf")
+OFFSET = struct.Struct("<Q")
+CHECKPOINT_INTERVAL = 16
+RESULTS = {None: 0, BLACK: 1, WHITE: 2, EMPTY: 3}
+RESULT_NAMES = ("?", "B", "W", "0")
+
+
+class GameInfo:
+    __slots__ = ("gid", "offset", "size", "result", "interval", "moves", "komi")
+
+    def __init__(self, gid, offset, size, result, interval, moves, komi):
+        self.gid = gid
+        self.offset = offset
+        self.size = size
+        self.result = result          # None / BLACK / WHITE / EMPTY（和）
+        self.interval = interval
+        self.moves = moves
+        self.komi = komi
+
+    def __repr__(self):
+        winner = RESULT_NAMES[RESULTS[self.result]]
+        return f"GameInfo(#{self.gid}, {self.size}x{self.size}, {self.moves} moves, winner {winner})"
+
+
+def _packed_len(size):
+    return 1 + (size * size + 3) // 4
+
+
+class RecordStore:
+    def __init__(self, path, checkpoint_interval=CHECKPOINT_INTERVAL):
+        self.path = path
+        self.index_path = path + ".idx"
+        self.checkpoint_interval = checkpoint_interval
+        new = not os.path.exists(path) or os.path.getsize(path) == 0
+        self._data = open(path, "a+b")
+        if new:
+            self._data.write(MAGIC)
+            self._data.flush()
+        else:
+            self._data.seek(0)
+            if self._data.read(len(MAGIC)) != MAGIC:
+                self._data.close()
+                raise ValueError(f"{path}: not a goai record store")
+        self._index = open(self.index_path, "a+b")
+        self._map = None
+        self._index_map = None
+        self._check_index()
+
+    # ---------- 打开 / 关闭 ----------
+    def close(self):
+        for m in (self._map, self._index_map):
+            if m is not None:
+                m.close()
+        self._map = self._index_map = None
+        self._data.close()
+        self._index.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+    def _check_index(self):
+        """
+        索引缺失或落后于数据文件（如写入时中断）时，按记录长度扫描补齐；
+        末尾的半截记录（及半截索引项）直接截掉，之后的追加从完整记录末尾接着写。
+        """
+        self._data_size = os.path.getsize(self.path)
+        index_size = os.path.getsize(self.index_path)
+        self._count = index_size // OFFSET.size
+        if index_size % OFFSET.size:
+            self._index.truncate(self._count * OFFSET.size)
+        offset = len(MAGIC)
+        if self._count:
+            last = self._offset(self._count - 1)
+            offset = last + HEADER.unpack_from(self._mapped(), last)[0]
+        if offset >= self._data_size:
+            return
+        data = self._mapped()
+        self._index.seek(0, os.SEEK_END)
+        while offset + HEADER.size <= self._data_size:
+            length = HEADER.unpack_from(data, offset)[0]
+            if offset + length > self._data_size:
+                break
+            self._index.write(OFFSET.pack(offset))
+            self._count += 1
+            offset += length
+        self._index.flush()
+        if offset < self._data_size:
+            # 半截记录：先解除映射再截断，否则映射里会留着已不存在的页
+            self._map.close()
+            self._map = None
+            self._data.truncate(offset)
+            self._data_size = offset
+
+    def _mapped(self):
+        """数据文件的 mmap；只在已知的文件长度超出当前映射（追加过）时重新映射，不 stat 文件。"""
+        if self._map is None or len(self._map) < self._data_size:
+            if self._map is not None:
+                self._map.close()
+            self._map = mmap.mmap(self._data.fileno(), self._data_size, access=mmap.ACCESS_READ)
+        return self._map
+
+    def _offset(self, gid):
+        end = (gid + 1) * OFFSET.size
+        if self._index_map is None or len(self._index_map) < end:
+            if self._index_map is not None:
+                self._index_map.close()
+            self._index_map = mmap.mmap(self._index.fileno(), self._count * OFFSET.size,
+                                        access=mmap.ACCESS_READ)
+        return OFFSET.unpack_from(self._index_map, gid * OFFSET.size)[0]
+
+    def __len__(self):
+        return self._count
+
+    # ---------- 写 ----------
+    def append(self, moves, size, komi=DEFAULT_KOMI, result=None):
+        """
+        追加一盘：moves 为 (r, c, color) 序列；result 为 BLACK / WHITE / EMPTY（和）/ None。
+        边写边在棋盘上重放生成检查点，遇到非法着法抛 ValueError。返回对局编号。
+        """
+        moves = list(moves)
+        k = self.checkpoint_interval
+        board = make_board(size, "flat")
+        checkpoints = []
+        for i, (r, c, color) in enumerate(moves, 1):
+            if not board.place(r, c, color):
+                raise ValueError(f"illegal move {i}: {(r, c, color)}")
+            if i % k == 0:
+                checkpoints.append(pack_board(board))
+        body = pack_moves(moves, size) + b"".join(checkpoints)
+        header = HEADER.pack(HEADER.size + len(body), size, RESULTS[result], k, len(moves), komi)
+        offset = self._data_size
+        self._data.write(header + body)
+        self._data.flush()
+        self._data_size += len(header) + len(body)
+        gid = self._count
+        self._index.write(OFFSET.pack(offset))
+        self._index.flush()
+        self._count += 1
+        return gid
+
+    def append_game(self, game):
+        """追加一盘 GameManager 对局（结果取自 game.result）。"""
+        from .game_manager import GameResult
+        result = {GameResult.BLACK_WINS: BLACK, GameResult.WHITE_WINS: WHITE,
+                  GameResult.DRAW: EMPTY}.get(game.result)
+        return self.append(((rec.point[0], rec.point[1], rec.color) for rec in game.history),
+                           game.size, game.komi, result)
+
+    # ---------- 读 ----------
+    def info(self, gid):
+        if not 0 <= gid < len(self):
+            raise IndexError(f"game {gid} out of range")
+        offset = self._offset(gid)
+        _, size, result, interval, n, komi = HEADER.unpack_from(self._mapped(), offset)
+        return GameInfo(gid, offset, size, (None, BLACK, WHITE, EMPTY)[result], interval, n, komi)
+
+    def moves(self, gid, start=0, stop=None):
+        """第 gid 盘的着法 [start, stop)，为 (r, c, color) 列表。"""
+        return self._moves(self.info(gid), start, stop)
+
+    def _moves(self, info, start=0, stop=None):
+        stop = info.moves if stop is None else min(stop, info.moves)
+        base = info.offset + HEADER.size
+        data = self._mapped()[base + 2 * start:base + 2 * stop]
+        return list(unpack_moves(data, info.size))
+
+    def position(self, gid, move_number=None, backend="flat"):
+        """
+        第 gid 盘下完前 move_number 手后的局面（None 为终局）。
+        默认 flat 后端：解检查点只需填格子、算哈希；list 后端还要重建全部联通块，慢 2～3 倍。
+        """
+        info = self.info(gid)
+        m = info.moves if move_number is None else move_number
+        if not 0 <= m <= info.moves:
+            raise IndexError(f"move {m} out of range 0..{info.moves}")
+        j = m // info.interval
+        if j:
+            plen = _packed_len(info.size)
+            at = info.offset + HEADER.size + 2 * info.moves + (j - 1) * plen
+            board = unpack_board(self._mapped()[at:at + plen], backend)
+        else:
+            board = make_board(info.size, backend)
+        for r, c, color in self._moves(info, j * info.interval, m):
+            board.place(r, c, color)
+        return board
+
+    def __iter__(self):
+        for gid in range(len(self)):
+            yield self.info(gid)
+
+
+# 手动查看 / 计时：`python -m goai.record_store path [gid [move]]`
+if __name__ == "__main__":
+    import random
+    import time
+
+    store = RecordStore(sys.argv[1])
+    if len(sys.argv) > 2:
+        gid = int(sys.argv[2])
+        move = int(sys.argv[3]) if len(sys.argv) > 3 else None
+        print(store.info(gid))
+        store.position(gid, move).display()
+    else:
+        n = len(store)
+        print(f"{n} games, {os.path.getsize(store.path) / max(n, 1):.0f} bytes/game")
+        if n:
+            rng = random.Random(0)
+            probes = [rng.randrange(n) for _ in range(1000)]
+            start = time.perf_counter()
+            for gid in probes:
+                store.position(gid, rng.randint(0, store.info(gid).moves))
+            print(f"random position access: {(time.perf_counter() - start) * 1e3:.3f} ms/position")
+    store.close()
@@ -0,0 +1,248 @@
+# goai/selfplay.py
+"""
+无界面的 AI 对 AI 自对弈，用来衡量引擎强弱与吞吐。
+
+    python -m goai.selfplay -n 200 --size 9 --a level=2,playouts=200 --b level=0 -j 4 --out games.jsonl
+
+- 引擎用 "key=value,..." 描述，直接作为 SimpleAI 的参数（level / playouts / time_ms / batch ...）。
+- 默认每局交换执子颜色，A、B 各执黑一半。
+- 对局分发到进程池，每盘结束就把记录（含着法列表）写一行 JSON 到输出文件；主进程只累计统计量，
+  不在内存里保留对局。
+- 不允许 pass：一方无合法着法即告负；到 max_moves 手仍未结束则按中国规则数子。
+- 报告 局/秒、手/秒、平均每手用时，以及 A 的胜率（Wilson 95% 置信区间）。
+"""
+import argparse
+import json
+import math
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+from .board import EMPTY, BLACK, WHITE
+from .ai import SimpleAI
+from .game_manager import GameManager, GameResult
+from .scoring import DEFAULT_KOMI
+
+def parse_engine(spec):
+    """'level=2,playouts=200' -> {'level': 2, 'playouts': 200}；数值自动转换。"""
+    kwargs = {}
+    for part in spec.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        key, _, value = part.partition("=")
+        for conv in (int, float):
+            try:
+                value = conv(value)
+                break
+            except ValueError:
+                pass
+        kwargs[key.strip()] = value
+    return kwargs
+
+def wilson_interval(wins, n, z=1.96):
+    """胜率的 Wilson 置信区间（wins 可含 0.5 的和棋）。n 为 0 时返回 (0, 1)。"""
+    if n == 0:
+        return 0.0, 1.0
+    p = wins / n
+    denom = 1 + z * z / n
+    centre = (p + z * z / (2 * n)) / denom
+    half = z * math.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / denom
+    return max(0.0, centre - half), min(1.0, centre + half)
+
+def play_game(index, size, a_spec, b_spec, a_black, seed, max_moves, komi, score_playouts):
+    """下一盘，返回可写成 JSON 的记录。在 worker 进程中运行。"""
+    random.seed(seed)
+    specs = {"A": a_spec, "B": b_spec}
+    black, white = ("A", "B") if a_black else ("B", "A")
+    # 引擎描述里写了 seed 时以它为准，否则按对局种子派生
+    ais = {BLACK: SimpleAI(**{"seed": seed * 2, **parse_engine(specs[black])}),
+           WHITE: SimpleAI(**{"seed": seed * 2 + 1, **parse_engine(specs[white])})}
+    game = GameManager(size=size, ai=None, komi=komi)
+    think = 0.0
+    start = time.perf_counter()
+    try:
+        while game.result == GameResult.ONGOING and len(game.history) < max_moves:
+            color = game.to_move
+            # 双方都由 AI 执子：轮到谁，谁就是 GameManager 眼中的“AI 方”
+            game.ai, game.ai_color, game.human_color = ais[color], color, -color
+            t = time.perf_counter()
+            game.make_ai_move()
+            think += time.perf_counter() - t
+    finally:
+        for ai in ais.values():
+            ai.close()
+    if game.result == GameResult.ONGOING:
+        game.end_by_score(dead_stones=None if score_playouts else (), playouts=score_playouts)
+    winner = {GameResult.BLACK_WINS: black, GameResult.WHITE_WINS: white}.get(game.result)
+    if game.score_result is not None:
+        result = str(game.score_result)
+    else:
+        result = ("B" if game.result == GameResult.BLACK_WINS else "W") + "+R"
+    return {
+        "game": index,
+        "seed": seed,
+        "size": size,
+        "black": black,
+        "white": white,
+        "black_engine": specs[black],
+        "white_engine": specs[white],
+        "winner": winner,
+        "result": result,
+        "moves": [[rec.point[0], rec.point[1]] for rec in game.history],
+        "think_seconds": round(think, 6),
+        "seconds": round(time.perf_counter() - start, 6),
+    }
+
+
+class SelfPlayStats:
+    """流式累计的统计量（不保留对局记录）。"""
+
+    def __init__(self):
+        self.games = 0
+        self.moves = 0
+        self.think_seconds = 0.0
+        self.a_wins = 0
+        self.b_wins = 0
+        self.draws = 0
+        self.black_wins = 0
+        self.started = time.perf_counter()
+
+    def add(self, record):
+        self.games += 1
+        self.moves += len(record["moves"])
+        self.think_seconds += record["think_seconds"]
+        winner = record["winner"]
+        if winner == "A":
+            self.a_wins += 1
+        elif winner == "B":
+            self.b_wins += 1
+        else:
+            self.draws += 1
+        if winner is not None and winner == record["black"]:
+            self.black_wins += 1
+
+    def summary(self):
+        elapsed = time.perf_counter() - self.started
+        score = self.a_wins + 0.5 * self.draws
+        lo, hi = wilson_interval(score, self.games)
+        return {
+            "games": self.games,
+            "moves": self.moves,
+            "elapsed": elapsed,
+            "games_per_sec": self.games / elapsed if elapsed > 0 else 0.0,
+            "moves_per_sec": self.moves / elapsed if elapsed > 0 else 0.0,
+            "ms_per_move": 1000.0 * self.think_seconds / self.moves if self.moves else 0.0,
+            "a_wins": self.a_wins,
+            "b_wins": self.b_wins,
+            "draws": self.draws,
+            "a_win_rate": score / self.games if self.games else 0.0,
+            "a_win_rate_ci95": (lo, hi),
+            "black_win_rate": self.black_wins / self.games if self.games else 0.0,
+        }
+
+    def format(self):
+        s = self.summary()
+        lo, hi = s["a_win_rate_ci95"]
+        return (f"games {s['games']}  moves {s['moves']}  elapsed {s['elapsed']:.1f}s\n"
+                f"{s['games_per_sec']:.2f} games/s  {s['moves_per_sec']:.1f} moves/s  "
+                f"{s['ms_per_move']:.2f} ms/move\n"
+                f"A {s['a_wins']} - B {s['b_wins']} - draw {s['draws']}  "
+                f"A win rate {s['a_win_rate']:.1%} (95% CI {lo:.1%} .. {hi:.1%})  "
+                f"black wins {s['black_win_rate']:.1%}")
+
+
+def run_selfplay(games, out, size=9, a="level=0", b="level=0", workers=None, seed=0,
+                 max_moves=None, komi=DEFAULT_KOMI, score_playouts=0, swap=True, progress=None,
+                 store=None):
+    """
+    下 games 盘，每盘一行 JSON 写入 out（文件对象），返回 SelfPlayStats。
+    store: 可选的 goai.record_store.RecordStore，每盘同时追加进二进制对局库。
+    workers: 进程数，默认 os.cpu_count()；1 则在本进程内逐盘下（便于调试）。
+    progress: 可选回调，每盘结束时以 (stats, record) 调用。
+    """
+    if max_moves is None:
+        max_moves = 2 * size * size
+    workers = workers or os.cpu_count() or 1
+    stats = SelfPlayStats()
+
+    def job(i):
+        return (i, size, a, b, not swap or i % 2 == 0, seed + i, max_moves, komi, score_playouts)
+
+    def emit(record):
+        out.write(json.dumps(record) + "\n")
+        out.flush()
+        if store is not None:
+            # 不允许 pass，黑先、双方交替
+            winner = record["result"][0]
+            store.append(((r, c, BLACK if i % 2 == 0 else WHITE) for i, (r, c) in enumerate(record["moves"])),
+                         size, komi, {"B": BLACK, "W": WHITE}.get(winner, EMPTY))
+        stats.add(record)
+        if progress is not None:
+            progress(stats, record)
+
+    if workers == 1:
+        for i in range(games):
+            emit(play_game(*job(i)))
+        return stats
+    # 同时在途的对局数有上限，任务与结果都不会在内存里堆积
+    window = 4 * workers
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = set()
+        submitted = 0
+        while submitted < games or pending:
+            while submitted < games and len(pending) < window:
+                pending.add(pool.submit(play_game, *job(submitted)))
+                submitted += 1
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for f in done:
+                emit(f.result())
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m goai.selfplay", description="AI 对 AI 自对弈")
+    parser.add_argument("-n", "--games", type=int, default=100)
+    parser.add_argument("--size", type=int, default=9)
+    parser.add_argument("--a", default="level=2,playouts=100", help="引擎 A，如 level=2,playouts=200")
+    parser.add_argument("--b", default="level=0", help="引擎 B")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="进程数，默认 CPU 核数")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-moves", type=int, default=None, help="到此手数按数子结束，默认 2*size*size")
+    parser.add_argument("--komi", type=float, default=DEFAULT_KOMI)
+    parser.add_argument("--score-playouts", type=int, default=0,
+                        help="数子时估计死子用的 playout 数，0 为不判死子")
+    parser.add_argument("--no-swap", action="store_true", help="不交换颜色：A 始终执黑")
+    parser.add_argument("--out", default="selfplay.jsonl", help="对局记录输出文件（JSON Lines）")
+    parser.add_argument("--store", default=None, help="同时追加进二进制对局库（goai.record_store）")
+    parser.add_argument("--quiet", action="store_true")
+    args = parser.parse_args(argv)
+
+    def progress(stats, record):
+        if not args.quiet:
+            print(f"\rgame {stats.games}/{args.games}  {record['result']:>8}  "
+                  f"winner {record['winner'] or '-'}", end="", file=sys.stderr, flush=True)
+
+    store = None
+    if args.store:
+        from .record_store import RecordStore
+        store = RecordStore(args.store)
+    try:
+        with open(args.out, "w", encoding="utf-8") as out:
+            stats = run_selfplay(args.games, out, size=args.size, a=args.a, b=args.b,
+                                 workers=args.workers, seed=args.seed, max_moves=args.max_moves,
+                                 komi=args.komi, score_playouts=args.score_playouts,
+                                 swap=not args.no_swap, progress=progress, store=store)
+    finally:
+        if store is not None:
+            store.close()
+    if not args.quiet:
+        print(file=sys.stderr)
+    print(stats.format())
+    return stats
+
+
+if __name__ == "__main__":
+    main()
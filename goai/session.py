@@ -0,0 +1,200 @@
+# goai/session.py
+"""
+省内存的对局会话：一个进程托管成千上万盘空闲对局（如通信对局）。
+
+- CompactSession（__slots__）休眠时只保存：
+  pack_board 局面（19x19 共 92 字节，每点 2 位）与 pack_moves 着法记录（每手 2 字节），
+  外加尺寸、贴目、执子方、结果（数子终局时连同 ScoreResult）几个小对象，以及开局摆子（同为每子 2 字节）；
+  不持有 Board、AI 或各种集合。
+- 需要下棋时 session.game 按着法记录重放出完整的 GameManager（历史、同形哈希、合法点集合），
+  之后直接在 GameManager 上操作；hibernate() 再压回紧凑形式。
+- SessionStore 按 LRU 只保留 max_active 盘处于展开状态，其余自动休眠；AI 由整个仓库共享。
+- 内存：`python -m goai.session [games] [moves]` 用 tracemalloc 测每盘空闲对局的字节数，
+  并与展开的 GameManager 对比；19x19 下到 100 手的空闲对局约 400 多字节。
+"""
+import sys
+from collections import OrderedDict
+
+from .board import BLACK, pack_board, unpack_board, pack_moves, unpack_moves
+from .game_manager import GameManager, GameResult
+from .scoring import DEFAULT_KOMI
+
+
+class CompactSession:
+    __slots__ = ("size", "komi", "human_color", "to_move", "result", "score_result", "board_data",
+                 "setup", "moves", "_game")
+
+    def __init__(self, size=19, human_color=BLACK, komi=DEFAULT_KOMI):
+        self.size = size
+        self.komi = komi
+        self.human_color = human_color
+        self.to_move = BLACK
+        self.result = GameResult.ONGOING
+        self.score_result = None
+        self.board_data = None
+        self.setup = b""
+        self.moves = b""
+        self._game = None
+
+    @classmethod
+    def from_game(cls, game):
+        """把一盘 GameManager 压成休眠会话（之后不再引用原对象）。"""
+        s = cls(game.size, game.human_color, game.komi)
+        s._game = game
+        s.hibernate()
+        return s
+
+    @property
+    def hibernated(self):
+        return self._game is None
+
+    def hibernate(self):
+        """丢掉展开的 GameManager，只留局面与着法记录。"""
+        game = self._game
+        if game is None:
+            return
+        self.to_move = game.to_move
+        self.result = game.result
+        self.score_result = game.score_result
+        self.komi = game.komi
+        self.board_data = pack_board(game.board)
+        self.setup = pack_moves(game.setup, self.size)
+        self.moves = pack_moves(game.history, self.size)
+        self._game = None
+
+    def rehydrate(self, ai=None, backend="list"):
+        """按着法记录重放出 GameManager（休眠时才重放），返回它。"""
+        if self._game is not None:
+            if ai is not None:
+                self._game.ai = ai
+            return self._game
+        game = GameManager(size=self.size, ai=ai, human_color=self.human_color,
+                           backend=backend, komi=self.komi)
+        board = game.board
+        if self.setup:
+            game.setup = list(unpack_moves(self.setup, self.size))
+            for r, c, color in game.setup:
+                board.place(r, c, color)
+            game.seen_hashes = {board.hash}
+        for r, c, color in unpack_moves(self.moves, self.size):
+            game.history.append(board.play_move(r, c, color))
+            game.seen_hashes.add(board.hash)
+        # 重放时不逐手增量维护合法点，最后整盘算一次
+        game.sync_legal_moves()
+        game.to_move = self.to_move
+        game.result = self.result
+        game.score_result = self.score_result
+        self._game = game
+        return game
+
+    @property
+    def game(self):
+        return self.rehydrate()
+
+    def board(self):
+        """只读局面：休眠时直接从 board_data 解出，不重放、不唤醒会话。"""
+        if self._game is not None:
+            return self._game.board
+        if self.board_data is None:
+            return GameManager(size=self.size).board
+        return unpack_board(self.board_data)
+
+    def move_count(self):
+        if self._game is not None:
+            return len(self._game.history)
+        return len(self.moves) // 2
+
+    def nbytes(self):
+        """休眠状态下本对象及其独占数据的字节数（共享的小整数、字符串不计）。"""
+        total = sys.getsizeof(self) + sys.getsizeof(self.moves) + sys.getsizeof(self.setup)
+        if self.board_data is not None:
+            total += sys.getsizeof(self.board_data)
+        return total
+
+
+class SessionStore:
+    """按 id 保存会话；最多 max_active 盘展开，多出的按最久未用休眠。"""
+
+    def __init__(self, ai=None, max_active=64):
+        self.ai = ai
+        self.max_active = max_active
+        self.sessions = {}
+        self._active = OrderedDict()
+        self._next_id = 0
+
+    def __len__(self):
+        return len(self.sessions)
+
+    def new(self, size=19, human_color=BLACK, komi=DEFAULT_KOMI):
+        self._next_id += 1
+        self.sessions[self._next_id] = CompactSession(size, human_color, komi)
+        return self._next_id
+
+    def game(self, sid):
+        """取会话 sid 的 GameManager（必要时重放），并标记为最近使用。"""
+        session = self.sessions[sid]
+        game = session.rehydrate(self.ai)
+        self._active[sid] = None
+        self._active.move_to_end(sid)
+        while len(self._active) > self.max_active:
+            old, _ = self._active.popitem(last=False)
+            self.sessions[old].hibernate()
+        return game
+
+    def hibernate_all(self):
+        for sid in self._active:
+            self.sessions[sid].hibernate()
+        self._active.clear()
+
+    def remove(self, sid):
+        self._active.pop(sid, None)
+        return self.sessions.pop(sid)
+
+    def active_count(self):
+        return len(self._active)
+
+
+def measure_idle(games=1000, moves=100, size=19, seed=0):
+    """
+    用 tracemalloc 测空闲会话的平均字节数：先随机下一盘 moves 手，
+    再造 games 个互不共享数据的休眠副本。返回 (每盘休眠字节数, 每盘展开 GameManager 字节数)。
+    """
+    import random
+    import tracemalloc
+
+    game = GameManager(size=size)
+    rng = random.Random(seed)
+    while len(game.history) < moves and game.result == GameResult.ONGOING:
+        r, c = rng.choice(game.legal_moves_for(game.to_move))
+        game.play(r, c, game.to_move)
+    template = CompactSession.from_game(game)
+
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    held = []
+    for _ in range(games):
+        s = CompactSession(size, template.human_color, template.komi)
+        s.to_move = template.to_move
+        s.result = template.result
+        s.board_data = bytes(bytearray(template.board_data))
+        s.moves = bytes(bytearray(template.moves))
+        held.append(s)
+    idle = (tracemalloc.get_traced_memory()[0] - base - sys.getsizeof(held)) / games
+    base = tracemalloc.get_traced_memory()[0]
+    expanded = []
+    for _ in range(min(games, 20)):
+        s = CompactSession(size, template.human_color, template.komi)
+        s.moves = template.moves
+        s.to_move = template.to_move
+        expanded.append(s.rehydrate())
+    full = (tracemalloc.get_traced_memory()[0] - base - sys.getsizeof(expanded)) / len(expanded)
+    tracemalloc.stop()
+    return idle, full
+
+
+# `python -m goai.session [games] [moves]`
+if __name__ == "__main__":
+    games = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    moves = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+    idle, full = measure_idle(games, moves)
+    print(f"19x19, {moves} moves: {idle:8.0f} bytes/idle session   {full:10.0f} bytes/expanded GameManager")
@@ -0,0 +1,368 @@
+# goai/sgf.py
+"""
+SGF（FF[4]）读写与大批量棋谱处理。
+
+    python -m goai.sgf games.sgf more/*.sgf -j 4        # 流式解析 + 逐盘重放校验，报告 局/秒
+
+- 读写单盘：game_to_sgf / save_sgf 把 GameManager 对局写成 SGF；
+  game_from_sgf / load_sgf 解析并在 GameManager 上重放（同样的合法性与同形判定）。
+- 流式：iter_game_texts(源) 以固定大小的块读文件，按括号深度切出每一盘的原始字节，
+  逐盘产出；内存里同时只有一盘，几百 MB 的合集也不整体读入。
+- 解析只取主线（每个分支的第一个变化）；AB/AW 摆子作为初始局面。
+  项目规则没有 pass，棋谱里的 pass（B[] 或 19 路以内的 B[tt]）跳过，只计入 passes。
+- 批量：process_collection 把原始文本成批发给进程池，工作进程解析并执行 fn
+  （默认 replay_summary：在 Board 上重放校验），按完成顺序产出结果；fn 需为模块级函数
+  （可被 pickle），开局统计、模式学习等都可以套用同一流水线。
+"""
+import argparse
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+from .board import BLACK, WHITE, make_board
+from .game_manager import GameManager, GameResult
+from .scoring import DEFAULT_KOMI
+
+CHUNK_SIZE = 1 << 16
+BATCH = 64
+
+# ---------- 坐标 ----------
+def encode_point(r, c):
+    return chr(97 + c) + chr(97 + r)
+
+def decode_point(value, size):
+    """'pd' -> (r, c)；空串或 19 路以内的 'tt' 为 pass，返回 None。"""
+    if not value or (value == "tt" and size <= 19):
+        return None
+    if len(value) != 2:
+        raise ValueError(f"bad SGF point: {value!r}")
+    c, r = ord(value[0]) - 97, ord(value[1]) - 97
+    if not (0 <= r < size and 0 <= c < size):
+        raise ValueError(f"SGF point off board: {value!r}")
+    return r, c
+
+def _escape(text):
+    return str(text).replace("\\", "\\\\").replace("]", "\\]")
+
+
+# ---------- 写 ----------
+def result_string(game):
+    """GameManager 的结果写成 SGF 的 RE 值；未结束返回 None。"""
+    if game.score_result is not None:
+        return "0" if game.result == GameResult.DRAW else str(game.score_result)
+    if game.result == GameResult.BLACK_WINS:
+        return "B+R"
+    if game.result == GameResult.WHITE_WINS:
+        return "W+R"
+    if game.result == GameResult.DRAW:
+        return "0"
+    return None
+
+def game_to_sgf(game, black=None, white=None, **extra):
+    """
+    把 GameManager 的摆子（AB / AW）与着法历史写成一盘 SGF 文本。
+    extra 为额外的根节点属性（如 DT="2024-01-01"）。
+    """
+    props = [("GM", "1"), ("FF", "4"), ("CA", "UTF-8"), ("AP", "solo-go"), ("RU", "Chinese"),
+             ("SZ", str(game.size)), ("KM", f"{game.komi:g}")]
+    if black is not None:
+        props.append(("PB", black))
+    if white is not None:
+        props.append(("PW", white))
+    result = result_string(game)
+    if result is not None:
+        props.append(("RE", result))
+    if game.setup:
+        first = game.history[0].color if game.history else game.to_move
+        if first == WHITE:
+            props.append(("PL", "W"))
+    props.extend(extra.items())
+    parts = ["(;", "".join(f"{k}[{_escape(v)}]" for k, v in props)]
+    # 摆子写回根节点的 AB / AW
+    for key, color in (("AB", BLACK), ("AW", WHITE)):
+        points = [encode_point(r, c) for r, c, v in game.setup if v == color]
+        if points:
+            parts.append(key + "".join(f"[{p}]" for p in points))
+    for rec in game.history:
+        r, c = rec.point
+        parts.append(f";{'B' if rec.color == BLACK else 'W'}[{encode_point(r, c)}]")
+    parts.append(")\n")
+    return "".join(parts)
+
+def save_sgf(game, path, **props):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(game_to_sgf(game, **props))
+
+
+# ---------- 解析 ----------
+_TOKEN = re.compile(rb"\s*(?:(;)|(\()|(\))|([A-Za-z]+)|\[((?:[^\]\\]|\\.)*)\])", re.S)
+
+class SGFGame:
+    """解析后的一盘（主线）：根节点属性、摆子、着法。"""
+    __slots__ = ("props", "size", "setup", "moves", "passes")
+
+    def __init__(self, props, size, setup, moves, passes):
+        self.props = props          # 根节点属性：名 -> 值列表（str）
+        self.size = size
+        self.setup = setup          # [(r, c, color)]
+        self.moves = moves          # [(r, c, color)]，不含 pass
+        self.passes = passes
+
+    def prop(self, name, default=None):
+        values = self.props.get(name)
+        return values[0] if values else default
+
+    @property
+    def komi(self):
+        try:
+            return float(self.prop("KM", DEFAULT_KOMI))
+        except ValueError:
+            return DEFAULT_KOMI
+
+def _value(raw):
+    text = raw.decode("utf-8", "replace")
+    return re.sub(r"\\(.)", r"\1", text, flags=re.S) if "\\" in text else text
+
+def parse_nodes(data):
+    """把一盘 SGF（str 或 bytes）的主线解析成节点列表 [{属性: [值, ...]}]。"""
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    nodes = []
+    node = None
+    values = None
+    # findall 在 C 里一次切完记号（不合语法的杂字符被跳过），这里只做一遍轻量循环
+    for semi, lpar, rpar, ident, value in _TOKEN.findall(data):
+        if semi:
+            node = {}
+            nodes.append(node)
+        elif rpar:
+            # 第一个 ')' 结束的就是主线（最深的第一个变化）；后面的变化分支都不要
+            break
+        elif ident:
+            if node is None:
+                raise ValueError("SGF property outside a node")
+            # FF[3] 允许属性名里夹小写字母（如 AddBlack），只取大写部分
+            name = ident.decode() if ident.isupper() else bytes(ch for ch in ident if 65 <= ch <= 90).decode()
+            values = node.setdefault(name, [])
+        elif not lpar:
+            if values is None:
+                raise ValueError("SGF value without property")
+            values.append(_value(value))
+    if not nodes:
+        raise ValueError("empty SGF game")
+    return nodes
+
+def parse_game(data):
+    """解析一盘 SGF，返回 SGFGame。"""
+    nodes = parse_nodes(data)
+    root = nodes[0]
+    size_text = (root.get("SZ") or ["19"])[0]
+    size = int(size_text.split(":")[0])
+    setup = []
+    moves = []
+    passes = 0
+    for node in nodes:
+        for key, color in (("AB", BLACK), ("AW", WHITE)):
+            for v in node.get(key, ()):
+                setup.extend((r, c, color) for r, c in _point_list(v, size))
+        for key, color in (("B", BLACK), ("W", WHITE)):
+            for v in node.get(key, ()):
+                p = decode_point(v, size)
+                if p is None:
+                    passes += 1
+                else:
+                    moves.append((p[0], p[1], color))
+    return SGFGame(root, size, setup, moves, passes)
+
+def _point_list(value, size):
+    # 摆子可以是压缩的矩形 "aa:cc"
+    if ":" in value:
+        a, b = value.split(":", 1)
+        (r0, c0), (r1, c1) = decode_point(a, size), decode_point(b, size)
+        return [(r, c) for r in range(min(r0, r1), max(r0, r1) + 1)
+                for c in range(min(c0, c1), max(c0, c1) + 1)]
+    p = decode_point(value, size)
+    return [] if p is None else [p]
+
+
+# ---------- 重放 ----------
+def game_from_sgf(data, ai=None, human_color=BLACK):
+    """解析并在 GameManager 上重放；遇到非法着法抛 ValueError。"""
+    record = parse_game(data)
+    game = GameManager(size=record.size, ai=ai, human_color=human_color, komi=record.komi)
+    if record.setup:
+        for r, c, color in record.setup:
+            game.board.place(r, c, color)
+        game.setup = list(record.setup)
+        game.seen_hashes = {game.board.hash}
+        game.sync_legal_moves()
+        if record.prop("PL", "B").upper().startswith("W"):
+            game.to_move = WHITE
+    for i, (r, c, color) in enumerate(record.moves):
+        ok, msg = game.play(r, c, color)
+        if not ok:
+            raise ValueError(f"move {i + 1} {encode_point(r, c)}: {msg}")
+    return game
+
+def load_sgf(path, ai=None, human_color=BLACK):
+    with open(path, "rb") as f:
+        text = next(iter_game_texts(f), None)
+    if text is None:
+        raise ValueError("no game in SGF")
+    return game_from_sgf(text, ai, human_color)
+
+def replay(record, backend="flat"):
+    """
+    在裸棋盘上重放校验（只查提子 / 自杀等棋盘规则，不做同形判定，比 GameManager 快得多）。
+    默认用 flat 后端：逐手落子比 list 后端快 2 倍多。返回 (board, 出错的手序号或 None)。
+    """
+    board = make_board(record.size, backend)
+    place = board.place
+    for r, c, color in record.setup:
+        place(r, c, color)
+    for i, (r, c, color) in enumerate(record.moves):
+        if not place(r, c, color):
+            return board, i
+    return board, None
+
+def replay_summary(record):
+    """process_collection 的默认处理：重放校验，返回一条小 dict。"""
+    _, bad = replay(record)
+    return {"size": record.size, "moves": len(record.moves), "valid": bad is None,
+            "error_move": bad, "result": record.prop("RE")}
+
+
+# ---------- 流式 ----------
+_SPECIAL = re.compile(rb"[\[\]\\()]")
+
+def iter_game_texts(source, chunk_size=CHUNK_SIZE):
+    """
+    从文件路径或二进制文件对象里逐盘产出原始 SGF 字节（一盘 = 一个顶层 (...)）。
+    按块读取，只用正则跳到特殊字符处维护括号深度与 [] 值内状态。
+    """
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as f:
+            yield from iter_game_texts(f, chunk_size)
+        return
+    depth = 0
+    in_value = False
+    escape = False
+    parts = []
+    while True:
+        chunk = source.read(chunk_size)
+        if not chunk:
+            break
+        start = 0 if depth else None
+        pos = 0
+        if escape:
+            escape = False
+            pos = 1
+        for m in _SPECIAL.finditer(chunk, pos):
+            i = m.start()
+            if i < pos:
+                continue
+            ch = chunk[i]
+            if in_value:
+                if ch == 0x5C:          # '\'：跳过下一个字节
+                    if i + 1 < len(chunk):
+                        pos = i + 2
+                    else:
+                        escape = True
+                elif ch == 0x5D:        # ']'
+                    in_value = False
+            elif ch == 0x5B:            # '['
+                in_value = True
+            elif ch == 0x28:            # '('
+                if depth == 0:
+                    start = i
+                depth += 1
+            elif ch == 0x29 and depth:  # ')'
+                depth -= 1
+                if depth == 0:
+                    parts.append(chunk[start:i + 1])
+                    yield b"".join(parts)
+                    parts = []
+                    start = None
+        if depth and start is not None:
+            parts.append(chunk[start:])
+
+def iter_games(source, chunk_size=CHUNK_SIZE):
+    """逐盘产出 SGFGame。"""
+    for text in iter_game_texts(source, chunk_size):
+        yield parse_game(text)
+
+
+# ---------- 批量 ----------
+def _process_batch(fn, texts):
+    out = []
+    for text in texts:
+        try:
+            out.append(fn(parse_game(text)))
+        except ValueError as e:
+            out.append({"valid": False, "parse_error": str(e), "moves": 0})
+    return out
+
+def _batches(sources, batch):
+    buf = []
+    for source in sources:
+        for text in iter_game_texts(source):
+            buf.append(text)
+            if len(buf) == batch:
+                yield buf
+                buf = []
+    if buf:
+        yield buf
+
+def process_collection(sources, fn=replay_summary, workers=None, batch=BATCH):
+    """
+    流式读取若干 SGF 文件（路径或二进制文件对象），对每盘执行 fn(SGFGame)，逐个产出结果。
+    workers 为 1 时在本进程内处理；否则原始文本成批发给进程池，在途批数有上限。
+    解析失败的对局产出 {"valid": False, "parse_error": ...}。
+    """
+    workers = workers or os.cpu_count() or 1
+    batches = _batches(sources, batch)
+    if workers == 1:
+        for texts in batches:
+            yield from _process_batch(fn, texts)
+        return
+    window = 2 * workers
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = set()
+        exhausted = False
+        while pending or not exhausted:
+            while not exhausted and len(pending) < window:
+                texts = next(batches, None)
+                if texts is None:
+                    exhausted = True
+                else:
+                    pending.add(pool.submit(_process_batch, fn, texts))
+            if not pending:
+                break
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for f in done:
+                yield from f.result()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m goai.sgf", description="SGF 合集流式解析与重放校验")
+    parser.add_argument("files", nargs="+")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="进程数，默认 CPU 核数")
+    parser.add_argument("--batch", type=int, default=BATCH, help="每批发给工作进程的对局数")
+    args = parser.parse_args(argv)
+    games = valid = moves = 0
+    start = time.perf_counter()
+    for summary in process_collection(args.files, workers=args.workers, batch=args.batch):
+        games += 1
+        valid += summary["valid"]
+        moves += summary["moves"]
+    elapsed = time.perf_counter() - start
+    mb = sum(os.path.getsize(p) for p in args.files) / 1e6
+    print(f"games {games}  valid {valid}  invalid {games - valid}  moves {moves}  elapsed {elapsed:.2f}s")
+    print(f"{games / elapsed:.1f} games/s  {moves / elapsed:.0f} moves/s  {mb / elapsed:.2f} MB/s")
+    return 0 if valid == games else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
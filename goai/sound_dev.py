@@ -3,53 +3,165 @@ Sound helper for solo-go.
 
 Plays a short sound when a stone is placed.
 
-- Primary (cross-platform): pygame.mixer plays 'assets/gostonesounds-sologo.wav'
-  (supports OGG/WAV/MP3, low latency, no compiler needed).
+- Primary (cross-platform): a preloaded pygame.mixer engine.
+    - The mixer is pre-initialised with a small buffer (BUFFER_SIZE frames), which
+      keeps output latency at a few milliseconds.
+    - The sample bank (SAMPLES, files under assets/) is decoded once by init_sound(),
+      which the GUI calls at startup. Playing never touches the disk afterwards.
+    - Samples play through a pool of reserved mixer channels. An idle channel is
+      preferred; if all are busy, the oldest one is reused. Channel.play returns
+      immediately, so playback never blocks the Tk thread.
+    - Click-to-sound latency is the time from the click (t0) until the sample is
+      queued, plus the mixer buffer duration. It is kept in engine.latencies and
+      summarised by engine.latency_stats().
 - Fallbacks (keep legacy behavior):
     - Windows: winsound.Beep
     - Others: Tk master.bell() if provided, else no-op
+- pygame is imported lazily by SoundEngine.start(), so importing this module (and
+  goai.gui) does not load pygame or print its banner until sound is first needed.
 - Never raises on failure; sound is non-critical.
 """
 
+import os
 import sys
-import pygame
+import time
+from collections import deque
 from pathlib import Path
 
-# Cache pygame init state to avoid reinit every click
-_PYGAME_READY = False
+SAMPLE_RATE = 44100
+# Mixer buffer in frames: 256 @ 44.1 kHz is about 6 ms (pygame's default is several times larger)
+BUFFER_SIZE = 256
+# Channels reserved for move sounds (overlapping clicks in fast exchanges)
+POOL_SIZE = 4
+# name -> file under assets/
+SAMPLES = {"stone": "gostonesounds-sologo.wav"}
+
+def _asset_dir():
+    # project_root = goai/.. ; assets live at project_root / assets
+    return Path(__file__).parent.parent / "assets"
 
 def _sound_file():
-    # project_root = goai/.. ; asset is at project_root / assets / gostonesounds-sologo.wav
-    return Path(__file__).parent.parent / "assets" / "gostonesounds-sologo.wav"
+    return _asset_dir() / SAMPLES["stone"]
 
-def _try_play_with_pygame(sound_path: Path) -> bool:
-    """Return True if played via pygame, else False."""
-    global _PYGAME_READY
-    try:
-        # Init mixer once
-        if not _PYGAME_READY:
-            # Let pygame pick a default audio driver; keep tiny buffer for low latency
-            pygame.mixer.init()
-            _PYGAME_READY = True
-
-        if sound_path.exists():
-            snd = pygame.mixer.Sound(str(sound_path))
-            snd.play()
-            return True
-        return False
-    except Exception:
-        return False
 
-def play_move_sound(master=None):
+class SoundEngine:
+    """Preloaded sample bank played through a reserved channel pool."""
+
+    def __init__(self, samples=None, frequency=SAMPLE_RATE, buffer=BUFFER_SIZE, pool_size=POOL_SIZE):
+        self.sample_files = dict(SAMPLES if samples is None else samples)
+        self.frequency = frequency
+        self.buffer = buffer
+        self.pool_size = pool_size
+        self.sounds = {}
+        self.channels = []
+        self._next = 0
+        self.ready = False
+        self.latencies = deque(maxlen=256)
+
+    def start(self):
+        """Init the mixer and decode every sample once. Returns True when usable."""
+        try:
+            os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+            import pygame
+            mixer = pygame.mixer
+            if not mixer.get_init():
+                # pre_init must come before init to take effect; init args repeat it for safety
+                mixer.pre_init(self.frequency, -16, 2, self.buffer)
+                mixer.init(frequency=self.frequency, size=-16, channels=2, buffer=self.buffer)
+            for name, filename in self.sample_files.items():
+                path = Path(filename)
+                if not path.is_absolute():
+                    path = _asset_dir() / path
+                if path.exists():
+                    self.sounds[name] = mixer.Sound(str(path))
+            self.channels = self._reserve_channels(mixer)
+        except Exception:
+            self.sounds = {}
+            self.channels = []
+        self.ready = bool(self.sounds)
+        return self.ready
+
+    def _reserve_channels(self, mixer):
+        # Channels 0..pool_size-1 are kept out of pygame's automatic allocation.
+        # Mixers without the channel API fall back to Sound.play().
+        try:
+            if mixer.get_num_channels() < self.pool_size:
+                mixer.set_num_channels(self.pool_size)
+            mixer.set_reserved(self.pool_size)
+            return [mixer.Channel(i) for i in range(self.pool_size)]
+        except Exception:
+            return []
+
+    def buffer_latency(self):
+        """Time (seconds) one mixer buffer takes to play out."""
+        return self.buffer / float(self.frequency)
+
+    def play(self, name="stone", t0=None):
+        """Queue a preloaded sample; returns False if it cannot be played."""
+        snd = self.sounds.get(name)
+        if snd is None:
+            return False
+        try:
+            channel = self._pick_channel()
+            if channel is not None:
+                channel.play(snd)
+            else:
+                snd.play()
+        except Exception:
+            return False
+        if t0 is not None:
+            self.latencies.append(time.perf_counter() - t0 + self.buffer_latency())
+        return True
+
+    def _pick_channel(self):
+        if not self.channels:
+            return None
+        n = len(self.channels)
+        for i in range(n):
+            ch = self.channels[(self._next + i) % n]
+            if not ch.get_busy():
+                self._next = (self._next + i + 1) % n
+                return ch
+        # All busy: reuse the oldest one (round robin order)
+        ch = self.channels[self._next]
+        self._next = (self._next + 1) % n
+        return ch
+
+    def latency_stats(self):
+        """Click-to-sound latency summary in milliseconds (None before any timed play)."""
+        if not self.latencies:
+            return None
+        xs = sorted(self.latencies)
+        return {
+            "count": len(xs),
+            "p50_ms": xs[len(xs) // 2] * 1e3,
+            "max_ms": xs[-1] * 1e3,
+            "buffer_ms": self.buffer_latency() * 1e3,
+        }
+
+
+_ENGINE = None
+
+def init_sound():
+    """Create and start the shared engine (decodes samples). Safe to call repeatedly."""
+    global _ENGINE
+    if _ENGINE is None:
+        _ENGINE = SoundEngine()
+        _ENGINE.start()
+    return _ENGINE
+
+def play_move_sound(master=None, t0=None):
     """
     Play a short sound to indicate a move was made.
+    t0: time.perf_counter() of the triggering click, used for latency measurement.
     Keeps backward compatibility and never raises.
     """
-    sound_path = _sound_file()
-
-    # 1) Cross-platform preferred path (pygame, supports .ogg/.wav)
-    if _try_play_with_pygame(sound_path):
-        return
+    # 1) Preloaded pygame engine (first call initialises it if init_sound() was not called)
+    try:
+        if init_sound().play("stone", t0):
+            return
+    except Exception:
+        pass
 
     # 2) Fallbacks match old minimal implementation behavior
     try:
@@ -65,6 +177,10 @@ def play_move_sound(master=None):
     except Exception:
         pass
 
-# Manual quick test: `python -m goai.sound`
+# Manual quick test: `python -m goai.sound_dev`
 if __name__ == "__main__":
-    play_move_sound()
+    engine = init_sound()
+    for _ in range(5):
+        play_move_sound(t0=time.perf_counter())
+        time.sleep(0.2)
+    print("ready:", engine.ready, "latency:", engine.latency_stats())
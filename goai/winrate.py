@@ -0,0 +1,187 @@
+# goai/winrate.py
+"""
+胜率与归属（ownership）估计服务。
+
+- 后台线程从当前局面批量跑随机 playout，估计随 playout 增多不断细化（anytime），
+  调用方随时用 latest() 取当前最好的估计。
+- 局面一变（set_position）立即放弃旧局面的工作：每跑完一次 playout 都检查代次号。
+- 估计结果按局面哈希缓存（LRU），来回翻看同一局面时接着上次的结果继续累积，不重算。
+- 可选地把胜率写进共享置换表（goai.ttable），供 MCTS 当先验。
+- vectorized=True 时每批用 goai.batch_playout 一次下完（需要 numpy），适合大批量；
+  此时只能在批与批之间响应局面变化。
+"""
+import random
+import threading
+from collections import OrderedDict
+
+from .board import BLACK
+from .playout import random_playout
+from .scoring import DEFAULT_KOMI, area_ownership
+from .ttable import position_key
+
+def ownership_map(board):
+    """终局（playout 结束后）每点归属：黑 +1 / 白 -1 / 公共 0，按 r * size + c 排列。"""
+    return area_ownership(board)
+
+
+class WinRateEstimate:
+    __slots__ = ("board_hash", "to_move", "size", "playouts", "black_wins", "ownership_sum")
+
+    def __init__(self, board_hash, to_move, size):
+        self.board_hash = board_hash
+        self.to_move = to_move
+        self.size = size
+        self.playouts = 0
+        self.black_wins = 0
+        self.ownership_sum = [0] * (size * size)
+
+    def black_win_rate(self):
+        return self.black_wins / self.playouts if self.playouts else 0.5
+
+    def win_rate(self, color):
+        p = self.black_win_rate()
+        return p if color == BLACK else 1.0 - p
+
+    def ownership(self):
+        """每点的平均归属，-1（白）..+1（黑）。"""
+        n = self.playouts or 1
+        return [v / n for v in self.ownership_sum]
+
+    def copy(self):
+        e = WinRateEstimate(self.board_hash, self.to_move, self.size)
+        e.playouts = self.playouts
+        e.black_wins = self.black_wins
+        e.ownership_sum = list(self.ownership_sum)
+        return e
+
+
+class WinRateEstimator:
+    def __init__(self, komi=DEFAULT_KOMI, batch=8, max_playouts=2000, cache_size=256,
+                 ttable=None, seed=None, vectorized=False):
+        """
+        batch: 每批 playout 数，每批结束发布一次估计
+        vectorized: 用 numpy 成批 playout 内核跑每一批
+        max_playouts: 单个局面累积到此数即停止（估计已足够稳定）
+        cache_size: 缓存的局面数上限（LRU）
+        """
+        self.komi = komi
+        self.batch = batch
+        self.max_playouts = max_playouts
+        self.cache_size = cache_size
+        self.ttable = ttable
+        self.rng = random.Random(seed)
+        self.vectorized = vectorized
+        self.np_rng = None
+        if vectorized:
+            from .analysis import np, _require_numpy
+            _require_numpy()
+            self.np_rng = np.random.default_rng(seed)
+        self._cache = OrderedDict()     # position_key -> WinRateEstimate
+        self._cond = threading.Condition()
+        self._position = None           # (board, to_move)
+        self._generation = 0
+        self._latest = None
+        self._running = False
+        self._thread = None
+
+    def start(self):
+        with self._cond:
+            if self._running:
+                return
+            self._running = True
+        self._thread = threading.Thread(target=self._run, name="goai-winrate", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def set_position(self, board, to_move):
+        """换到新局面：旧局面的工作立即作废；命中缓存时先发布缓存里的估计。"""
+        snapshot = board._copy()
+        key = position_key(snapshot.hash, to_move)
+        with self._cond:
+            self._generation += 1
+            self._position = (snapshot, to_move)
+            cached = self._cache.get(key)
+            self._latest = cached.copy() if cached is not None else None
+            self._cond.notify_all()
+
+    def latest(self):
+        """当前局面最新的估计（拷贝），尚无结果时为 None。"""
+        with self._cond:
+            return self._latest
+
+    # ---------- 线程主体 ----------
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._running and self._position is None:
+                    self._cond.wait()
+                if not self._running:
+                    return
+                board, to_move = self._position
+                gen = self._generation
+                key = position_key(board.hash, to_move)
+                est = self._cache.get(key)
+                if est is None:
+                    est = self._cache[key] = WinRateEstimate(board.hash, to_move, board.size)
+                    if len(self._cache) > self.cache_size:
+                        self._cache.popitem(last=False)
+                else:
+                    self._cache.move_to_end(key)
+                if est.playouts >= self.max_playouts:
+                    # 已足够：等下一个局面
+                    if self._generation == gen:
+                        self._position = None
+                    continue
+            if not self._run_batch(board, to_move, est, gen):
+                continue
+            with self._cond:
+                if self._generation == gen:
+                    self._latest = est.copy()
+            if self.ttable is not None:
+                self.ttable.store(key, est.playouts, est.win_rate(to_move))
+
+    def _run_batch(self, board, to_move, est, gen):
+        """跑一批 playout 累加到 est；局面已变则中途放弃并返回 False。"""
+        if self.vectorized:
+            return self._run_vectorized(board, to_move, est, gen)
+        rng = self.rng
+        wins = 0
+        owner_sum = [0] * len(est.ownership_sum)
+        n = 0
+        for _ in range(self.batch):
+            if self._generation != gen:
+                return False
+            b = board._copy()
+            random_playout(b, to_move, rng)
+            owner = ownership_map(b)
+            # 归属之和即黑方面积 - 白方面积
+            if sum(owner) - self.komi > 0:
+                wins += 1
+            for i, v in enumerate(owner):
+                owner_sum[i] += v
+            n += 1
+        with self._cond:
+            est.playouts += n
+            est.black_wins += wins
+            est.ownership_sum = [a + b for a, b in zip(est.ownership_sum, owner_sum)]
+        return True
+
+    def _run_vectorized(self, board, to_move, est, gen):
+        from .batch_playout import run_batch, ownership
+        owner = ownership(run_batch(board, to_move, self.batch, self.np_rng), board.size)
+        if self._generation != gen:
+            return False
+        wins = int((owner.sum(1) - self.komi > 0).sum())
+        owner_sum = owner.sum(0).tolist()
+        with self._cond:
+            est.playouts += self.batch
+            est.black_wins += wins
+            est.ownership_sum = [a + b for a, b in zip(est.ownership_sum, owner_sum)]
+        return True
@@ -0,0 +1,27 @@
+#!/usr/bin/env python3
+"""
+Unified benchmark entry point for the solo-go project (companion to run_tests.py).
+
+Usage:
+  python run_benchmarks.py                 # run all benchmarks and print us/op
+  python run_benchmarks.py --save          # store results as benchmarks/baseline.json
+  python run_benchmarks.py --compare       # compare against the baseline, fail on regressions
+  python run_benchmarks.py -k board --sizes 9,19 --threshold 0.3
+The script exits with 1 when --compare finds a regression beyond the threshold, 0 otherwise.
+"""
+import sys
+import subprocess
+
+def main():
+    # Invoke as a module so the project root is on the path, like run_tests.py does for pytest.
+    cmd = [sys.executable, "-m", "goai.bench"] + sys.argv[1:]
+    print("Running benchmarks:", " ".join(cmd))
+    try:
+        rc = subprocess.call(cmd)
+    except KeyboardInterrupt:
+        print("\nBenchmark run interrupted by user", file=sys.stderr)
+        rc = 130
+    sys.exit(rc)
+
+if __name__ == "__main__":
+    main()
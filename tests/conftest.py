@@ -0,0 +1,15 @@
+import time
+import pytest
+
+def _wait_for(pred, timeout=5.0):
+    end = time.time() + timeout
+    while time.time() < end:
+        if pred():
+            return True
+        time.sleep(0.01)
+    return False
+
+@pytest.fixture
+def wait_for():
+    """轮询等待后台线程的结果：wait_for(pred, timeout=5.0)，超时返回 False。"""
+    return _wait_for
@@ -1,3 +1,4 @@
+import random
 import pytest
 from goai.ai import SimpleAI
 from goai.board import Board, EMPTY, BLACK, WHITE
@@ -21,4 +22,77 @@ def test_ai_returns_none_when_no_moves():
     b = Board(size=1)
     ai = SimpleAI()
     move = ai.select_move(b, BLACK)
-    assert move is None
\ No newline at end of file
+    assert move is None
+
+def test_mcts_level_returns_legal_move_with_playout_budget():
+    b = Board(size=5)
+    ai = SimpleAI(level=2, playouts=60, seed=1)
+    move = ai.select_move(b, BLACK)
+    assert move is not None and b.is_legal(*move, BLACK)
+    assert ai.engine.last_playouts == 60
+    assert ai.playouts_per_second > 0
+
+def test_mcts_respects_time_budget_and_none_when_no_moves():
+    import time
+    ai = SimpleAI(level=2, time_ms=50, seed=2)
+    start = time.perf_counter()
+    assert ai.select_move(Board(size=5), BLACK) is not None
+    assert time.perf_counter() - start < 1.0
+    assert SimpleAI(level=2, playouts=10).select_move(Board(size=1), BLACK) is None
+
+def test_mcts_captures_stone_in_atari():
+    # 白 (1,1) 只剩 (2,1) 一口气；吃掉它明显最好
+    b = Board(size=4)
+    for p in [(0,1), (1,0), (1,2)]:
+        b.place(*p, BLACK)
+    b.place(1,1, WHITE)
+    b.place(3,3, WHITE)
+    ai = SimpleAI(level=2, playouts=300, seed=3)
+    assert ai.select_move(b, BLACK) == (2, 1)
+
+def test_mcts_reuses_subtree_between_moves():
+    b = Board(size=5)
+    ai = SimpleAI(level=2, playouts=200, seed=4)
+    move = ai.select_move(b, BLACK)
+    b.place(*move, BLACK)
+    reply = max(ai.engine.root.children[move].children.values(), key=lambda n: n.visits).move
+    kept = ai.engine.root.children[move].children[reply].visits
+    b.place(*reply, WHITE)
+    ai.engine.playouts = 0
+    ai.select_move(b, BLACK)
+    assert ai.engine.root.visits == kept > 0
+    assert ai.engine.root.parent is None
+
+def test_mcts_respects_legal_moves_restriction():
+    b = Board(size=5)
+    ai = SimpleAI(level=2, playouts=40, seed=5)
+    assert ai.select_move(b, BLACK, legal_moves=[(4, 4)]) == (4, 4)
+
+@pytest.mark.parametrize("backend", ["list", "flat", "bit"])
+def test_mcts_playout_restores_board_without_copy(backend):
+    from goai.board import make_board
+    from goai.mcts import MCTS
+    b = make_board(5, backend)
+    b.place(2, 2, BLACK)
+    b.place(2, 3, WHITE)
+    grid = [[b.grid[r][c] for c in range(5)] for r in range(5)]
+    h = b.hash
+    engine = MCTS(playouts=0, seed=3)
+    engine._prepare_root(b, BLACK, None)
+    for _ in range(30):
+        assert engine.run_playout(b) == 1
+        assert b.hash == h
+        assert [[b.grid[r][c] for c in range(5)] for r in range(5)] == grid
+    assert engine.root.visits == 30
+    b.place(1, 2, BLACK)            # 联通块等内部状态也已还原
+    assert b.is_legal(3, 2, BLACK) and not b.is_legal(2, 2, WHITE)
+
+def test_level0_seed_is_reproducible():
+    b = Board(size=9)
+    picks = []
+    for _ in range(2):
+        ai = SimpleAI(level=0, seed=5)
+        # 全局 random 的状态不应影响带种子的 AI
+        random.seed(len(picks))
+        picks.append([ai.select_move(b, BLACK) for _ in range(20)])
+    assert picks[0] == picks[1]
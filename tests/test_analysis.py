@@ -0,0 +1,84 @@
+import random
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from goai.board import Board, EMPTY, BLACK, WHITE, make_board
+from goai.playout import random_playout
+from goai.scoring import label_regions
+from goai import analysis
+
+def _random_position(size, seed, moves=60):
+    b = Board(size=size)
+    rng = random.Random(seed)
+    random_playout(b, BLACK, rng, max_moves=moves)
+    return b
+
+def test_chain_labels_match_board_chains():
+    b = _random_position(9, 1)
+    labels = analysis.chain_labels(b)
+    for r in range(9):
+        for c in range(9):
+            if b.grid[r][c] == EMPTY:
+                assert labels[r, c] == -1
+                continue
+            stones = b.chain(r, c)
+            assert labels[r, c] == min(sr * 9 + sc for sr, sc in stones)
+
+def test_snake_chain_converges():
+    # 蛇形长块：邻点传播需要多轮，指针跳跃保证收敛
+    b = Board(size=7)
+    for r in range(0, 7, 2):
+        for c in range(7):
+            b.place(r, c, BLACK)
+        if r + 1 < 7:
+            b.place(r + 1, 6 if r % 4 == 0 else 0, BLACK)
+    labels = analysis.chain_labels(b)
+    assert set(labels[np.array(b.grid) == BLACK].tolist()) == {0}
+
+def test_liberty_counts_match_board():
+    for seed in range(5):
+        b = _random_position(9, seed)
+        libs = analysis.liberty_counts(b)
+        for r in range(9):
+            for c in range(9):
+                want = 0 if b.grid[r][c] == EMPTY else len(b.liberties(r, c))
+                assert libs[r, c] == want
+
+def test_atari_mask():
+    b = Board(size=5)
+    b.place(1, 1, WHITE)
+    for p in [(0, 1), (1, 0), (1, 2)]:
+        b.place(*p, BLACK)
+    mask = analysis.atari_mask(b)
+    assert mask[1, 1] and mask.sum() == 1
+    assert not analysis.atari_mask(b, BLACK).any()
+
+def test_empty_regions_match_scoring():
+    b = _random_position(9, 3)
+    labels, borders = analysis.empty_regions(b)
+    vals = [v for row in b.grid for v in row]
+    ref_labels, ref_border = label_regions(vals, 9)
+    for i in range(81):
+        r, c = divmod(i, 9)
+        if vals[i] != EMPTY:
+            assert labels[r, c] == -1 and borders[r, c] == 0
+        else:
+            assert borders[r, c] == ref_border[ref_labels[i]]
+            # 同一区域标号相同
+            same = [j for j in range(81) if ref_labels[j] == ref_labels[i]]
+            assert labels[r, c] == min(same)
+
+def test_batch_of_positions():
+    boards = [_random_position(9, s) for s in range(4)]
+    stack = np.stack([analysis.board_array(b) for b in boards])
+    libs = analysis.liberty_counts(stack)
+    assert libs.shape == (4, 9, 9)
+    for k, b in enumerate(boards):
+        assert (libs[k] == analysis.liberty_counts(b)).all()
+
+def test_other_backends():
+    b = make_board(9, "bit")
+    b.place(4, 4, BLACK)
+    b.place(4, 5, BLACK)
+    assert analysis.liberty_counts(b)[4, 4] == 6
@@ -0,0 +1,75 @@
+import random
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from goai.board import Board, EMPTY, BLACK, WHITE, make_board
+from goai.playout import is_eye, random_playout
+from goai.scoring import estimate_dead_stones
+from goai.ai import SimpleAI
+from goai import analysis
+from goai.batch_playout import _Batch, run_batch, ownership, batch_playouts
+
+def test_every_batched_move_replays_on_board():
+    # 每一手都在 Board 上重放：落子合法、非己方真眼、提子结果一致；pass 时确实无子可下
+    size, k = 7, 6
+    batch = _Batch(Board(size), k)
+    boards = [Board(size) for _ in range(k)]
+    rng = np.random.default_rng(3)
+    color = BLACK
+    n = size * size
+    for _ in range(120):
+        rows = np.arange(k)
+        before = batch.stones[:, :n].copy()
+        played = batch.step(rows, color, rng)
+        for row, b in enumerate(boards):
+            if played[row]:
+                new = np.flatnonzero((before[row] == EMPTY) & (batch.stones[row, :n] == color))
+                assert len(new) == 1
+                r, c = divmod(int(new[0]), size)
+                assert not is_eye(b, r, c, color)
+                assert b.play_move(r, c, color) is not None
+            else:
+                assert not any(b.grid[r][c] == EMPTY and b.is_legal(r, c, color)
+                               and not is_eye(b, r, c, color)
+                               for r in range(size) for c in range(size))
+            assert (np.array(b.grid).reshape(-1) == batch.stones[row, :n]).all()
+        color = -color
+
+def test_final_positions_are_settled():
+    b = Board(size=9)
+    random_playout(b, BLACK, random.Random(2), max_moves=30)
+    final = run_batch(b, WHITE, 32, rng=1)
+    assert final.shape == (32, 81)
+    for pos in final:
+        grid = pos.reshape(9, 9)
+        # 没有无气的块，空点都是某方的眼
+        libs = analysis.liberty_counts(grid)
+        assert (libs[grid != EMPTY] > 0).all()
+    owner = ownership(final, 9)
+    assert (owner[final != EMPTY] == final[final != EMPTY]).all()
+
+def test_starts_from_any_backend():
+    b = make_board(9, "bit")
+    b.place(4, 4, BLACK)
+    b.place(4, 5, WHITE)
+    scores = batch_playouts(b, BLACK, 8, rng=0)
+    assert scores.shape == (8,)
+    assert (np.abs(scores) <= 81).all()
+    # 起始局面不被修改
+    assert b.grid[4][4] == BLACK and b.grid[4][5] == WHITE
+
+def test_batched_mcts_counts_visits():
+    ai = SimpleAI(level=2, playouts=64, seed=1, batch=16)
+    b = Board(size=5)
+    move = ai.select_move(b, BLACK)
+    assert move is not None and b.is_legal(*move, BLACK)
+    assert ai.engine.root.visits == 64
+    assert ai.engine.last_playouts == 64
+
+def test_vectorized_dead_stone_estimate():
+    b = Board(size=5)
+    for r in range(5):
+        b.place(r, 2, BLACK)
+    b.place(1, 0, WHITE)
+    assert estimate_dead_stones(b, WHITE, playouts=64, rng=1, vectorized=True) == {(1, 0)}
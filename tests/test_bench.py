@@ -0,0 +1,54 @@
+from goai.board import BLACK
+from goai import bench
+
+def test_positions_are_reproducible():
+    a, ta = bench.midgame_board(9, seed=4)
+    b, tb = bench.midgame_board(9, seed=4)
+    assert a.grid == b.grid and ta == tb
+    snake = bench.snake_board(9)
+    stones, _ = snake._group_and_liberties(0, 0)
+    assert len(stones) == sum(v == BLACK for row in snake.grid for v in row)
+
+def test_run_selected_benchmarks():
+    results = bench.run(names=["board.is_legal", "check_game_over"], sizes=(9,),
+                        min_time=0.001, repeat=1)
+    assert set(results) == {"board.is_legal@9", "game.check_game_over@9"}
+    assert all(v > 0 for v in results.values())
+
+def test_compare_flags_regressions(tmp_path):
+    path = tmp_path / "base.json"
+    bench.save_baseline(str(path), bench.make_baseline({"a@9": 10.0, "b@9": 10.0}))
+    base = bench.load_baseline(str(path))
+    rows, regressions = bench.compare(base, {"a@9": 11.0, "b@9": 15.0, "new@9": 1.0}, threshold=0.25)
+    assert [r[0] for r in rows] == ["a@9", "b@9"]
+    assert [r[0] for r in regressions] == ["b@9"]
+    # 基线里有、本次没跑的项列为缺失，也算回退
+    rows, regressions = bench.compare(base, {"a@9": 9.0}, threshold=0.25)
+    assert rows == [("a@9", 10.0, 9.0, 0.9), ("b@9", 10.0, None, None)]
+    assert regressions == [("b@9", 10.0, None, None)]
+
+def test_cli_exit_code(tmp_path):
+    path = str(tmp_path / "base.json")
+    argv = ["-k", "check_game_over", "--sizes", "9", "--min-time", "0.001", "--repeat", "1"]
+    assert bench.main(argv + ["--save", path]) == 0
+    # 把基线改成快得不可能，比较必然判为回退
+    base = bench.load_baseline(path)
+    base["results"] = {k: v / 100 for k, v in base["results"].items()}
+    bench.save_baseline(path, base)
+    assert bench.main(argv + ["--compare", path]) == 1
+
+def test_cli_missing_benchmark_fails(tmp_path, capsys):
+    path = str(tmp_path / "base.json")
+    argv = ["-k", "check_game_over", "--sizes", "9", "--min-time", "0.001", "--repeat", "1"]
+    base = {"results": {"check_game_over_removed@9": 1e9, "check_game_over_removed@19": 1e9}}
+    bench.save_baseline(path, base)
+    assert bench.main(argv + ["--compare", path]) == 1
+    out = capsys.readouterr().out
+    # 只有本次选中的 @9 项算缺失
+    assert "check_game_over_removed@9" in out and "@19" not in out
+    assert "1 missing" in out
+
+def test_cli_compare_without_baseline(tmp_path, capsys):
+    argv = ["-k", "check_game_over", "--sizes", "9", "--min-time", "0.001", "--repeat", "1"]
+    assert bench.main(argv + ["--compare", str(tmp_path / "none.json")]) == 2
+    assert "run with --save first" in capsys.readouterr().err
@@ -0,0 +1,80 @@
+import random
+from goai.board import Board, EMPTY, BLACK, WHITE
+from goai.bitboard import BitBoard
+from goai.game_manager import GameManager
+
+def test_place_and_capture_simple():
+    b = BitBoard(size=3)
+    assert b.place(1, 1, BLACK) is True
+    for p in [(0, 1), (1, 0), (1, 2), (2, 1)]:
+        assert b.place(*p, WHITE) is True
+    assert b.grid[1][1] == EMPTY
+
+def test_suicide_not_allowed():
+    b = BitBoard(size=3)
+    for p in [(0, 1), (1, 0), (1, 2), (2, 1)]:
+        assert b.place(*p, WHITE)
+    assert b.is_legal(1, 1, BLACK) is False
+    assert b.place(1, 1, BLACK) is False
+
+def test_liberty_count_and_group_behavior():
+    b = BitBoard(size=5)
+    assert b.place(1, 1, BLACK)
+    assert b.place(1, 2, BLACK)
+    assert b.place(0, 1, WHITE)
+    assert b.place(0, 2, WHITE)
+    assert b.grid[1][1] == BLACK and b.grid[1][2] == BLACK
+    assert b.liberties(1, 1) == {(1, 0), (1, 3), (2, 1), (2, 2)}
+
+def test_illegal_on_occupied_point():
+    b = BitBoard(size=5)
+    assert b.place(2, 2, BLACK)
+    assert b.is_legal(2, 2, WHITE) is False
+    assert b.place(2, 2, WHITE) is False
+
+def test_no_wraparound_between_rows():
+    b = BitBoard(size=3)
+    b.place(0, 2, BLACK)
+    assert b.neighbors(0, 2) == [(0, 1), (1, 2)]
+    assert b.empty_adjacent_to(BLACK) == b.dilate(1 << b.bit(0, 2)) & ~(1 << b.bit(0, 2))
+
+def test_matches_list_backend_on_random_game():
+    rng = random.Random(9)
+    a, b = Board(size=9), BitBoard(size=9)
+    color = BLACK
+    records = []
+    for _ in range(250):
+        legal = [(r, c) for r in range(9) for c in range(9) if a.is_legal(r, c, color)]
+        assert legal == [(r, c) for r in range(9) for c in range(9) if b.is_legal(r, c, color)]
+        assert legal == b.legal_moves(color)
+        if not legal:
+            break
+        move = rng.choice(legal)
+        assert b.hash_after(*move, color) == a.hash_after(*move, color)
+        ra, rb = a.play_move(*move, color), b.play_move(*move, color)
+        assert sorted(ra.captured) == sorted(rb.captured)
+        records.append(rb)
+        assert b.grid == a.grid and b.hash == a.hash
+        color = -color
+    for rec in reversed(records[-20:]):
+        a.undo(rec)
+        b.undo(rec)
+        assert b.grid == a.grid and b.hash == a.hash
+
+def test_whole_board_queries():
+    b = BitBoard(size=5)
+    b.place(0, 0, BLACK)
+    b.place(0, 1, WHITE)
+    assert b.atari_stones(BLACK) == 1 << b.bit(0, 0)
+    assert b.atari_stones(WHITE) == 0
+    # 黑占 (0,0) 与整列 1 形成墙：列 0 的空点都只与黑相邻
+    b = BitBoard(size=3)
+    for r in range(3):
+        b.place(r, 1, BLACK)
+    assert b.area_counts() == (9, 0)
+
+def test_game_manager_with_bit_backend():
+    gm = GameManager(size=5, backend="bit")
+    ok, _ = gm.make_human_move(0, 0)
+    assert ok and gm.board.grid[0][0] == BLACK
+    assert (0, 0) not in gm.legal_moves_for(WHITE)
@@ -43,4 +43,157 @@ def test_illegal_on_occupied_point():
     b = Board(size=5)
     assert b.place(2,2,BLACK)
     assert b.is_legal(2,2,WHITE) is False
-    assert b.place(2,2,WHITE) is False
\ No newline at end of file
+    assert b.place(2,2,WHITE) is False
+
+def test_chain_merge_and_liberties():
+    b = Board(size=5)
+    assert b.place(2,1,BLACK)
+    assert b.place(2,3,BLACK)
+    assert len(b.liberties(2,1)) == 4
+    # (2,2) 把两块连成一块
+    assert b.place(2,2,BLACK)
+    assert sorted(b.chain(2,1)) == [(2,1), (2,2), (2,3)]
+    assert b.liberties(2,1) is b.liberties(2,3)
+    assert len(b.liberties(2,2)) == 8
+
+def test_capture_multi_stone_chain_restores_liberties():
+    b = Board(size=4)
+    for p in [(0,0), (0,1)]:
+        assert b.place(*p, BLACK)
+    assert b.place(1,0,WHITE)
+    assert b.place(1,1,WHITE)
+    assert b.place(0,2,WHITE)
+    assert b.grid[0][0] == EMPTY and b.grid[0][1] == EMPTY
+    # 被提后腾出的点重新成为白块的气
+    assert (0,0) in b.liberties(1,0)
+    assert (0,1) in b.liberties(0,2)
+
+def test_capture_makes_otherwise_suicidal_move_legal():
+    b = Board(size=3)
+    # 白 (0,1) 只剩 (0,0) 一口气；黑在 (0,0) 虽无空邻点但能提子
+    assert b.place(0,2,BLACK)
+    assert b.place(1,1,BLACK)
+    assert b.place(0,1,WHITE)
+    assert b.place(1,0,WHITE)
+    assert b.is_legal(0,0,BLACK) is True
+    assert b.place(0,0,BLACK)
+    assert b.grid[0][1] == EMPTY
+    assert b.liberties(0,0) == {(0,1)}
+
+def test_chain_tracking_matches_flood_fill():
+    import random
+    rng = random.Random(1)
+    b = Board(size=7)
+    color = BLACK
+    for _ in range(300):
+        empties = [(r, c) for r in range(7) for c in range(7) if b.is_legal(r, c, color)]
+        if not empties:
+            break
+        b.place(*rng.choice(empties), color)
+        color = -color
+        for r in range(7):
+            for c in range(7):
+                if b.grid[r][c] != EMPTY:
+                    stones, libs = b._group_and_liberties(r, c)
+                    assert set(b.chain(r, c)) == stones
+                    assert b.liberties(r, c) == libs
+
+def test_play_move_and_undo_restore_position_exactly():
+    import random
+    rng = random.Random(7)
+    b = Board(size=7)
+    color = BLACK
+    records, snapshots = [], []
+    for _ in range(200):
+        legal = [(r, c) for r in range(7) for c in range(7) if b.is_legal(r, c, color)]
+        if not legal:
+            break
+        snapshots.append([row[:] for row in b.grid])
+        records.append(b.play_move(*rng.choice(legal), color))
+        color = -color
+    assert any(rec.captured for rec in records)
+    while records:
+        b.undo(records.pop())
+        assert b.grid == snapshots.pop()
+        for r in range(7):
+            for c in range(7):
+                if b.grid[r][c] != EMPTY:
+                    stones, libs = b._group_and_liberties(r, c)
+                    assert set(b.chain(r, c)) == stones
+                    assert b.liberties(r, c) == libs
+
+def test_play_move_illegal_returns_none():
+    b = Board(size=3)
+    assert b.play_move(1, 1, BLACK).captured == ()
+    assert b.play_move(1, 1, WHITE) is None
+
+def _hash_from_scratch(b):
+    from goai.board import zobrist_keys
+    keys = zobrist_keys(b.size)
+    h = 0
+    for r in range(b.size):
+        for c in range(b.size):
+            if b.grid[r][c] != EMPTY:
+                h ^= keys[b.grid[r][c]][r * b.size + c]
+    return h
+
+def test_zobrist_hash_is_incremental_and_undoable():
+    import random
+    rng = random.Random(11)
+    b = Board(size=6)
+    assert b.hash == 0
+    color = BLACK
+    records, hashes = [], []
+    for _ in range(150):
+        legal = [(r, c) for r in range(6) for c in range(6) if b.is_legal(r, c, color)]
+        if not legal:
+            break
+        move = rng.choice(legal)
+        predicted = b.hash_after(*move, color)
+        hashes.append(b.hash)
+        records.append(b.play_move(*move, color))
+        assert b.hash == predicted == _hash_from_scratch(b)
+        color = -color
+    while records:
+        b.undo(records.pop())
+        assert b.hash == hashes.pop()
+
+def test_pack_unpack_round_trip_all_backends():
+    from goai.board import pack_board, unpack_board, BACKENDS
+    b = Board(size=19)
+    b.place(0, 0, BLACK)
+    b.place(0, 1, WHITE)
+    b.place(18, 18, WHITE)
+    b.place(9, 9, BLACK)
+    data = pack_board(b)
+    assert len(data) == 1 + (19 * 19 + 3) // 4
+    for backend in BACKENDS:
+        u = unpack_board(data, backend)
+        assert u.size == 19 and u.grid == b.grid and u.hash == b.hash
+        assert u.liberties(0, 0) == {(1, 0)}
+        assert u.is_legal(1, 0, WHITE)
+
+def test_list_board_undo_with_interleaved_replays_matches_rebuild():
+    # 搜索里的典型用法：下几手、撤几手、再下；undo 走合并记录，结果须与整盘重建一致
+    import random
+    rng = random.Random(5)
+    b = Board(size=6)
+    records = []
+    color = BLACK
+    for _ in range(400):
+        if records and rng.random() < 0.35:
+            rec = records.pop()
+            b.undo(rec)
+            color = rec.color
+        else:
+            legal = [(r, c) for r in range(6) for c in range(6) if b.is_legal(r, c, color)]
+            if not legal:
+                break
+            records.append(b.play_move(*rng.choice(legal), color))
+            color = -color
+        for r in range(6):
+            for c in range(6):
+                if b.grid[r][c] != EMPTY:
+                    stones, libs = b._group_and_liberties(r, c)
+                    assert set(b.chain(r, c)) == stones and len(b.chain(r, c)) == len(stones)
+                    assert b.liberties(r, c) == libs
@@ -0,0 +1,90 @@
+import random
+import pytest
+from goai.board import Board, EMPTY, BLACK, WHITE, make_board
+from goai.flat_board import FlatBoard, tables
+from goai.game_manager import GameManager
+
+def test_place_and_capture_simple():
+    b = FlatBoard(size=3)
+    assert b.place(1, 1, BLACK) is True
+    for p in [(0, 1), (1, 0), (1, 2), (2, 1)]:
+        assert b.place(*p, WHITE) is True
+    assert b.grid[1][1] == EMPTY
+
+def test_suicide_not_allowed():
+    b = FlatBoard(size=3)
+    for p in [(0, 1), (1, 0), (1, 2), (2, 1)]:
+        assert b.place(*p, WHITE)
+    assert b.is_legal(1, 1, BLACK) is False
+    assert b.place(1, 1, BLACK) is False
+
+def test_illegal_on_occupied_point():
+    b = FlatBoard(size=5)
+    assert b.place(2, 2, BLACK)
+    assert b.is_legal(2, 2, WHITE) is False
+    assert b.place(2, 2, WHITE) is False
+
+def test_grid_view_reads_and_writes_cells():
+    b = FlatBoard(size=1)
+    b.grid[0][0] = BLACK
+    assert b.grid[0][0] == BLACK
+    assert b.is_legal(0, 0, WHITE) is False
+    with pytest.raises(IndexError):
+        b.grid[1][0]
+
+def test_tables_are_shared_per_size():
+    assert tables(9) is tables(9)
+    assert FlatBoard(13).cells == FlatBoard(13).cells
+    assert len(tables(19).neighbors[tables(19).points[0]]) == 2
+
+def test_matches_list_backend_on_random_game():
+    rng = random.Random(3)
+    a, b = Board(size=9), FlatBoard(size=9)
+    color = BLACK
+    for _ in range(250):
+        legal = [(r, c) for r in range(9) for c in range(9) if a.is_legal(r, c, color)]
+        assert legal == [(r, c) for r in range(9) for c in range(9) if b.is_legal(r, c, color)]
+        if not legal:
+            break
+        move = rng.choice(legal)
+        assert a.place(*move, color) and b.place(*move, color)
+        assert b.grid == a.grid
+        color = -color
+
+def test_game_manager_backend_switch():
+    gm = GameManager(size=5, human_color=BLACK, backend="flat")
+    assert isinstance(gm.board, FlatBoard)
+    ok, _ = gm.make_human_move(2, 2)
+    assert ok and gm.board.grid[2][2] == BLACK
+    with pytest.raises(ValueError):
+        make_board(5, "nope")
+
+def test_play_move_and_undo():
+    b = FlatBoard(size=3)
+    b.place(1, 1, BLACK)
+    for p in [(0, 1), (1, 0), (1, 2)]:
+        b.place(*p, WHITE)
+    before = [list(row) for row in b.grid]
+    rec = b.play_move(2, 1, WHITE)
+    assert rec.captured == ((1, 1),)
+    b.undo(rec)
+    assert b.grid == before
+
+def test_hash_matches_list_backend():
+    rng = random.Random(5)
+    a, b = Board(size=7), FlatBoard(size=7)
+    color = BLACK
+    for _ in range(120):
+        legal = [(r, c) for r in range(7) for c in range(7) if a.is_legal(r, c, color)]
+        if not legal:
+            break
+        move = rng.choice(legal)
+        assert b.hash_after(*move, color) == a.hash_after(*move, color)
+        rec = b.play_move(*move, color)
+        a.place(*move, color)
+        assert b.hash == a.hash
+        color = -color
+    h = b.hash
+    b.undo(rec)
+    b.play_move(*rec.point, rec.color)
+    assert b.hash == h
@@ -43,4 +43,79 @@ def test_ai_illegal_return_triggers_loss():
     moved, msg = gm.make_ai_move()
     assert moved is False
     # human should be declared winner because AI made illegal move
-    assert gm.result in (GameResult.BLACK_WINS, GameResult.WHITE_WINS)
\ No newline at end of file
+    assert gm.result in (GameResult.BLACK_WINS, GameResult.WHITE_WINS)
+
+def test_take_back_undoes_ai_reply_and_human_move():
+    gm = GameManager(size=5, ai=SimpleAI(), human_color=BLACK)
+    ok, _ = gm.make_human_move(2, 2)
+    assert ok
+    moved, _ = gm.make_ai_move()
+    assert moved
+    assert gm.take_back() == 2
+    assert gm.is_human_turn()
+    assert gm.history == []
+    assert all(v == EMPTY for row in gm.board.grid for v in row)
+    assert gm.take_back() == 0
+
+def test_ko_recapture_is_rejected():
+    gm = GameManager(size=4, ai=None, human_color=BLACK)
+    for p in [(0,1), (1,0), (2,1)]:
+        assert gm.board.place(*p, BLACK)
+    for p in [(0,2), (1,1), (1,3), (2,2)]:
+        assert gm.board.place(*p, WHITE)
+    gm.seen_hashes = {gm.board.hash}
+    gm.sync_legal_moves()
+    ok, _ = gm.make_human_move(1, 2)
+    assert ok and gm.board.grid[1][1] == EMPTY
+    # 白立即回提会重复局面
+    gm.human_color = WHITE
+    assert gm.board.is_legal(1, 1, WHITE)
+    assert gm.is_legal_move(1, 1, WHITE) is False
+    assert (1, 1) not in gm.legal_moves_for(WHITE)
+    ok, msg = gm.make_human_move(1, 1)
+    assert ok is False and msg
+    # 悔棋后哈希集合同步回退，回提点重新可下
+    gm.undo_move()
+    assert gm.board.hash in gm.seen_hashes and len(gm.seen_hashes) == 1
+
+def _full_scan(gm, color):
+    return sorted((r, c) for r in range(gm.size) for c in range(gm.size)
+                  if gm.board.grid[r][c] == EMPTY and gm.is_legal_move(r, c, color))
+
+def test_incremental_legal_moves_match_full_scan():
+    import random
+    rng = random.Random(2)
+    gm = GameManager(size=6, ai=None, human_color=BLACK)
+    for step in range(200):
+        color = gm.to_move
+        gm.human_color = color
+        moves = gm.legal_moves_for(color)
+        assert moves == _full_scan(gm, color)
+        assert gm.legal_moves_for(-color) == _full_scan(gm, -color)
+        if not moves:
+            break
+        if step % 7 == 6:
+            gm.undo_move()
+            continue
+        ok, _ = gm.make_human_move(*rng.choice(moves))
+        assert ok
+    assert any(rec.captured for rec in gm.history)
+
+def test_has_legal_move_short_circuits():
+    gm = GameManager(size=3, ai=None, human_color=BLACK)
+    assert gm.has_legal_move(BLACK) and gm.has_legal_move(WHITE)
+    assert GameManager(size=1).has_legal_move(BLACK) is False
+
+def test_changed_points_cover_move_captures_and_undo():
+    gm = GameManager(size=5, ai=None, human_color=BLACK)
+    assert gm.take_changed_points() == set()
+    # 直接走 board.play_move + _record，不受执子方轮次限制
+    for (r, c, color) in [(0, 0, BLACK), (0, 1, WHITE), (2, 2, BLACK)]:
+        gm._record(gm.board.play_move(r, c, color))
+    assert gm.take_changed_points() == {(0, 0), (0, 1), (2, 2)}
+    gm._record(gm.board.play_move(1, 0, WHITE))   # 提掉 (0,0)
+    assert gm.take_changed_points() == {(1, 0), (0, 0)}
+    gm.undo_move()
+    assert gm.take_changed_points() == {(1, 0), (0, 0)}
+    assert gm.board.grid[0][0] == BLACK
+    assert gm.take_changed_points() == set()
@@ -0,0 +1,165 @@
+import asyncio
+from goai.board import BLACK, WHITE
+from goai import gtp
+
+def test_vertex_roundtrip():
+    assert gtp.parse_vertex("A1", 9) == (8, 0)
+    assert gtp.parse_vertex("j9", 9) == (0, 8)   # 跳过 I
+    assert gtp.parse_vertex("pass", 9) is None
+    for move in [(0, 0), (4, 7), (8, 8)]:
+        assert gtp.parse_vertex(gtp.format_vertex(move, 9), 9) == move
+    for bad in ["I5", "A0", "A10", "Z3"]:
+        try:
+            gtp.parse_vertex(bad, 9)
+        except gtp.GTPError:
+            continue
+        raise AssertionError(bad)
+
+def test_session_time_budget():
+    s = gtp.GTPSession(1, size=9)
+    assert s.move_budget(BLACK, 1.5) == 1.5
+    s.time_settings = (0.0, 10.0, 5)
+    s.time_left = {BLACK: (0.0, 0), WHITE: (0.0, 0)}
+    s.spend(BLACK, 0.0)                        # 主时间用完进入读秒
+    assert s.time_left[BLACK] == (10.0, 5)
+    assert abs(s.move_budget(BLACK, 1.0) - 1.8) < 1e-9
+    s.spend(BLACK, 1.0)
+    assert s.time_left[BLACK] == (9.0, 4)
+
+def test_command_replies():
+    server = gtp.GTPServer(level=0, processes=False, size=9, seed=1)
+    session = server.open_session()
+
+    def run(line):
+        return asyncio.run(server.handle_line(session, line))
+    assert run("7 protocol_version") == "=7 2\n\n"
+    assert run("# comment only") is None
+    assert run("frobnicate").startswith("? unknown")
+    assert run("play b E5") == "=\n\n"
+    assert run("play w E5").startswith("? illegal")
+    assert run("play w pass").startswith("? pass")
+    reply = run("genmove w")
+    assert reply.startswith("= ") and gtp.parse_vertex(reply[2:].strip(), 9) is not None
+    assert len(session.game.history) == 2
+    assert run("undo") == "=\n\n" and len(session.game.history) == 1
+    server.close()
+
+def test_tcp_sessions_share_bounded_pool():
+    async def scenario():
+        server = gtp.GTPServer(level=2, move_time=0.2, workers=1, processes=False, size=5, seed=0)
+        tcp = await server.start_tcp("127.0.0.1", 0)
+        port = tcp.sockets[0].getsockname()[1]
+
+        async def client(first):
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+
+            async def ask(cmd):
+                writer.write((cmd + "\n").encode())
+                await writer.drain()
+                return (await reader.readuntil(b"\n\n")).decode()
+            await ask("play b " + first)
+            move = await ask("genmove w")
+            board = await ask("showboard")
+            await ask("quit")
+            writer.close()
+            return move, board
+
+        (m1, b1), (m2, b2) = await asyncio.gather(client("C3"), client("A1"))
+        metrics = server.metrics()
+        tcp.close()
+        await tcp.wait_closed()
+        server.close()
+        return m1, b1, m2, b2, metrics
+
+    m1, b1, m2, b2, metrics = asyncio.run(scenario())
+    assert m1.startswith("= ") and m2.startswith("= ")
+    # 两个连接各自一盘：一盘只有 C3 的黑子，另一盘只有 A1 的
+    assert b1.count("X") == 1 and b2.count("X") == 1 and b1 != b2
+    assert metrics["max_queue_depth"] == 2
+    assert metrics["searches"] + metrics["timeouts"] >= 2
+    assert metrics["sessions"] == 0
+
+def test_timed_out_search_keeps_its_slot(monkeypatch):
+    import threading
+    import time
+    lock = threading.Lock()
+    running = [0, 0, 0]         # 当前、峰值、启动总数
+
+    def slow_job(data, color, legal_moves, *args):
+        with lock:
+            running[0] += 1
+            running[1] = max(running[1], running[0])
+            running[2] += 1
+        time.sleep(0.6)
+        with lock:
+            running[0] -= 1
+        return legal_moves[0]
+    monkeypatch.setattr(gtp, "_genmove_job", slow_job)
+    monkeypatch.setattr(gtp, "GRACE", 0.0)
+
+    async def scenario():
+        server = gtp.GTPServer(level=2, move_time=0.1, workers=1, processes=False, size=5, seed=0)
+        peak = 0
+        sessions = [server.open_session() for _ in range(3)]
+        tasks = []
+        for s in sessions:
+            # 错开发出：后面的请求到达时，前一个搜索已超时但仍在跑
+            tasks.append(asyncio.ensure_future(server.handle_line(s, "genmove b")))
+            await asyncio.sleep(0.15)
+        while not all(t.done() for t in tasks):
+            peak = max(peak, server.searching)
+            await asyncio.sleep(0.01)
+        await asyncio.sleep(0.7)
+        metrics = server.metrics()
+        server.close()
+        return [t.result() for t in tasks], peak, metrics
+
+    replies, peak, metrics = asyncio.run(scenario())
+    assert all(r.startswith("= ") for r in replies)      # 超时改下随机着法
+    assert metrics["timeouts"] == 3
+    # 第一个搜索超时后仍占着唯一的槽位：后两个在信号量上排队超时，不会堆进池里
+    assert peak <= 1 and running[1] == 1 and running[2] == 1
+    assert metrics["searching"] == 0 and metrics["searches"] == 1
+
+def test_failed_search_falls_back_to_random_move(monkeypatch):
+    def broken_job(*args):
+        raise RuntimeError("boom")
+    monkeypatch.setattr(gtp, "_genmove_job", broken_job)
+    monkeypatch.setattr(gtp, "_score_job", broken_job)
+    server = gtp.GTPServer(level=2, move_time=0.5, workers=1, processes=False, size=5, seed=0)
+    session = server.open_session()
+
+    def run(line):
+        return asyncio.run(server.handle_line(session, line))
+    reply = run("genmove b")
+    assert reply.startswith("= ") and len(session.game.history) == 1
+    assert run("final_score").startswith("? internal error")
+    assert server.metrics()["errors"] == 2
+    server.close()
+
+def test_final_score_does_not_block_other_sessions(monkeypatch):
+    import time
+    from goai import game_manager
+
+    def slow_estimate(*args, **kwargs):
+        time.sleep(0.5)
+        return set()
+    monkeypatch.setattr(gtp, "estimate_dead_stones", slow_estimate)
+    monkeypatch.setattr(game_manager, "estimate_dead_stones", slow_estimate)
+
+    async def scenario():
+        server = gtp.GTPServer(level=0, workers=2, processes=False, size=5, seed=0, score_playouts=10)
+        scoring, other = server.open_session(), server.open_session()
+        await server.handle_line(scoring, "play b C3")
+        task = asyncio.ensure_future(server.handle_line(scoring, "final_score"))
+        await asyncio.sleep(0.05)
+        start = time.monotonic()
+        reply = await server.handle_line(other, "play b A1")
+        elapsed = time.monotonic() - start
+        score = await task
+        server.close()
+        return reply, elapsed, score
+
+    reply, elapsed, score = asyncio.run(scenario())
+    assert reply == "=\n\n" and elapsed < 0.2
+    assert score == "= B+17.5\n\n"
@@ -0,0 +1,70 @@
+import json
+import time
+import pytest
+from goai import instrument
+from goai.board import Board, BLACK, WHITE
+from goai.ai import SimpleAI
+from goai.game_manager import GameManager
+
+@pytest.fixture
+def inst():
+    instrument.reset()
+    instrument.enable()
+    yield instrument
+    instrument.disable()
+    instrument.stop_dump()
+    instrument.reset()
+
+def test_disabled_records_nothing():
+    instrument.reset()
+    b = Board(5)
+    b.place(0, 0, BLACK)
+    b.is_legal(1, 1, WHITE)
+    b._copy()
+    assert instrument.snapshot()["counters"] == {}
+
+def test_counters_and_timers(inst):
+    b = Board(5)
+    b.place(0, 0, BLACK)
+    b.place(0, 1, WHITE)
+    b.place(1, 0, WHITE)   # 提掉 (0,0)
+    b.place(0, 0, BLACK)   # 自杀点：非法
+    b.place(0, 2, WHITE)
+    b._group_and_liberties(0, 1)
+    b._copy()
+    snap = inst.snapshot()
+    c = snap["counters"]
+    assert c["board.is_legal"] == 5
+    assert c["board.captures"] == 1
+    assert c["board.copy"] == 1
+    assert c["board.flood_nodes"] == 2
+    game = GameManager(size=5, ai=SimpleAI(level=0), human_color=BLACK)
+    game.make_human_move(2, 2)
+    game.make_ai_move()
+    timers = inst.snapshot()["timers"]
+    assert timers["ai.select_move"]["count"] == 1
+    assert timers["game.check_game_over"]["count"] == 2
+    json.dumps(inst.snapshot())
+
+def test_histogram_percentiles():
+    h = instrument.Histogram()
+    for ns in [1000] * 90 + [1_000_000] * 10:
+        h.add(ns)
+    s = h.summary()
+    assert s["count"] == 100
+    assert 1.0 <= s["p50_us"] <= 2.048
+    assert s["p99_us"] == s["max_us"] == 1000.0
+
+def test_dump_jsonl(inst, tmp_path):
+    path = tmp_path / "inst.jsonl"
+    inst.count("x", 3)
+    inst.dump(str(path))
+    with inst.timer("block"):
+        time.sleep(0.001)
+    inst.start_dump(str(path), interval=0.01)
+    time.sleep(0.05)
+    inst.stop_dump()
+    lines = [json.loads(l) for l in path.read_text().splitlines()]
+    assert len(lines) >= 3
+    assert lines[0]["counters"] == {"x": 3}
+    assert lines[-1]["timers"]["block"]["count"] == 1
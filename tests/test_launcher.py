@@ -0,0 +1,18 @@
+import subprocess
+import sys
+from goai import __main__ as launcher
+
+def test_core_imports_stay_light():
+    # 规则引擎、AI、自对弈、基准都不应连带加载 tkinter / pygame / numpy
+    code = ("import sys, goai.board, goai.ai, goai.game_manager, goai.selfplay, goai.bench, goai.sound_dev;"
+            "print(','.join(m for m in ('tkinter', 'pygame', 'numpy') if m in sys.modules))")
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == ""
+
+def test_bench_subcommand_reports_startup(capsys):
+    rc = launcher.main(["--startup-time", "bench", "-k", "check_game_over", "--sizes", "9",
+                        "--min-time", "0.001", "--repeat", "1"])
+    assert rc == 0
+    captured = capsys.readouterr()
+    assert "startup: bench ready in" in captured.err
+    assert "check_game_over@9" in captured.out
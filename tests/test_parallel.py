@@ -0,0 +1,55 @@
+from goai.ai import SimpleAI
+from goai.board import Board, BLACK
+from goai.parallel import ParallelMCTS
+
+def test_parallel_search_merges_worker_visits():
+    engine = ParallelMCTS(workers=2, playouts=40, seed=1)
+    try:
+        b = Board(size=5)
+        move = engine.search(b, BLACK)
+        assert b.is_legal(*move, BLACK)
+        assert engine.last_playouts == 40
+        assert sum(engine.last_visits.values()) == 40
+        # 进程池常驻，第二手直接复用
+        b.place(*move, BLACK)
+        assert engine.search(b, -BLACK, legal_moves=[(0, 0)]) == (0, 0)
+    finally:
+        engine.close()
+
+def test_simple_ai_parallel_mode():
+    ai = SimpleAI(level=2, playouts=20, workers=2, seed=2)
+    try:
+        assert ai.select_move(Board(size=1), BLACK) is None
+        assert ai.select_move(Board(size=4), BLACK) is not None
+    finally:
+        ai.close()
+
+def test_parallel_seed_is_reproducible_and_visits_are_per_search():
+    results = []
+    for _ in range(2):
+        engine = ParallelMCTS(workers=2, playouts=40, seed=3)
+        try:
+            b = Board(size=5)
+            engine.search(b, BLACK)
+            results.append(engine.last_visits)
+            # 第二次搜索同一局面会复用树，但只报本次的访问数
+            engine.search(b, BLACK)
+            assert sum(engine.last_visits.values()) == engine.last_playouts == 40
+        finally:
+            engine.close()
+    assert results[0] == results[1]
+
+def test_broken_barrier_is_reset_and_counted():
+    engine = ParallelMCTS(workers=2, playouts=20, seed=4)
+    try:
+        b = Board(size=5)
+        # 模拟某个 worker 超时/挂掉后屏障被打破
+        engine._barrier.abort()
+        assert b.is_legal(*engine.search(b, BLACK), BLACK)
+        assert engine.barrier_failures == 1
+        assert not engine._barrier.broken
+        # reset 之后下一次搜索又能等齐
+        engine.search(b, BLACK)
+        assert engine.barrier_failures == 1
+    finally:
+        engine.close()
@@ -0,0 +1,152 @@
+import random
+from goai.board import EMPTY, BLACK, WHITE, make_board
+from goai.ai import SimpleAI
+from goai.mcts import MCTS
+from goai.patterns import (PatternState, PatternTable, canonical, code_at, default_table,
+                           learn, pattern_playout, sample_move, main)
+
+def _transform(board, k, mirror):
+    """整盘旋转 k 个 90° 并可选镜像。"""
+    n = board.size
+    out = make_board(n)
+    for r in range(n):
+        for c in range(n):
+            v = board.grid[r][c]
+            if v == EMPTY:
+                continue
+            rr, cc = (r, n - 1 - c) if mirror else (r, c)
+            for _ in range(k):
+                rr, cc = cc, n - 1 - rr
+            out.place(rr, cc, v)
+    return out, lambda r, c: _map_point(r, c, n, k, mirror)
+
+def _map_point(r, c, n, k, mirror):
+    rr, cc = (r, n - 1 - c) if mirror else (r, c)
+    for _ in range(k):
+        rr, cc = cc, n - 1 - rr
+    return rr, cc
+
+def _random_board(size=7, moves=20, seed=0):
+    b = make_board(size)
+    rng = random.Random(seed)
+    color = BLACK
+    for _ in range(moves):
+        r, c = rng.randrange(size), rng.randrange(size)
+        if b.place(r, c, color):
+            color = -color
+    return b
+
+def test_canonical_code_is_symmetry_invariant():
+    b = _random_board()
+    for k in range(4):
+        for mirror in (False, True):
+            t, f = _transform(b, k, mirror)
+            for r in range(b.size):
+                for c in range(b.size):
+                    rr, cc = f(r, c)
+                    assert canonical(code_at(b, r, c)) == canonical(code_at(t, rr, cc))
+
+def test_color_swap_for_white():
+    b = make_board(5)
+    b.place(1, 2, BLACK)
+    w = make_board(5)
+    w.place(1, 2, WHITE)
+    assert canonical(code_at(b, 2, 2), BLACK) == canonical(code_at(w, 2, 2), WHITE)
+    assert canonical(code_at(b, 2, 2), BLACK) != canonical(code_at(w, 2, 2), BLACK)
+
+def test_incremental_codes_follow_captures_and_undo():
+    b = make_board(5, "flat")
+    state = PatternState(b)
+    records = []
+    for r, c, color in [(0, 1, BLACK), (0, 0, WHITE), (1, 0, BLACK), (2, 2, WHITE)]:
+        rec = b.play_move(r, c, color)
+        state.apply(rec)
+        records.append(rec)
+    assert list(records[2].captured) == [(0, 0)]
+    assert state.codes == PatternState(b).codes
+    for rec in reversed(records):
+        b.undo(rec)
+        state.undo(rec)
+        assert state.codes == PatternState(b).codes
+
+def test_default_table_avoids_own_eye():
+    b = make_board(5)
+    for p in [(0, 1), (1, 0), (1, 1)]:
+        b.place(p[0], p[1], BLACK)
+    table = default_table()
+    assert table.weight(code_at(b, 0, 0), BLACK) < 0.1
+    assert table.weight(code_at(b, 0, 0), WHITE) > 1
+    assert table.weight(code_at(b, 3, 3), BLACK) == 1.0
+
+def test_learn_raises_weight_of_chosen_pattern(tmp_path):
+    # 每盘都在对方棋子正下方应一手：这种“贴着下”的模式权重应高于平均
+    rng = random.Random(1)
+    games = []
+    for _ in range(30):
+        moves = []
+        used = set()
+        for _ in range(6):
+            r, c = rng.randrange(0, 7), rng.randrange(0, 9)
+            if (r, c) in used or (r + 1, c) in used:
+                continue
+            used.update([(r, c), (r + 1, c)])
+            moves += [(r, c, BLACK), (r + 1, c, WHITE)]
+        games.append((9, (), moves))
+    table = learn(games)
+    b = make_board(9)
+    b.place(4, 4, BLACK)
+    assert table.weight(code_at(b, 5, 4), WHITE) > 2
+    path = str(tmp_path / "w.json")
+    table.save(path)
+    assert PatternTable.load(path).weights == table.weights
+
+def test_sample_move_prefers_heavy_patterns():
+    b = make_board(9)
+    b.place(4, 4, WHITE)
+    table = PatternTable({canonical(code_at(b, 4, 5)): 40.0})
+    moves = [(4, 5), (0, 0), (8, 8), (0, 8)]
+    rng = random.Random(0)
+    picks = [sample_move(b, BLACK, moves, table, rng) for _ in range(200)]
+    assert picks.count((4, 5)) > 150
+    assert sample_move(b, BLACK, [], table, rng) is None
+
+def test_pattern_playout_fills_board():
+    b = make_board(9, "flat")
+    moves = pattern_playout(b, BLACK, random.Random(0))
+    assert moves > 40
+    empty = sum(b.grid[r][c] == EMPTY for r in range(9) for c in range(9))
+    assert empty < 30
+
+def test_level1_and_mcts_with_patterns():
+    b = make_board(9)
+    ai = SimpleAI(level=1)
+    for _ in range(5):
+        r, c = ai.select_move(b, BLACK)
+        assert b.is_legal(r, c, BLACK)
+    engine = MCTS(playouts=30, seed=0, patterns=default_table())
+    r, c = engine.search(b, BLACK)
+    assert b.is_legal(r, c, BLACK)
+
+def test_learn_cli_from_sgf(tmp_path, capsys):
+    sgf = tmp_path / "g.sgf"
+    sgf.write_text("(;GM[1]SZ[9];B[ee];W[ef];B[df];W[de])(;GM[1]SZ[9];B[cc];W[cd])")
+    out = tmp_path / "w.json"
+    assert main(["learn", str(out), "--sgf", str(sgf)]) == 0
+    assert out.exists()
+    assert "patterns" in capsys.readouterr().out
+
+def test_level1_seed_is_reproducible():
+    b = make_board(9)
+    b.place(4, 4, WHITE)
+    picks = []
+    for _ in range(2):
+        ai = SimpleAI(level=1, seed=11)
+        picks.append([ai.select_move(b, BLACK) for _ in range(20)])
+    assert picks[0] == picks[1]
+
+def test_learn_skips_illegal_move():
+    # 最后一手白 A9 是自杀：这一手不计数，学到的权重与不含它时相同
+    moves = [(0, 1, BLACK), (1, 0, BLACK), (5, 5, WHITE), (8, 8, BLACK)]
+    a = learn([(9, (), moves)], samples=1000)
+    b = learn([(9, (), moves + [(0, 0, WHITE)])], samples=1000)
+    assert a.weights == b.weights
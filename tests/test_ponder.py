@@ -0,0 +1,35 @@
+import queue
+from goai.ai import SimpleAI
+from goai.board import Board, BLACK, WHITE
+from goai.ponder import PonderWorker
+
+def test_ponder_then_reuse_subtree_for_reply(wait_for):
+    ai = SimpleAI(level=2, playouts=40, seed=1)
+    worker = PonderWorker(ai)
+    worker.start()
+    try:
+        b = Board(size=5)
+        worker.ponder(b, BLACK)
+        assert wait_for(lambda: worker.pondered >= 200)
+        b.place(2, 2, BLACK)
+        replies = queue.Queue()
+        worker.request_move(b, WHITE, None, lambda m, h: replies.put((m, h)))
+        move, h = replies.get(timeout=5)
+        assert h == b.hash and b.is_legal(*move, WHITE)
+        # 子树来自 pondering：已有访问数抵扣预算，本手只补搜差额
+        assert ai.engine.root.visits >= 40
+        assert ai.engine.last_playouts < 40
+    finally:
+        worker.stop()
+
+def test_non_search_ai_computes_move_in_background():
+    worker = PonderWorker(SimpleAI(level=0))
+    worker.start()
+    try:
+        b = Board(size=3)
+        worker.ponder(b, BLACK)   # 无搜索引擎时忽略
+        replies = queue.Queue()
+        worker.request_move(b, BLACK, [(1, 1)], lambda m, h: replies.put(m))
+        assert replies.get(timeout=5) == (1, 1)
+    finally:
+        worker.stop()
@@ -0,0 +1,92 @@
+import os
+import random
+from goai.board import EMPTY, BLACK, WHITE, make_board
+from goai.game_manager import GameManager
+from goai.record_store import RecordStore
+from goai import selfplay
+
+def _random_game(size=9, moves=70, seed=0):
+    game = GameManager(size=size)
+    rng = random.Random(seed)
+    while len(game.history) < moves:
+        legal = game.legal_moves_for(game.to_move)
+        if not legal:
+            break
+        r, c = rng.choice(legal)
+        game.play(r, c, game.to_move)
+    return game
+
+def test_any_position_matches_replay(tmp_path):
+    path = str(tmp_path / "games.rec")
+    games = [_random_game(seed=s) for s in range(3)]
+    with RecordStore(path, checkpoint_interval=8) as store:
+        for g in games:
+            store.append_game(g)
+        assert len(store) == 3
+        g = games[1]
+        assert store.moves(1) == [(rec.point[0], rec.point[1], rec.color) for rec in g.history]
+        for m in (0, 7, 8, 9, 33, len(g.history)):
+            ref = make_board(9)
+            for rec in g.history[:m]:
+                ref.place(rec.point[0], rec.point[1], rec.color)
+            board = store.position(1, m)
+            assert board.grid == ref.grid and board.hash == ref.hash
+        assert store.position(1, backend="list").grid == g.board.grid
+
+def test_reopen_and_rebuild_index(tmp_path):
+    path = str(tmp_path / "games.rec")
+    with RecordStore(path) as store:
+        store.append([(2, 2, BLACK), (3, 3, WHITE)], 9, komi=6.5, result=WHITE)
+    with RecordStore(path) as store:
+        store.append([(4, 4, BLACK)], 9, result=EMPTY)
+    os.remove(path + ".idx")
+    with open(path, "ab") as f:
+        f.write(b"\x40\x00")               # 写到一半中断的记录：截掉
+    with RecordStore(path) as store:
+        assert len(store) == 2
+        info = store.info(0)
+        assert (info.size, info.moves, info.komi, info.result) == (9, 2, 6.5, WHITE)
+        assert store.info(1).result == EMPTY
+        assert store.position(1).grid[4][4] == BLACK
+
+def test_selfplay_writes_store(tmp_path):
+    path = str(tmp_path / "sp.rec")
+    out = str(tmp_path / "sp.jsonl")
+    selfplay.main(["-n", "2", "--size", "5", "--a", "level=0", "--b", "level=0", "-j", "1",
+                   "--out", out, "--store", path, "--quiet"])
+    with RecordStore(path) as store:
+        assert len(store) == 2
+        assert store.info(0).moves > 0
+        assert store.position(0).size == 5
+
+def test_recovery_truncates_partial_record(tmp_path):
+    path = str(tmp_path / "games.rec")
+    with RecordStore(path) as store:
+        store.append([(2, 2, BLACK)], 9)
+    complete = os.path.getsize(path)
+    with open(path, "ab") as f:
+        f.write(b"\x40\x00\x00\x00\x09\x00\x10\x00")   # 头写了一半就中断
+    with RecordStore(path) as store:
+        assert len(store) == 1
+        assert os.path.getsize(path) == complete
+        # 截掉之后新记录紧接在完整记录后面，重开仍能读到
+        store.append([(3, 3, WHITE)], 9)
+    with RecordStore(path) as store:
+        assert len(store) == 2
+        assert store.position(1).grid[3][3] == WHITE
+
+def test_reads_and_appends_do_not_stat_files(tmp_path, monkeypatch):
+    path = str(tmp_path / "games.rec")
+    store = RecordStore(path)
+    try:
+        def no_stat(p):
+            raise AssertionError("stat on the hot path")
+        monkeypatch.setattr(os.path, "getsize", no_stat)
+        for i in range(3):
+            assert store.append([(i, i, BLACK)], 9) == i
+            assert len(store) == i + 1
+            assert store.position(i).grid[i][i] == BLACK
+        assert store.info(0).moves == 1
+    finally:
+        monkeypatch.undo()
+        store.close()
@@ -0,0 +1,68 @@
+import random
+from goai.board import Board, EMPTY, BLACK, WHITE
+from goai.game_manager import GameManager, GameResult
+from goai.playout import random_playout, area_score
+from goai.scoring import score_area, area_ownership, label_regions, estimate_dead_stones
+
+def test_empty_board_is_neutral():
+    res = score_area(Board(size=5), komi=7.5)
+    assert (res.black_area, res.white_area) == (0, 0)
+    assert res.winner == WHITE and str(res) == "W+7.5"
+
+def test_wall_splits_territory():
+    b = Board(size=5)
+    for r in range(5):
+        b.place(r, 1, BLACK)
+        b.place(r, 3, WHITE)
+    res = score_area(b, komi=0.5)
+    # 黑：列 0、1；白：列 3、4；列 2 为双方公共
+    assert (res.black_area, res.white_area) == (10, 10)
+    assert res.margin == -0.5
+
+def test_regions_merge_across_u_shapes():
+    # U 形空区域：光栅扫描时先出现两个标号，后面合并
+    size = 3
+    vals = [EMPTY, BLACK, EMPTY,
+            EMPTY, BLACK, EMPTY,
+            EMPTY, EMPTY, EMPTY]
+    labels, border = label_regions(vals, size)
+    roots = {labels[i] for i in range(9) if vals[i] == EMPTY}
+    assert len(roots) == 1 and border[roots.pop()] == 1
+
+def test_matches_playout_area_score_on_random_positions():
+    rng = random.Random(4)
+    for _ in range(5):
+        b = Board(size=9)
+        random_playout(b, BLACK, rng)
+        assert score_area(b, komi=0).margin == area_score(b)
+
+def test_dead_stones_estimated_and_overridable():
+    # 白一子孤立在黑的大块地里
+    b = Board(size=5)
+    for r in range(5):
+        b.place(r, 2, BLACK)
+    b.place(1, 0, WHITE)
+    dead = estimate_dead_stones(b, WHITE, playouts=60, rng=random.Random(1))
+    assert dead == {(1, 0)}
+    assert score_area(b, komi=0, dead_stones=dead).black_area == 25
+    # 人工覆盖：不认为它死
+    assert score_area(b, komi=0, dead_stones=()).black_area < 25
+
+def test_score_19x19_after_playout():
+    # 速度见 python -m goai.bench -k score_area
+    b = Board(size=19)
+    random_playout(b, BLACK, random.Random(0), max_moves=200)
+    stones = sum(v != EMPTY for row in b.grid for v in row)
+    res = score_area(b, komi=7.5)
+    assert stones <= res.black_area + res.white_area <= 19 * 19
+    assert res.margin == res.black_area - res.white_area - 7.5
+
+def test_game_manager_end_by_score():
+    gm = GameManager(size=5, komi=0.5)
+    for r in range(5):
+        gm.board.place(r, 1, BLACK)
+    gm.sync_legal_moves()
+    res = gm.end_by_score(dead_stones=set())
+    assert res.black_area == 25 and gm.result == GameResult.BLACK_WINS
+    assert gm.get_winner_text() == "Black wins (B+24.5)"
+    assert str(gm.live_score()) == "B+24.5"
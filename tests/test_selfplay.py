@@ -0,0 +1,52 @@
+import io
+import json
+from goai.board import Board, BLACK, WHITE
+from goai.selfplay import parse_engine, wilson_interval, run_selfplay, play_game
+
+def test_parse_engine():
+    assert parse_engine("level=2, playouts=200,time_ms=1.5") == {"level": 2, "playouts": 200, "time_ms": 1.5}
+    assert parse_engine("") == {}
+
+def test_wilson_interval():
+    lo, hi = wilson_interval(50, 100)
+    assert lo < 0.5 < hi and abs((lo + hi) / 2 - 0.5) < 1e-9
+    assert wilson_interval(0, 0) == (0.0, 1.0)
+    lo, hi = wilson_interval(10, 10)
+    assert hi == 1.0 and lo > 0.6
+
+def test_games_replay_and_stream_to_file():
+    out = io.StringIO()
+    stats = run_selfplay(4, out, size=5, a="level=0", b="level=0", workers=1, seed=3, max_moves=30)
+    lines = out.getvalue().splitlines()
+    assert len(lines) == 4 and stats.games == 4
+    records = [json.loads(line) for line in lines]
+    # 交换颜色：A 执黑两盘
+    assert sum(r["black"] == "A" for r in records) == 2
+    for r in records:
+        b = Board(5)
+        color = BLACK
+        for row, col in r["moves"]:
+            assert b.play_move(row, col, color) is not None
+            color = -color
+        assert len(r["moves"]) <= 30
+    s = stats.summary()
+    assert s["a_wins"] + s["b_wins"] + s["draws"] == 4
+    assert s["moves"] == sum(len(r["moves"]) for r in records)
+
+def test_same_seed_same_game():
+    g1 = play_game(0, 5, "level=2,playouts=10", "level=0", True, 7, 20, 7.5, 0)
+    g2 = play_game(0, 5, "level=2,playouts=10", "level=0", True, 7, 20, 7.5, 0)
+    assert g1["moves"] == g2["moves"] and g1["result"] == g2["result"]
+
+def test_engine_spec_seed_overrides_game_seed():
+    # 双方都固定了 seed：对局种子不同也下出同一盘
+    a, b = "level=2,playouts=10,seed=3", "level=2,playouts=10,seed=4"
+    g1 = play_game(0, 5, a, b, True, 7, 20, 7.5, 0)
+    g2 = play_game(1, 5, a, b, True, 8, 20, 7.5, 0)
+    assert g1["moves"] and g1["moves"] == g2["moves"]
+
+def test_process_pool():
+    out = io.StringIO()
+    stats = run_selfplay(3, out, size=5, workers=2, max_moves=20)
+    assert stats.games == 3
+    assert sorted(json.loads(l)["game"] for l in out.getvalue().splitlines()) == [0, 1, 2]
@@ -0,0 +1,68 @@
+import random
+from goai.board import BLACK, WHITE, pack_moves, unpack_moves
+from goai.game_manager import GameManager
+from goai.session import CompactSession, SessionStore, measure_idle
+
+def _random_game(size=9, moves=40, seed=3):
+    game = GameManager(size=size)
+    rng = random.Random(seed)
+    while len(game.history) < moves:
+        legal = game.legal_moves_for(game.to_move)
+        if not legal:
+            break
+        r, c = rng.choice(legal)
+        game.play(r, c, game.to_move)
+    return game
+
+def test_pack_moves_roundtrip():
+    moves = [(0, 0, BLACK), (18, 18, WHITE), (3, 15, BLACK)]
+    data = pack_moves(moves, 19)
+    assert len(data) == 6
+    assert list(unpack_moves(data, 19)) == moves
+
+def test_hibernate_and_rehydrate_restore_game():
+    game = _random_game()
+    assert any(rec.captured for rec in game.history)
+    s = CompactSession.from_game(game)
+    assert s.hibernated and s.move_count() == len(game.history)
+    assert s.board().grid == game.board.grid          # 不唤醒也能看局面
+    assert s.hibernated
+    g = s.game
+    assert g.board.grid == game.board.grid and g.board.hash == game.board.hash
+    assert g.seen_hashes == game.seen_hashes
+    assert g.legal_points == game.legal_points
+    assert g.to_move == game.to_move
+    # 悔棋照常可用
+    g.undo_move()
+    game.undo_move()
+    assert g.board.grid == game.board.grid
+
+def test_scored_game_keeps_score_and_setup():
+    from goai import sgf
+    game = sgf.game_from_sgf("(;GM[1]SZ[9]AB[cc][gg]AW[ee];W[dd];B[ff])")
+    game.end_by_score(dead_stones=set())
+    s = CompactSession.from_game(game)
+    g = s.rehydrate()
+    assert g.setup == game.setup
+    assert g.board.grid == game.board.grid and g.seen_hashes == game.seen_hashes
+    assert g.result == game.result
+    assert str(g.score_result) == str(game.score_result)
+    assert sgf.result_string(g) == sgf.result_string(game)
+
+def test_store_keeps_only_max_active_expanded():
+    store = SessionStore(max_active=2)
+    ids = [store.new(size=9) for _ in range(4)]
+    for sid in ids:
+        store.game(sid).make_human_move(4, 4)
+    assert store.active_count() == 2
+    assert [store.sessions[sid].hibernated for sid in ids] == [True, True, False, False]
+    # 休眠的会话唤醒后接着下
+    game = store.game(ids[0])
+    assert game.board.grid[4][4] == BLACK and not game.is_human_turn()
+    store.hibernate_all()
+    assert all(s.hibernated for s in store.sessions.values())
+
+def test_idle_session_is_a_few_hundred_bytes():
+    idle, full = measure_idle(games=200, moves=100)
+    assert idle < 600
+    assert full > 50 * idle
@@ -0,0 +1,80 @@
+import io
+import random
+from goai.board import BLACK, WHITE
+from goai.game_manager import GameManager
+from goai import sgf
+
+def _random_game(size=9, moves=50, seed=2):
+    game = GameManager(size=size)
+    rng = random.Random(seed)
+    while len(game.history) < moves:
+        legal = game.legal_moves_for(game.to_move)
+        if not legal:
+            break
+        r, c = rng.choice(legal)
+        game.play(r, c, game.to_move)
+    return game
+
+def test_write_then_read_roundtrip(tmp_path):
+    game = _random_game()
+    game.end_by_score(dead_stones=set())
+    path = tmp_path / "g.sgf"
+    sgf.save_sgf(game, str(path), black="Hu]man", white="solo-go")
+    loaded = sgf.load_sgf(str(path))
+    assert loaded.board.grid == game.board.grid
+    assert loaded.board.hash == game.board.hash
+    assert len(loaded.history) == len(game.history)
+    record = sgf.parse_game(path.read_bytes())
+    assert record.prop("PB") == "Hu]man"
+    assert record.prop("RE") == str(game.score_result)
+
+def test_parse_main_line_setup_and_passes():
+    text = "(;GM[1]SZ[9]AB[aa][bb:cc]PL[W]C[a ) b \\] c];W[ee];B[];W[dd](;B[ff];W[gg])(;B[hh]))"
+    record = sgf.parse_game(text)
+    assert sorted(record.setup) == [(0, 0, BLACK), (1, 1, BLACK), (1, 2, BLACK), (2, 1, BLACK), (2, 2, BLACK)]
+    assert record.moves == [(4, 4, WHITE), (3, 3, WHITE), (5, 5, BLACK), (6, 6, WHITE)]
+    assert record.passes == 1
+    game = sgf.game_from_sgf(text)
+    assert game.board.grid[0][0] == BLACK and game.board.grid[6][6] == WHITE
+
+def test_stream_splits_games_across_chunks():
+    games = [_random_game(seed=s) for s in range(5)]
+    blob = ("\n".join(sgf.game_to_sgf(g, C="x ( ] )".replace("]", "\\]")) for g in games)).encode()
+    texts = list(sgf.iter_game_texts(io.BytesIO(blob), chunk_size=7))
+    assert len(texts) == 5
+    for g, record in zip(games, map(sgf.parse_game, texts)):
+        board, bad = sgf.replay(record)
+        assert bad is None and board.grid == g.board.grid
+
+def test_process_collection_flags_illegal_games(tmp_path):
+    good = sgf.game_to_sgf(_random_game())
+    bad = "(;SZ[9];B[ee];W[ee])"        # 重复落子
+    path = tmp_path / "coll.sgf"
+    path.write_text(good * 3 + bad + "(;SZ[9];B[zz])")
+    serial = list(sgf.process_collection([str(path)], workers=1, batch=2))
+    assert [s["valid"] for s in serial] == [True, True, True, False, False]
+    assert serial[3]["error_move"] == 1 and "parse_error" in serial[4]
+    parallel = list(sgf.process_collection([str(path)], workers=2, batch=2))
+    assert sorted(s["valid"] for s in parallel) == sorted(s["valid"] for s in serial)
+
+def test_setup_stones_survive_load_and_save(tmp_path):
+    text = "(;GM[1]SZ[9]AB[cc][gg]AW[ee]PL[W];W[dd];B[ff])"
+    game = sgf.game_from_sgf(text)
+    assert sorted(game.setup) == [(2, 2, BLACK), (4, 4, WHITE), (6, 6, BLACK)]
+    path = tmp_path / "h.sgf"
+    sgf.save_sgf(game, str(path))
+    record = sgf.parse_game(path.read_bytes())
+    assert sorted(record.setup) == sorted(game.setup)
+    assert record.moves == [(3, 3, WHITE), (5, 5, BLACK)]
+    assert record.prop("PL") == "W"
+    assert sgf.load_sgf(str(path)).board.grid == game.board.grid
+
+def test_load_sgf_without_game_tree(tmp_path):
+    path = tmp_path / "empty.sgf"
+    path.write_text("no game here\n")
+    try:
+        sgf.load_sgf(str(path))
+    except ValueError as e:
+        assert "no game" in str(e)
+    else:
+        raise AssertionError("expected ValueError")
@@ -202,3 +202,56 @@ def test_non_windows_no_master_no_raise(monkeypatch):
     sound = _reload_sound_module()
     # 不应抛异常
     sound.play_move_sound(master=None)
+
+class FakePygameChannels(FakePygameOK):
+    """带通道 API 的 pygame：记录 pre_init 参数、Sound 构造次数与各通道的播放"""
+    def __init__(self):
+        super().__init__()
+        self.pre_init_args = None
+        self.loads = 0
+        self.channel_plays = []
+        busy = self.busy = set()
+        outer = self
+
+        class _Channel:
+            def __init__(_, i):
+                _.i = i
+            def get_busy(_):
+                return _.i in busy
+            def play(_, snd):
+                outer.channel_plays.append(_.i)
+                busy.add(_.i)
+
+        base_sound = self.mixer.Sound
+
+        def _sound(path):
+            self.loads += 1
+            return base_sound(path)
+
+        def _pre_init(*a, **k):
+            self.pre_init_args = a
+        self.mixer.pre_init = _pre_init
+        self.mixer.Sound = _sound
+        self.mixer.Channel = _Channel
+        self.mixer.get_num_channels = lambda: 8
+        self.mixer.set_num_channels = lambda n: None
+        self.mixer.set_reserved = lambda n: n
+
+def test_engine_preloads_and_uses_channel_pool(monkeypatch):
+    fake_pg = FakePygameChannels()
+    monkeypatch.setitem(sys.modules, "pygame", fake_pg)
+    sound = _reload_sound_module()
+    engine = sound.init_sound()
+    assert engine.ready and fake_pg.loads == 1
+    assert fake_pg.pre_init_args[3] == sound.BUFFER_SIZE
+    # 之后不再读盘
+    monkeypatch.setattr(Path, "exists", lambda p: pytest.fail("disk access during play"))
+    t0 = __import__("time").perf_counter()
+    for _ in range(sound.POOL_SIZE + 1):
+        sound.play_move_sound(t0=t0)
+    # 先用空闲通道，全忙后复用最早的
+    assert fake_pg.channel_plays == list(range(sound.POOL_SIZE)) + [0]
+    assert fake_pg.loads == 1
+    stats = engine.latency_stats()
+    assert stats["count"] == sound.POOL_SIZE + 1
+    assert stats["p50_ms"] >= stats["buffer_ms"] > 0
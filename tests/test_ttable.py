@@ -0,0 +1,71 @@
+from goai.ai import SimpleAI
+from goai.board import Board, BLACK, WHITE
+from goai.ttable import TranspositionTable, ENTRY_BYTES, position_key
+
+def test_lru_eviction_keeps_within_capacity():
+    tt = TranspositionTable(max_bytes=3 * ENTRY_BYTES)
+    assert tt.capacity == 3
+    for key in range(3):
+        tt.store(key, 1, 0.5)
+    assert tt.get(0) is not None      # 0 变为最近使用
+    tt.store(3, 1, 0.5)               # 淘汰最久未用的 1
+    assert 1 not in tt and 0 in tt and len(tt) == 3
+    assert tt.get(1) is None
+    st = tt.stats()
+    assert (st["hits"], st["misses"], st["evictions"]) == (1, 1, 1)
+    assert st["approx_bytes"] <= tt.max_bytes
+
+def test_store_keeps_previous_best_move_hint():
+    tt = TranspositionTable()
+    tt.store(7, 10, 0.6, (1, 1))
+    tt.store(7, 12, 0.7)
+    e = tt.get(7)
+    assert (e.visits, e.value, e.best_move) == (12, 0.7, (1, 1))
+
+def test_position_key_depends_on_side_to_move():
+    assert position_key(123, BLACK) != position_key(123, WHITE)
+
+def test_mcts_writes_and_reuses_table():
+    tt = TranspositionTable(max_bytes=1024 * 1024)
+    b = Board(size=5)
+    first = SimpleAI(level=2, playouts=80, seed=1, ttable=tt)
+    move = first.select_move(b, BLACK)
+    assert len(tt) > 1
+    assert tt.get(position_key(b.hash, BLACK)).best_move == move
+    # 新搜索器在同一局面上以表中经验为先验，并优先展开提示着法
+    second = SimpleAI(level=2, playouts=1, seed=2, ttable=tt)
+    second.select_move(b, BLACK)
+    assert second.engine.root.visits > 1
+    assert move in second.engine.root.children
+
+def test_full_table_stays_under_max_bytes():
+    import random
+    import tracemalloc
+    rng = random.Random(0)
+    for max_bytes in (50_000, 300_000, 1_000_000):
+        tracemalloc.start()
+        base = tracemalloc.get_traced_memory()[0]
+        tt = TranspositionTable(max_bytes)
+        for _ in range(tt.capacity * 2):
+            tt.store(rng.getrandbits(64), rng.randrange(1 << 20), rng.random(),
+                     (rng.randrange(19), rng.randrange(19)))
+        used = tracemalloc.get_traced_memory()[0] - base
+        tracemalloc.stop()
+        assert len(tt) == tt.capacity
+        assert used <= max_bytes
+
+def test_concurrent_store_and_get():
+    import threading
+    tt = TranspositionTable(max_bytes=200 * ENTRY_BYTES)
+
+    def worker(offset):
+        for i in range(5000):
+            tt.store(offset + i % 500, i, 0.5, (0, 0))
+            tt.get(offset + (i * 7) % 500)
+    threads = [threading.Thread(target=worker, args=(k * 1000,)) for k in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(tt) == tt.capacity == 200
+    assert tt.stats()["evictions"] > 0
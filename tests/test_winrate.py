@@ -0,0 +1,33 @@
+from goai.board import Board, BLACK, WHITE
+from goai.ttable import TranspositionTable, position_key
+from goai.winrate import WinRateEstimator, ownership_map
+
+def test_ownership_map_counts_area():
+    b = Board(size=3)
+    for r in range(3):
+        b.place(r, 1, BLACK)
+    assert ownership_map(b) == [BLACK] * 9
+
+def test_estimates_refine_and_are_cached_per_position(wait_for):
+    tt = TranspositionTable()
+    est = WinRateEstimator(komi=0.5, batch=4, max_playouts=40, ttable=tt, seed=1)
+    est.start()
+    try:
+        b = Board(size=5)
+        est.set_position(b, BLACK)
+        assert wait_for(lambda: est.latest() is not None and est.latest().playouts >= 40)
+        first = est.latest()
+        assert 0.0 <= first.black_win_rate() <= 1.0
+        assert len(first.ownership()) == 25
+        assert tt.get(position_key(b.hash, BLACK)).visits == 40
+        # 换局面：旧估计立即不再作为当前结果
+        b2 = b._copy()
+        b2.place(2, 2, BLACK)
+        est.set_position(b2, WHITE)
+        assert est.latest() is None or est.latest().board_hash == b2.hash
+        assert wait_for(lambda: est.latest() is not None and est.latest().board_hash == b2.hash)
+        # 翻回原局面：缓存结果立即可用
+        est.set_position(b, BLACK)
+        assert est.latest().board_hash == b.hash and est.latest().playouts == 40
+    finally:
+        est.stop()